@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of the callback_data codec.
+
+Run `python -m benchmarks.callback_codec [repeats]` from the project root to compare,
+for a value of each callback class, the aiogram format (pydantic validated) with the
+compact one: size of the data, time to pack and unpack and the peak memory allocated
+while unpacking. Compact data is unpacked both cold (decoded) and as a pressed again
+button (from the cache).
+"""
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+
+from aiogram.filters.callback_data import CallbackData
+
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.keyboards.callback import (
+    AICallback,
+    AuthMethodCallback,
+    BackCallback,
+    ChatCallback,
+    ConfirmationCallback,
+    DialectCallback,
+    HTTPMethodCallback,
+    LanguageCallback,
+    MenuCallback,
+)
+from src.keyboards.codec import CompactCallbackData
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Languages, Menu, Models
+
+CALLBACKS: tuple[CompactCallbackData, ...] = (
+    LanguageCallback(language=Languages.ru),
+    MenuCallback(item=Menu.models, language=Languages.en),
+    AICallback(action=Models.list, language=Languages.en, after_id=1_234_567),
+    BackCallback(language=Languages.ru),
+    HTTPMethodCallback(method=HTTPMethods.POST, language=Languages.en),
+    DialectCallback(dialect=Dialect.OPENAI, language=Languages.en),
+    AuthMethodCallback(method=AuthMethod.HEADERS, language=Languages.ru),
+    ConfirmationCallback(choice=Confirmation.YES, language=Languages.en),
+    ChatCallback(integration_id=98_765, language=Languages.ru),
+)
+
+
+def per_call_us(call: Callable[[], object], repeats: int) -> float:
+    return min(timeit.repeat(call, number=repeats, repeat=5)) / repeats * 1e6
+
+
+def peak_bytes(call: Callable[[], object], repeats: int = 100) -> float:
+    """Average of the peak memory allocated by one call, its result included."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / repeats
+
+
+def main(repeats: int = 20000) -> int:
+    print( # noqa: T201
+        f"{'callback':<22}{'bytes':>11}{'pack, µs':>14}{'unpack, µs':>21}{'unpack peak, B':>24}",
+    )
+    for callback in CALLBACKS:
+        cls = type(callback)
+        legacy = CallbackData.pack(callback)
+        compact = callback.pack()
+
+        def unpack_legacy(cls: type[CallbackData] = cls, data: str = legacy) -> CallbackData:
+            return CallbackData.unpack.__func__(cls, data)
+
+        def decode_compact(cls: type[CompactCallbackData] = cls, data: str = compact) -> CallbackData:
+            return cls.decode(data)
+
+        def unpack_compact(cls: type[CompactCallbackData] = cls, data: str = compact) -> CallbackData:
+            return cls.unpack(data)
+
+        def pack_legacy(callback: CallbackData = callback) -> str:
+            return CallbackData.pack(callback)
+
+        columns = (
+            f"{len(legacy):>4} → {len(compact):<3}",
+            f"{per_call_us(pack_legacy, repeats):>5.2f} → {per_call_us(callback.pack, repeats):<5.2f}",
+            (
+                f"{per_call_us(unpack_legacy, repeats):>5.2f} → {per_call_us(decode_compact, repeats):.2f}"
+                f" / {per_call_us(unpack_compact, repeats):<5.2f}"
+            ),
+            (
+                f"{peak_bytes(unpack_legacy):>5.0f} → {peak_bytes(decode_compact):.0f}"
+                f" / {peak_bytes(unpack_compact):<5.0f}"
+            ),
+        )
+        print( # noqa: T201
+            f"{cls.__name__:<22}{columns[0]:>11}{columns[1]:>16}{columns[2]:>24}{columns[3]:>22}",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(int, sys.argv[1:2])))
@@ -0,0 +1,86 @@
+"""
+Throughput of callback query dispatch, with and without the callback index.
+
+Run `python -m benchmarks.callback_dispatch [updates]` from the project root. Synthetic
+button presses are fed through the Dispatcher with the bot's routers, an in-memory FSM
+storage and a Bot session answering locally, first propagated through the routers, then
+dispatched by the index. Both runs must make the same API calls.
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+
+from benchmarks.telegram import UpdateFactory, make_bot
+from src.core.callback_dispatch import IndexedDispatcher
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.handlers import routers
+from src.keyboards.callback import (
+    AICallback,
+    BackCallback,
+    ConfirmationCallback,
+    HTTPMethodCallback,
+    LanguageCallback,
+    MenuCallback,
+)
+from src.schemes.enums import Confirmation, Languages, Menu, Models
+
+USERS = 50
+
+WORKLOADS: dict[str, tuple[str, ...]] = {
+    "menu": (
+        LanguageCallback(language=Languages.en).pack(),
+        MenuCallback(item=Menu.models, language=Languages.en).pack(),
+        MenuCallback(item=Menu.info, language=Languages.ru).pack(),
+        MenuCallback(item=Menu.settings, language=Languages.en).pack(),
+        AICallback(action=Models.add, language=Languages.en).pack(),
+        BackCallback(language=Languages.en).pack(),
+    ),
+    # Taken by no handler, e.g. a wizard button outside its state: only routing is measured
+    "unmatched": (
+        HTTPMethodCallback(method=HTTPMethods.GET, language=Languages.en).pack(),
+        ConfirmationCallback(choice=Confirmation.NO, language=Languages.ru).pack(),
+        "unknown",
+    ),
+}
+
+
+async def run(dp: IndexedDispatcher, updates: list[Update]) -> tuple[float, Counter[str]]:
+    bot, session = make_bot()
+    for update in updates[:200]: # warm up, the index is built on the first callback query
+        await dp.feed_update(bot, update)
+    session.calls.clear()
+
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return time.perf_counter() - started, session.calls
+
+
+async def main(count: int = 20000) -> int:
+    factory = UpdateFactory()
+    dp = IndexedDispatcher(storage=MemoryStorage())
+    dp.include_routers(*routers)
+
+    mismatches = 0
+    print(f"{'presses':<11}{'routers, updates/s':>20}{'index, updates/s':>18}{'speedup':>9}") # noqa: T201
+    for name, presses in WORKLOADS.items():
+        updates = [factory.callback(1 + index % USERS, presses[index % len(presses)]) for index in range(count)]
+        results = {}
+        for fast_callbacks in (False, True):
+            dp.fast_callbacks = fast_callbacks
+            results[fast_callbacks] = await run(dp, updates)
+
+        (routed, routed_calls), (indexed, indexed_calls) = results[False], results[True]
+        print(f"{name:<11}{count / routed:>20.0f}{count / indexed:>18.0f}{routed / indexed:>8.2f}x") # noqa: T201
+        if routed_calls != indexed_calls:
+            mismatches += 1
+            print(f"MISMATCH: routers {dict(routed_calls)}, index {dict(indexed_calls)}") # noqa: T201
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(*map(int, sys.argv[1:2]))))
@@ -0,0 +1,28 @@
+"""
+pytest fixtures of the mock LLM endpoint, load them with `pytest -p benchmarks.fixtures`
+or `pytest_plugins = ["benchmarks.fixtures"]` in a conftest.py. They need pytest and
+pytest-asyncio (asyncio_mode = "auto", or mark the tests), the bot does not depend on them.
+
+    @pytest.mark.parametrize("mock_llm_config", [MockLLMConfig(throttle_rate=1)], indirect=True)
+    async def test_throttled(mock_llm: MockLLMServer) -> None:
+        ... # requests to f"{mock_llm.url}{PATH}" are answered 429
+"""
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+
+from benchmarks.llm_server import MockLLMConfig, MockLLMServer
+
+
+@pytest.fixture
+def mock_llm_config(request: pytest.FixtureRequest) -> MockLLMConfig:
+    """Default config, or the one given by indirect parametrization."""
+    return getattr(request, "param", None) or MockLLMConfig(seed=0)
+
+
+@pytest_asyncio.fixture
+async def mock_llm(mock_llm_config: MockLLMConfig) -> AsyncIterator[MockLLMServer]:
+    """A running mock LLM endpoint, `mock_llm.url` is its base URL and `mock_llm.stats` what it answered."""
+    async with MockLLMServer(mock_llm_config) as server:
+        yield server
@@ -0,0 +1,161 @@
+"""
+Benchmark of the LLM endpoint client against the mock endpoint.
+
+Run `python -m benchmarks.gateway [--streams N] [--concurrency C] [mock options]` from the
+project root, `--help` lists them. N chat completions are streamed, C at once, through the
+AIHttpClient the gateway leases from the client registry (shared connector, limits and
+timeouts of the config) and parsed by the OpenAI adapter. The mock endpoint runs in a
+child process (see benchmarks/llm_server.py), out of the measurements.
+
+Reported: streams and tokens per second, p50/p95/p99/max latency of the first token and
+of the whole stream, failures by cause, TCP connections the client opened for the requests,
+and memory per concurrent stream, measured in a second run under tracemalloc.
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+
+import aiohttp
+
+from benchmarks.llm_server import (
+    PATH,
+    MockLLMConfig,
+    MockLLMProcess,
+    add_config_arguments,
+    config_from_arguments,
+)
+from src.core.config import config
+from src.core.ModelGateway.adapters import ChatMessage, OpenAIChatAdapter, RequestSpec
+from src.core.ModelGateway.ai_http_client import AIHttpClient, HTTPMethods
+from src.core.ModelGateway.registry import ai_client_registry
+
+DESCRIPTION = __doc__.split("\n\n")[0].strip()
+STREAMS = 1000
+CONCURRENCY = 100
+UPSTREAM = MockLLMConfig(ttfb=0.1, token_rate=200, chunk_tokens=4, answer_tokens=64, seed=0)
+PROMPT = "Hello! What can you do?"
+KiB = 1024
+
+
+@dataclass(frozen=True, slots=True)
+class StreamResult:
+    first_token: float | None # seconds
+    duration: float # seconds
+    error: str | None
+
+
+async def stream(client: AIHttpClient, adapter: OpenAIChatAdapter, request: RequestSpec) -> StreamResult:
+    started = time.perf_counter()
+    first_token = None
+    error = None
+    try:
+        chunks = client.stream_bytes(HTTPMethods.POST, PATH, **request.as_kwargs())
+        async for _ in adapter.parse_stream(chunks):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+    except aiohttp.ClientResponseError as e:
+        error = f"HTTP {e.status}"
+    except (aiohttp.ClientError, TimeoutError) as e:
+        error = type(e).__name__
+    return StreamResult(first_token, time.perf_counter() - started, error)
+
+
+async def run(url: str, streams: int, concurrency: int) -> tuple[float, list[StreamResult]]:
+    """Streams `streams` answers, `concurrency` at once, returns the seconds it took and the results."""
+    adapter = OpenAIChatAdapter()
+    request = adapter.build_request(HTTPMethods.POST, [ChatMessage("user", PROMPT)], model="mock")
+    pending = iter(range(streams)) # shared by the workers, so only `concurrency` streams exist at once
+    results: list[StreamResult] = []
+
+    async with ai_client_registry.lease(url) as client:
+        async def work() -> None:
+            for _ in pending:
+                results.append(await stream(client, adapter, request)) # noqa: PERF401, awaits in turn
+
+        started = time.perf_counter()
+        await asyncio.gather(*(work() for _ in range(concurrency)))
+        return time.perf_counter() - started, results
+
+
+def latency_row(name: str, latencies: list[float]) -> str:
+    if len(latencies) < 2: # noqa: PLR2004, quantiles need two
+        return f"{name:<14}{'-':>10}{'-':>10}{'-':>10}{'-':>10}"
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    p50, p95, p99, slowest = (value * 1000 for value in (cuts[49], cuts[94], cuts[98], max(latencies)))
+    return f"{name:<14}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{slowest:>10.1f}"
+
+
+def report(
+        upstream: MockLLMConfig,
+        concurrency: int,
+        elapsed: float,
+        results: list[StreamResult],
+        requests: int,
+        connections: int,
+) -> None:
+    completed = [result for result in results if result.error is None]
+    failures = Counter(result.error for result in results if result.error is not None)
+    failed = ", ".join(f"{count} {cause}" for cause, count in failures.most_common()) or "none"
+    lines = [
+        (
+            f"{len(results)} streams, {concurrency} at once, connections per host at most "
+            f"{config.gateway.connection_limit_per_host or 'unlimited'}"
+        ),
+        f"completed {len(completed)} in {elapsed:.2f} s, failed: {failed}",
+        (
+            f"{len(completed) / elapsed:.1f} streams/s, "
+            f"{len(completed) * upstream.answer_tokens / elapsed:.0f} tokens/s"
+        ),
+        f"{'':<14}{'p50, ms':>10}{'p95, ms':>10}{'p99, ms':>10}{'max, ms':>10}",
+        latency_row("first token", [result.first_token for result in completed if result.first_token]),
+        latency_row("whole stream", [result.duration for result in completed]),
+        (
+            f"TCP connections: {connections} opened for {requests} requests "
+            f"({requests / max(connections, 1):.1f} requests per connection)"
+        ),
+    ]
+    print("\n".join(lines)) # noqa: T201
+
+
+async def benchmark(upstream: MockLLMConfig, streams: int, concurrency: int) -> int:
+    print(f"Mock LLM: {upstream}") # noqa: T201
+    with MockLLMProcess(upstream) as llm:
+        try:
+            elapsed, results = await run(llm.url, streams, concurrency)
+            stats = llm.take_stats()
+            report(upstream, concurrency, elapsed, results, stats.requests, stats.connections)
+
+            gc.collect()
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                await run(llm.url, concurrency, concurrency)
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+            finally:
+                tracemalloc.stop()
+            print( # noqa: T201
+                f"Memory: {peak / concurrency / KiB:.1f} KiB per concurrent stream "
+                f"(peak {peak / KiB / KiB:.2f} MiB for {concurrency} streams, warm connections)",
+            )
+        finally:
+            await ai_client_registry.close()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gateway", description=DESCRIPTION)
+    parser.add_argument("--streams", type=int, default=STREAMS, help=f"default {STREAMS}")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help=f"default {CONCURRENCY}")
+    add_config_arguments(parser, UPSTREAM)
+    arguments = parser.parse_args(argv)
+    return asyncio.run(benchmark(config_from_arguments(arguments), arguments.streams, arguments.concurrency))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Local mock of an LLM endpoint: OpenAI-compatible chat completions with controlled latency.
+
+Answers POST /v1/chat/completions with `answer_tokens` canned words, as Server-Sent Events
+(`data: {"choices": [{"delta": ...}]}` chunks, then `data: [DONE]`) or as one JSON
+completion. The first chunk comes after `ttfb` seconds, the next ones at `token_rate`
+tokens per second, `chunk_tokens` per chunk. A share of requests can be answered 500 or
+429 (with Retry-After), drawn from a seeded random generator for reproducible runs.
+
+Run `python -m benchmarks.llm_server --help` to serve it from the command line, use
+MockLLMServer in-process (see also benchmarks/fixtures.py for pytest), or
+MockLLMProcess to keep its work out of the measurements of a benchmark.
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import random
+import sys
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field, fields
+from multiprocessing.connection import Connection
+from types import TracebackType
+from typing import Self
+
+import orjson
+from aiohttp import web
+
+HOST = "127.0.0.1"
+PATH = "/v1/chat/completions"
+EVENT_STREAM = "text/event-stream"
+DESCRIPTION = __doc__.split("\n\n")[0].strip()
+WORDS = ("Sure.", "Here", "is", "a", "short", "answer,", "streamed", "word", "by", "word.")
+
+
+@dataclass(frozen=True, slots=True)
+class MockLLMConfig:
+    ttfb: float = 0.0 # seconds before the response headers and the first chunk
+    token_rate: float = 0.0 # tokens per second after the first chunk, 0 sends them all at once
+    chunk_tokens: int = 1 # tokens per streamed chunk
+    answer_tokens: int = 16 # tokens of an answer
+    error_rate: float = 0.0 # share of requests answered 500
+    throttle_rate: float = 0.0 # share of requests answered 429
+    retry_after: int = 1 # seconds, Retry-After of the 429 answers
+    stream: bool | None = None # True SSE, False JSON, None as asked by `stream` of the request
+    seed: int | None = None # of the 500 and 429 draws
+
+    def __post_init__(self) -> None:
+        if self.chunk_tokens < 1 or self.answer_tokens < 1:
+            raise ValueError("'chunk_tokens' and 'answer_tokens' must be at least 1")
+        if not 0 <= self.error_rate + self.throttle_rate <= 1:
+            raise ValueError("'error_rate' and 'throttle_rate' must be shares adding up to at most 1")
+
+
+@dataclass(slots=True)
+class MockLLMStats:
+    requests: int = 0
+    answered: int = 0
+    errors: int = 0 # answered 500
+    throttled: int = 0 # answered 429
+    tokens: int = 0
+    peers: set[tuple[str, int]] = field(default_factory=set) # one per TCP connection
+
+    @property
+    def connections(self) -> int:
+        return len(self.peers)
+
+
+def completion_chunk(content: str) -> bytes:
+    return b"data: " + orjson.dumps({"choices": [{"index": 0, "delta": {"content": content}}]}) + b"\n\n"
+
+
+def error_response(status: int, kind: str, headers: dict[str, str] | None = None) -> web.Response:
+    return web.Response(
+        status=status,
+        body=orjson.dumps({"error": {"message": f"Mock {kind}", "type": kind}}),
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+class MockLLMServer:
+    """The mock endpoint on an aiohttp server, `async with MockLLMServer(config) as server: server.url`."""
+
+    def __init__(self, config: MockLLMConfig | None = None) -> None:
+        self.config = config or MockLLMConfig()
+        self.stats = MockLLMStats()
+        self.url = ""
+        self.app = web.Application()
+        self.app.router.add_post(PATH, self.chat_completions)
+        self._random = random.Random(self.config.seed) # noqa: S311, not for security
+        words = itertools.islice(itertools.cycle(WORDS), self.config.answer_tokens)
+        self._tokens = [word + " " for word in words]
+        self._runner: web.AppRunner | None = None
+
+    def take_stats(self) -> MockLLMStats:
+        """Statistics since the last call."""
+        stats, self.stats = self.stats, MockLLMStats()
+        return stats
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        config = self.config
+        self.stats.requests += 1
+        if peer := request.transport and request.transport.get_extra_info("peername"):
+            self.stats.peers.add(peer[:2])
+        body = orjson.loads(await request.read())
+
+        draw = self._random.random()
+        if draw < config.throttle_rate:
+            self.stats.throttled += 1
+            return error_response(429, "rate_limit_exceeded", {"Retry-After": str(config.retry_after)})
+        if draw < config.throttle_rate + config.error_rate:
+            self.stats.errors += 1
+            return error_response(500, "server_error")
+
+        await asyncio.sleep(config.ttfb)
+        stream = body.get("stream", False) if config.stream is None else config.stream
+        response = await (self._stream(request) if stream else self._complete())
+        self.stats.answered += 1
+        self.stats.tokens += config.answer_tokens
+        return response
+
+    async def _complete(self) -> web.Response:
+        if self.config.token_rate:
+            await asyncio.sleep(self.config.answer_tokens / self.config.token_rate)
+        message = {"role": "assistant", "content": "".join(self._tokens)}
+        return web.Response(
+            body=orjson.dumps({"choices": [{"index": 0, "message": message}]}),
+            content_type="application/json",
+        )
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        loop = asyncio.get_running_loop()
+        chunk_tokens = self.config.chunk_tokens
+        interval = chunk_tokens / self.config.token_rate if self.config.token_rate else 0.0
+
+        response = web.StreamResponse(headers={"Content-Type": EVENT_STREAM, "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        send_at = loop.time()
+        for start in range(0, len(self._tokens), chunk_tokens):
+            if start:
+                send_at += interval
+                await asyncio.sleep(send_at - loop.time()) # on a schedule, late chunks do not add up
+            await response.write(completion_chunk("".join(self._tokens[start:start + chunk_tokens])))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def start(self, host: str = HOST, port: int = 0) -> str:
+        """Starts serving, returns the base URL. Port 0 picks a free one."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_val: BaseException | None,
+            exc_tb: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+
+def _serve_process(config: MockLLMConfig, host: str, port: int, connection: Connection) -> None:
+    async def serve() -> None:
+        server = MockLLMServer(config)
+        connection.send(await server.start(host, port))
+        loop = asyncio.get_running_loop()
+        try:
+            while await loop.run_in_executor(None, connection.recv) == "stats":
+                connection.send(server.take_stats())
+        finally:
+            await server.stop()
+
+    asyncio.run(serve())
+
+
+class MockLLMProcess:
+    """
+    MockLLMServer in a child process, so its CPU time and memory stay out of
+    the measurements: `with MockLLMProcess(config) as server: server.url`.
+    """
+
+    def __init__(self, config: MockLLMConfig | None = None, host: str = HOST, port: int = 0) -> None:
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_serve_process,
+            args=(config or MockLLMConfig(), host, port, child_connection),
+            name="mock-llm",
+            daemon=True,
+        )
+        self.url = ""
+
+    def take_stats(self) -> MockLLMStats:
+        """Statistics since the last call."""
+        self._connection.send("stats")
+        return self._connection.recv()
+
+    def __enter__(self) -> Self:
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_val: BaseException | None,
+            exc_tb: TracebackType | None,
+    ) -> None:
+        self._connection.send("stop")
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser, defaults: MockLLMConfig | None = None) -> None:
+    """Options of every MockLLMConfig field, e.g. `--token-rate 50`."""
+    defaults = defaults or MockLLMConfig()
+    for config_field in fields(MockLLMConfig):
+        option = "--" + config_field.name.replace("_", "-")
+        default = getattr(defaults, config_field.name)
+        if config_field.name == "stream":
+            formats = {None: None, True: "sse", False: "json"}
+            parser.add_argument(
+                option, choices=("sse", "json"), default=formats[default],
+                help="answer format, as asked by the request when not set",
+            )
+        elif config_field.name == "seed":
+            parser.add_argument(option, type=int, default=default, help=f"of the draws, default {default}")
+        else:
+            parser.add_argument(option, type=config_field.type, default=default, help=f"default {default}")
+
+
+def config_from_arguments(arguments: argparse.Namespace) -> MockLLMConfig:
+    values = {
+        config_field.name: getattr(arguments, config_field.name) for config_field in fields(MockLLMConfig)
+    }
+    values["stream"] = None if arguments.stream is None else arguments.stream == "sse"
+    return MockLLMConfig(**values)
+
+
+async def serve_forever(config: MockLLMConfig, host: str, port: int) -> None:
+    server = MockLLMServer(config)
+    await server.start(host, port)
+    print(f"Mock LLM on {server.url}{PATH}, {asdict(config)}", flush=True) # noqa: T201
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        stats = server.take_stats()
+        print( # noqa: T201
+            f"requests {stats.requests}, answered {stats.answered}, 500 {stats.errors}, "
+            f"429 {stats.throttled}, connections {stats.connections}",
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_server", description=DESCRIPTION)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=8000)
+    add_config_arguments(parser)
+    arguments = parser.parse_args(argv)
+    with suppress(KeyboardInterrupt): # Ctrl-C stops the server
+        asyncio.run(serve_forever(config_from_arguments(arguments), arguments.host, arguments.port))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+End to end load test of the bot, offline.
+
+Run `python -m benchmarks.load_test [users] [concurrency]` from the project root.
+Synthetic users send /start, pick a language, open the models menu, add an AI through
+the whole AddAIStates wizard (mistyping the model name once, every other user with auth
+headers), open it from the list of their AIs, chat with it and go back to the menu.
+
+Updates go through the dispatcher of the bot with its routers and SQLite FSM storage,
+on a temporary database (see benchmarks/sandbox.py). Telegram is a Bot session answering
+locally and the AI a local aiohttp stand-in (see benchmarks/llm_server.py). Up to
+`concurrency` users are served at once, the updates of one user in order, as the
+update scheduler does.
+
+Reported: throughput, p50/p95/p99 latency of handling an update (per step and overall),
+SQL statements and API calls per update, and the memory retained by a second batch of
+users, run under tracemalloc as tracing slows everything down.
+"""
+import asyncio
+import gc
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from functools import partial
+
+from aiogram import Bot
+
+import benchmarks.sandbox # noqa: F401, sets the environment src reads, before src is imported
+from benchmarks.llm_server import PATH, MockLLMServer
+from benchmarks.telegram import RecordingSession, UpdateFactory, make_bot
+from src.core.callback_dispatch import IndexedDispatcher
+from src.core.config import config
+from src.core.db.fsm_storage import SQLiteStorage
+from src.core.db.pool import sqlite_pool
+from src.core.db.writer import sqlite_writer
+from src.core.lifespan import close_database, init_database
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.core.ModelGateway.registry import ai_client_registry
+from src.handlers import routers
+from src.keyboards.callback import (
+    AICallback,
+    AuthMethodCallback,
+    BackCallback,
+    ChatCallback,
+    ConfirmationCallback,
+    DialectCallback,
+    HTTPMethodCallback,
+    LanguageCallback,
+    MenuCallback,
+)
+from src.keyboards.codec import CompactCallbackData, callback_class
+from src.repository.fsm_state import FsmStateRepository
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Languages, Menu, Models
+
+USERS = 200
+CONCURRENCY = 16
+LANGUAGES = tuple(Languages)
+READS = {"SELECT", "WITH"}
+WRITES = {"INSERT", "UPDATE", "DELETE", "REPLACE"}
+MiB = 1024 * 1024
+
+
+class StatementCounter:
+    """SQL statements by their first keyword, called from the threads of the connections."""
+
+    def __init__(self) -> None:
+        self.kinds: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, statement: str) -> None:
+        kind = statement.split(None, 1)[0].upper() if statement.strip() else ""
+        with self._lock:
+            self.kinds[kind] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.kinds.clear()
+
+
+class LoadTest:
+    """Synthetic users going through the bot, latencies of handling their updates by step."""
+
+    def __init__(self, dp: IndexedDispatcher, bot: Bot, session: RecordingSession, endpoint: str) -> None:
+        self._dp = dp
+        self._bot = bot
+        self._session = session
+        self._endpoint = endpoint
+        self._updates = UpdateFactory()
+        self.latencies: defaultdict[str, list[float]] = defaultdict(list)
+
+    async def _feed(self, step: str, update: object) -> None:
+        started = time.perf_counter()
+        await self._dp.feed_update(self._bot, update)
+        self.latencies[step].append(time.perf_counter() - started)
+
+    async def _send(self, user_id: int, step: str, text: str) -> None:
+        await self._feed(step, self._updates.message(user_id, text))
+
+    async def _press(self, user_id: int, step: str, button: CompactCallbackData | str) -> None:
+        data = button.pack() if isinstance(button, CompactCallbackData) else button
+        await self._feed(step, self._updates.callback(user_id, data))
+
+    def _button(self, user_id: int, cls: type[CompactCallbackData]) -> str:
+        """Data of the first button of class `cls` in the last keyboard the bot sent to the user."""
+        keyboard = self._session.keyboards.get(user_id)
+        for row in keyboard.inline_keyboard if keyboard else ():
+            for button in row:
+                if button.callback_data and callback_class(button.callback_data) is cls:
+                    return button.callback_data
+        raise LookupError(f"User {user_id} got no {cls.__name__} button")
+
+    async def play(self, user_id: int) -> None:
+        language = LANGUAGES[user_id % len(LANGUAGES)]
+        send = partial(self._send, user_id)
+        press = partial(self._press, user_id)
+
+        await send("/start", "/start")
+        await press("language", LanguageCallback(language=language))
+        await press("models menu", MenuCallback(item=Menu.models, language=language))
+        await press("add AI", AICallback(action=Models.add, language=language))
+        await send("AI URL", f"{self._endpoint}{PATH}")
+        await press("HTTP method", HTTPMethodCallback(method=HTTPMethods.POST, language=language))
+        await press("dialect", DialectCallback(dialect=Dialect.OPENAI, language=language))
+        await send("model name", "gpt 4o mini") # invalid, asked again
+        await send("model name", "gpt-4o-mini")
+        if user_id % 2:
+            await press("auth method", AuthMethodCallback(method=AuthMethod.HEADERS, language=language))
+            await send("auth data", "X-Api-Key secret")
+        else:
+            await press("auth method", AuthMethodCallback(method=AuthMethod.NONE, language=language))
+        await press("confirm", ConfirmationCallback(choice=Confirmation.YES, language=language))
+        await press("list AIs", AICallback(action=Models.list, language=language))
+        await press("open chat", self._button(user_id, ChatCallback))
+        await send("chat message", "Hello! What can you do?")
+        await press("back to menu", BackCallback(language=language))
+
+    async def run(self, users: range, concurrency: int) -> float:
+        """Plays `users`, returns the seconds it took."""
+        slots = asyncio.Semaphore(concurrency)
+
+        async def play(user_id: int) -> None:
+            async with slots:
+                await self.play(user_id)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(play(user_id) for user_id in users))
+        await self._dp.storage.flush()
+        return time.perf_counter() - started
+
+
+def latency_row(step: str, latencies: list[float]) -> str:
+    p50, p95, p99 = (
+        statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1] * 1000
+        for percent in (50, 95, 99)
+    )
+    return f"{step:<16}{len(latencies):>9}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}"
+
+
+def report(
+        test: LoadTest,
+        users: int,
+        concurrency: int,
+        elapsed: float,
+        statements: Counter[str],
+        calls: int,
+) -> None:
+    updates = sum(map(len, test.latencies.values()))
+    per_update = {
+        "reads": sum(count for kind, count in statements.items() if kind in READS) / updates,
+        "writes": sum(count for kind, count in statements.items() if kind in WRITES) / updates,
+        "commits": statements["COMMIT"] / updates,
+    }
+    lines = [
+        (
+            f"{users} users, {concurrency} at once: {updates} updates in {elapsed:.2f} s, "
+            f"{updates / elapsed:.0f} updates/s"
+        ),
+        f"{'step':<16}{'updates':>9}{'p50, ms':>10}{'p95, ms':>10}{'p99, ms':>10}",
+        *(latency_row(step, latencies) for step, latencies in test.latencies.items()),
+        latency_row("all", [latency for latencies in test.latencies.values() for latency in latencies]),
+        (
+            f"SQL statements per update: {statements.total() / updates:.2f} "
+            f"({', '.join(f'{value:.2f} {name}' for name, value in per_update.items())})"
+        ),
+        f"Telegram API calls per update: {calls / updates:.2f}",
+    ]
+    print("\n".join(lines)) # noqa: T201
+
+
+async def main(users: int = USERS, concurrency: int = CONCURRENCY) -> int:
+    statements = StatementCounter()
+    sqlite_pool.set_trace_callback(statements)
+    await init_database()
+    await ai_client_registry.start()
+    storage = SQLiteStorage(
+        FsmStateRepository(sqlite_pool.get_async_session, sqlite_writer),
+        state_ttl=config.fsm.state_ttl,
+        cache_max_size=config.fsm.cache_max_size,
+        cache_ttl=config.fsm.cache_ttl,
+        flush_delay=config.fsm.flush_delay,
+    )
+    dp = IndexedDispatcher(storage=storage)
+    dp.include_routers(*routers)
+    bot, session = make_bot()
+
+    try:
+        async with MockLLMServer() as llm:
+            endpoint = llm.url
+            test = LoadTest(dp, bot, session, endpoint)
+            statements.clear() # of the migrations
+            elapsed = await test.run(range(1, users + 1), concurrency)
+            report(test, users, concurrency, elapsed, statements.kinds, session.calls.total())
+
+            gc.collect()
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                await LoadTest(dp, bot, session, endpoint).run(range(users + 1, 2 * users + 1), concurrency)
+                gc.collect()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            retained = current - baseline
+            print( # noqa: T201
+                f"Memory retained by {users} more users: {retained / MiB:.2f} MiB "
+                f"({retained / users / 1024:.1f} KiB per user), peak {(peak - baseline) / MiB:.2f} MiB",
+            )
+    finally:
+        await storage.close()
+        await ai_client_registry.close()
+        await close_database()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(*map(int, sys.argv[1:3]))))
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the text and keyboard of the static menu callbacks.
+
+Run `python -m benchmarks.menu_callbacks [repeats]` from the project root to compare,
+per callback, building them with TextBuilder/InlineKeyboardFactory (as every handler
+did before the catalogs) with looking them up in `texts`/`keyboards`.
+Only the reply is measured, parsing the update and calling Telegram cost the same in both.
+"""
+import sys
+import timeit
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.keyboards.builder import InlineKeyboardFactory
+from src.keyboards.catalog import keyboards
+from src.schemes.enums import Languages, Menu
+from src.text.builder import TextBuilder
+from src.text.catalog import texts
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[Languages], object]
+    lookup: Callable[[Languages], object]
+
+
+SCENARIOS: tuple[Scenario, ...] = (
+    Scenario(
+        "main menu",
+        lambda language: (
+            TextBuilder(language).main_menu_greeting(),
+            InlineKeyboardFactory(language).main_menu(),
+        ),
+        lambda language: (texts[language].main_menu_greeting, keyboards[language].main_menu),
+    ),
+    *(
+        Scenario(
+            f"menu {item.value}",
+            lambda language, item=item: (
+                TextBuilder(language).main(item),
+                InlineKeyboardFactory(language).main(item),
+            ),
+            lambda language, item=item: (texts[language].menu[item], keyboards[language].menu[item]),
+        )
+        for item in Menu
+    ),
+    Scenario(
+        "http method",
+        lambda language: (
+            TextBuilder(language).choose_http_method_prompt(),
+            InlineKeyboardFactory(language).choose_http_method(),
+        ),
+        lambda language: (texts[language].choose_http_method_prompt, keyboards[language].choose_http_method),
+    ),
+    Scenario(
+        "dialect",
+        lambda language: (
+            TextBuilder(language).choose_dialect_prompt(),
+            InlineKeyboardFactory(language).choose_dialect(),
+        ),
+        lambda language: (texts[language].choose_dialect_prompt, keyboards[language].choose_dialect),
+    ),
+    Scenario(
+        "auth method",
+        lambda language: (
+            TextBuilder(language).choose_auth_method_prompt(),
+            InlineKeyboardFactory(language).choose_auth_method(),
+        ),
+        lambda language: (texts[language].choose_auth_method_prompt, keyboards[language].choose_auth_method),
+    ),
+)
+
+
+def per_call_us(call: Callable[[Languages], object], repeats: int) -> float:
+    """Best of 5 runs, in microseconds per call, alternating the languages."""
+    languages = tuple(Languages)
+
+    def run() -> None:
+        for index in range(repeats):
+            call(languages[index % len(languages)])
+
+    return min(timeit.repeat(run, number=1, repeat=5)) / repeats * 1e6
+
+
+def main(repeats: int = 2000) -> int:
+    print(f"{'callback':<16}{'built, µs':>12}{'catalog, µs':>14}{'speedup':>10}") # noqa: T201
+    for scenario in SCENARIOS:
+        built = per_call_us(scenario.build, repeats)
+        lookup = per_call_us(scenario.lookup, repeats)
+        print(f"{scenario.name:<16}{built:>12.2f}{lookup:>14.3f}{built / lookup:>9.0f}x") # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(int, sys.argv[1:2])))
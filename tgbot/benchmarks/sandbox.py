@@ -0,0 +1,19 @@
+"""
+Environment of an offline run, import it before `src`: src.core.config reads it on import.
+
+The database goes to a temporary directory removed on exit. The LLM stand-in is one
+endpoint for every synthetic user, so its per-endpoint limits are lifted unless set.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+DB_DIRECTORY = Path(tempfile.mkdtemp(prefix="tgbot-benchmark-"))
+atexit.register(shutil.rmtree, DB_DIRECTORY, ignore_errors=True)
+
+os.environ["DB_PATH"] = str(DB_DIRECTORY / "bot.sqlite")
+os.environ.setdefault("GATEWAY_RATE", "0")
+os.environ.setdefault("GATEWAY_MAX_IN_FLIGHT", "1000")
+os.environ.setdefault("GATEWAY_MAX_QUEUE", "1000")
@@ -0,0 +1,97 @@
+"""Offline stand-ins for Telegram: a Bot session recording API calls and synthetic updates."""
+import itertools
+from collections import Counter
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.methods import EditMessageText, SendMessage, TelegramMethod
+from aiogram.types import CallbackQuery, Chat, InlineKeyboardMarkup, Message, Update, User
+
+BOT_TOKEN = "42:BENCHMARK" # noqa: S105, never sent anywhere
+
+
+class RecordingSession(BaseSession):
+    """Answers every API call locally, counts them by method and keeps the last inline keyboard of each chat."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: Counter[str] = Counter()
+        self.keyboards: dict[int | str, InlineKeyboardMarkup] = {}
+        self._message_ids = itertools.count(1_000_000)
+
+    async def make_request(
+            self,
+            bot: Bot,
+            method: TelegramMethod[Any],
+            timeout: int | None = None, # noqa: ARG002, ASYNC109, the BaseSession signature
+    ) -> Any: # noqa: ANN401, the result type of `method`
+        self.calls[type(method).__name__] += 1
+        if isinstance(method, (SendMessage, EditMessageText)):
+            if isinstance(method.reply_markup, InlineKeyboardMarkup):
+                self.keyboards[method.chat_id] = method.reply_markup
+            return Message(
+                message_id=getattr(method, "message_id", None) or next(self._message_ids),
+                date=datetime.now(UTC),
+                chat=Chat(id=method.chat_id or 0, type="private"),
+                text=method.text,
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, *args: object, **kwargs: object) -> AsyncGenerator[bytes]: # noqa: ARG002
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def make_bot() -> tuple[Bot, RecordingSession]:
+    session = RecordingSession()
+    bot = Bot(BOT_TOKEN, session=session, default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN_V2))
+    return bot, session
+
+
+class UpdateFactory:
+    """Updates of private chats, one chat per user id."""
+
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def user(user_id: int) -> User:
+        return User(id=user_id, is_bot=False, first_name=f"user{user_id}", language_code="en")
+
+    def message(self, user_id: int, text: str) -> Update:
+        return Update(
+            update_id=next(self._ids),
+            message=Message(
+                message_id=next(self._ids),
+                date=datetime.now(UTC),
+                chat=Chat(id=user_id, type="private"),
+                from_user=self.user(user_id),
+                text=text,
+            ),
+        )
+
+    def callback(self, user_id: int, data: str) -> Update:
+        message = Message(
+            message_id=next(self._ids),
+            date=datetime.now(UTC),
+            chat=Chat(id=user_id, type="private"),
+            from_user=self.user(user_id),
+            text="menu",
+        )
+        return Update(
+            update_id=next(self._ids),
+            callback_query=CallbackQuery(
+                id=str(next(self._ids)),
+                from_user=self.user(user_id),
+                chat_instance=str(user_id),
+                message=message,
+                data=data,
+            ),
+        )
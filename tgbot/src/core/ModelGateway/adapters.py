@@ -0,0 +1,232 @@
+import codecs
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import orjson
+
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.core.ModelGateway.streaming import iter_lines
+
+DIALECT_RAW, DIALECT_OPENAI, DIALECT_OLLAMA = 0, 1, 2 # 'integration_ai.dialect'
+
+JSON_CONTENT_TYPE = "application/json"
+SSE_OTHER_FIELDS = (b":", b"event:", b"id:", b"retry:")
+
+
+class AdapterResponseError(ValueError):
+    """Raised when the endpoint answers with an error document or an unexpected body."""
+
+
+@dataclass(frozen=True, slots=True)
+class ChatMessage:
+    role: str # "system", "user" or "assistant"
+    content: str
+
+
+@dataclass(frozen=True, slots=True)
+class RequestSpec:
+    """Keyword arguments of `AIHttpClient.stream_bytes` for one model call."""
+    data: bytes | None = None
+    params: dict[str, str] | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def as_kwargs(self) -> dict[str, Any]:
+        return {"data": self.data, "params": self.params, "headers": self.headers}
+
+
+def _string_end(buffer: bytes, start: int) -> int:
+    """Index of the quote closing the JSON string whose content starts at `start`, -1 if none."""
+    end = buffer.find(b'"', start)
+    while end != -1:
+        backslashes = 0
+        while buffer[end - backslashes - 1] == 0x5C: # noqa: PLR2004, '\\'
+            backslashes += 1
+        if not backslashes % 2:
+            return end
+        end = buffer.find(b'"', end + 1)
+    return -1
+
+
+def extract_string(document: bytes, markers: Sequence[bytes]) -> str | None:
+    """
+    Returns the value of the first string field found by one of `markers`
+    (e.g. b'"content":"'), decoding only that string instead of the whole document.
+    None when no marker matches, the caller then falls back to a full parse.
+    """
+    for marker in markers:
+        start = document.find(marker)
+        if start == -1:
+            continue
+        start += len(marker)
+        end = _string_end(document, start)
+        if end == -1:
+            return None
+        value = document[start:end]
+        if b"\\" not in value:
+            return value.decode()
+        return orjson.loads(document[start - 1:end + 1])
+    return None
+
+
+class DialectAdapter(ABC):
+    """Builds the request body of an LLM API dialect and turns its streamed answer into text."""
+    dialect: int
+
+    @abstractmethod
+    def build_request(
+            self,
+            method: HTTPMethods,
+            messages: Sequence[ChatMessage],
+            model: str | None = None,
+    ) -> RequestSpec:
+        ...
+
+    @abstractmethod
+    def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        """Yields the answer text, chunk by chunk, from the raw response body."""
+
+
+class RawTextAdapter(DialectAdapter):
+    """The last message is sent as the plain text body, the body is the answer."""
+    dialect = DIALECT_RAW
+
+    def build_request(
+            self,
+            method: HTTPMethods,
+            messages: Sequence[ChatMessage],
+            model: str | None = None, # noqa: ARG002, raw endpoints take no model
+    ) -> RequestSpec:
+        prompt = messages[-1].content
+        if method == HTTPMethods.GET:
+            return RequestSpec(params={"prompt": prompt})
+        return RequestSpec(data=prompt.encode(), headers={"Content-Type": "text/plain; charset=utf-8"})
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for chunk in chunks:
+            if text := decoder.decode(chunk):
+                yield text
+        if tail := decoder.decode(b"", final=True):
+            yield tail
+
+
+class OpenAIChatAdapter(DialectAdapter):
+    """OpenAI-compatible /v1/chat/completions with `stream: true` (Server-Sent Events)."""
+    dialect = DIALECT_OPENAI
+    _markers = (b'"content":"', b'"content": "')
+    _done = b"[DONE]"
+
+    def build_request(
+            self,
+            method: HTTPMethods, # noqa: ARG002, JSON dialects always send a body
+            messages: Sequence[ChatMessage],
+            model: str | None = None,
+    ) -> RequestSpec:
+        body = {
+            "model": model,
+            "messages": [{"role": message.role, "content": message.content} for message in messages],
+            "stream": True,
+        }
+        return RequestSpec(
+            data=orjson.dumps(body),
+            headers={"Content-Type": JSON_CONTENT_TYPE, "Accept": "text/event-stream"},
+        )
+
+    @staticmethod
+    def _text(document: object) -> str | None:
+        if not isinstance(document, dict):
+            raise AdapterResponseError(f"Unexpected response: {document!r}")
+        if "error" in document:
+            raise AdapterResponseError(f"Endpoint error: {document['error']!r}")
+        choices = document.get("choices") or [{}]
+        choice = choices[0]
+        # 'delta' in stream chunks, 'message' when the endpoint ignored 'stream'
+        return (choice.get("delta") or choice.get("message") or {}).get("content")
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        plain: list[bytes] = [] # body of an endpoint that answered without SSE
+        async for line in iter_lines(chunks):
+            if not line.startswith(b"data:"):
+                if line and not line.startswith(SSE_OTHER_FIELDS):
+                    plain.append(line)
+                continue
+            payload = line[5:].lstrip()
+            if payload == self._done:
+                return
+            text = extract_string(payload, self._markers)
+            if text is None:
+                text = self._text(orjson.loads(payload))
+            if text:
+                yield text
+        if plain and (text := self._text(orjson.loads(b"\n".join(plain)))):
+            yield text
+
+
+class OllamaAdapter(DialectAdapter):
+    """Ollama /api/chat (or /api/generate) streaming newline delimited JSON."""
+    dialect = DIALECT_OLLAMA
+    _markers = (b'"content":"', b'"response":"', b'"content": "', b'"response": "')
+
+    def __init__(self, generate: bool = False) -> None:
+        self._generate = generate
+
+    def build_request(
+            self,
+            method: HTTPMethods, # noqa: ARG002, JSON dialects always send a body
+            messages: Sequence[ChatMessage],
+            model: str | None = None,
+    ) -> RequestSpec:
+        if self._generate:
+            body = {"model": model, "prompt": messages[-1].content, "stream": True}
+        else:
+            body = {
+                "model": model,
+                "messages": [{"role": message.role, "content": message.content} for message in messages],
+                "stream": True,
+            }
+        return RequestSpec(data=orjson.dumps(body), headers={"Content-Type": JSON_CONTENT_TYPE})
+
+    @staticmethod
+    def _text(document: object) -> str | None:
+        if not isinstance(document, dict):
+            raise AdapterResponseError(f"Unexpected response: {document!r}")
+        if "error" in document:
+            raise AdapterResponseError(f"Endpoint error: {document['error']!r}")
+        return (document.get("message") or {}).get("content") or document.get("response")
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            text = extract_string(line, self._markers)
+            if text is None:
+                text = self._text(orjson.loads(line))
+            if text:
+                yield text
+
+
+_adapters: dict[int, DialectAdapter] = {}
+
+
+def register_adapter(adapter: DialectAdapter) -> DialectAdapter:
+    """Registers the adapter of its dialect, replacing a previous one."""
+    _adapters[adapter.dialect] = adapter
+    return adapter
+
+
+def get_adapter(dialect: int, path: str = "") -> DialectAdapter:
+    """Returns the adapter of a stored 'integration_ai.dialect' value."""
+    if dialect == DIALECT_OLLAMA and path.rstrip("/").endswith("/api/generate"):
+        return _ollama_generate
+    try:
+        return _adapters[dialect]
+    except KeyError:
+        raise ValueError(f"Unknown dialect: {dialect}") from None
+
+
+register_adapter(RawTextAdapter())
+register_adapter(OpenAIChatAdapter())
+register_adapter(OllamaAdapter())
+_ollama_generate = OllamaAdapter(generate=True)
@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
 from enum import Enum
 from types import TracebackType
 from typing import Any
@@ -5,6 +8,15 @@ from typing import Any
 import aiohttp
 import orjson
 
+from src.core.ModelGateway.streaming import (
+    DEFAULT_MAX_LINE_SIZE,
+    SSEEvent,
+    iter_json_lines,
+    iter_lines,
+    iter_sse_events,
+)
+from src.utils.deadline import Deadline, DeadlineExceededError
+
 
 class HTTPMethods(Enum):
     """Enumeration of standard HTTP methods."""
@@ -30,6 +42,10 @@ class AIHttpClient:
             headers: dict[str, str] | None = None,
             cookies: dict[str, str] | None = None,
             timeout: float = 30.0,
+            connector: aiohttp.BaseConnector | None = None,
+            connect_timeout: float | None = None,
+            first_byte_timeout: float | None = None,
+            chunk_timeout: float | None = None,
     ) -> None:
         """
         Initializes the HTTP client with default settings.
@@ -38,23 +54,35 @@ class AIHttpClient:
             base_url (str): The base URL for all requests made by this client.
             headers (Dict[str, str] | None): Default headers to be sent with all requests.
             cookies (Dict[str, str] | None): Default cookies to be sent with all requests.
-            timeout (float): Total timeout for each request in seconds.
+            timeout (float): Total timeout for each buffered request in seconds.
                                        This covers connection, send, and read timeouts.
+                                       Streaming requests are not limited in total.
+            connector (aiohttp.BaseConnector | None): Shared connector to pool connections with
+                                       other clients. It is not closed together with this client.
+            connect_timeout (float | None): Seconds to get a connection (pool wait included).
+            first_byte_timeout (float | None): Seconds from sending a streaming request
+                                       to receiving the first byte of the body.
+            chunk_timeout (float | None): Max seconds between two chunks of a streaming body.
         """
         self._base_url: str = base_url
         self._default_headers: dict[str, str] = headers if headers is not None else {}
         self._default_cookies: dict[str, str] = cookies if cookies is not None else {}
-        self._timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout)
+        self._timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._stream_timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout)
+        self._first_byte_timeout: float | None = first_byte_timeout
+        self._chunk_timeout: float | None = chunk_timeout
 
         self._session: aiohttp.ClientSession = aiohttp.ClientSession(
             headers=self._default_headers,
             cookies=self._default_cookies,
             timeout=self._timeout,
-            base_url=self._base_url,
-            json_serialize=orjson.dumps,
+            base_url=self._base_url or None, # aiohttp accepts only absolute base URLs
+            connector=connector,
+            connector_owner=connector is None,
         )
 
-    async def _request(
+    @asynccontextmanager
+    async def _open(
             self,
             method: HTTPMethods,
             path: str,
@@ -64,24 +92,166 @@ class AIHttpClient:
             data: str | bytes | dict[str, Any] | None = None,
             params: dict[str, str] | None = None,
             allow_redirects: bool = True,
-    ) -> aiohttp.ClientResponse:
-        """Internal method for executing HTTP requests using the persistent ClientSession."""
+            client_timeout: aiohttp.ClientTimeout | None = None,
+            headers_at: float | None = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Sends the request and yields the response with its body still unread.
+        `headers_at` is the event loop time by which the response headers must arrive.
+        """
         combined_headers: dict[str, str] = {**self._default_headers, **(headers or {})}
         combined_cookies: dict[str, str] = {**self._default_cookies, **(cookies or {})}
 
-        async with self._session.request(
+        if json_data is not None:
+            # orjson produces bytes directly, aiohttp's json= path expects a str serializer
+            data = orjson.dumps(json_data)
+            combined_headers.setdefault("Content-Type", "application/json")
+
+        async with asyncio.timeout_at(headers_at):
+            response = await self._session.request(
                 method.value, # Access the string value of the Enum
                 path,
                 headers=combined_headers,
                 cookies=combined_cookies,
-                json=json_data,
                 data=data,
                 params=params,
                 allow_redirects=allow_redirects,
-        ) as response:
+                timeout=client_timeout or self._timeout,
+            )
+        async with response:
             response.raise_for_status()
+            yield response
+
+    async def _request(
+            self,
+            method: HTTPMethods,
+            path: str,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+            json_data: dict[str, Any] | None = None,
+            data: str | bytes | dict[str, Any] | None = None,
+            params: dict[str, str] | None = None,
+            allow_redirects: bool = True,
+    ) -> aiohttp.ClientResponse:
+        """
+        Internal method for executing HTTP requests using the persistent ClientSession.
+        The body is read before the connection is released, so `read()`, `text()`
+        and `json()` keep working on the returned response.
+        """
+        async with self._open(
+                method, path, headers=headers, cookies=cookies, json_data=json_data,
+                data=data, params=params, allow_redirects=allow_redirects,
+        ) as response:
+            await response.read()
             return response
 
+    async def stream_bytes(
+            self,
+            method: HTTPMethods,
+            path: str,
+            *,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+            json_data: dict[str, Any] | None = None,
+            data: str | bytes | dict[str, Any] | None = None,
+            params: dict[str, str] | None = None,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields raw body chunks as they arrive (chunked transfer encoding included).
+
+        The socket is read only while the consumer asks for more, so a slow consumer
+        applies backpressure to the upstream. Closing or cancelling the iterator
+        (use `contextlib.aclosing` when breaking out early) releases the connection.
+
+        Raises TimeoutError when the first byte or the next chunk is late, and
+        DeadlineExceededError when `deadline` passes first.
+        """
+        loop = asyncio.get_running_loop()
+        first_byte_timeout = deadline.clamp(self._first_byte_timeout) if deadline else self._first_byte_timeout
+        first_byte_at = None if first_byte_timeout is None else loop.time() + first_byte_timeout
+        try:
+            async with self._open(
+                    method, path, headers=headers, cookies=cookies,
+                    json_data=json_data, data=data, params=params,
+                    client_timeout=self._stream_timeout, headers_at=first_byte_at,
+            ) as response:
+                read = response.content.readany
+                async with asyncio.timeout_at(first_byte_at):
+                    chunk = await read()
+                while chunk:
+                    yield chunk
+                    chunk_timeout = deadline.clamp(self._chunk_timeout) if deadline else self._chunk_timeout
+                    async with asyncio.timeout(chunk_timeout):
+                        chunk = await read()
+        except TimeoutError as e:
+            if deadline is not None and deadline.expired and not isinstance(e, DeadlineExceededError):
+                raise DeadlineExceededError("Request deadline exceeded") from e
+            raise
+
+    async def stream_lines(
+            self,
+            method: HTTPMethods,
+            path: str,
+            *,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+            json_data: dict[str, Any] | None = None,
+            data: str | bytes | dict[str, Any] | None = None,
+            params: dict[str, str] | None = None,
+            max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[str]:
+        """Yields decoded lines of the response body as soon as each line is complete."""
+        async with aclosing(self.stream_bytes(
+            method, path, headers=headers, cookies=cookies,
+            json_data=json_data, data=data, params=params, deadline=deadline,
+        )) as chunks:
+            async for line in iter_lines(chunks, max_line_size):
+                yield line.decode()
+
+    async def stream_sse_events(
+            self,
+            method: HTTPMethods,
+            path: str,
+            *,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+            json_data: dict[str, Any] | None = None,
+            data: str | bytes | dict[str, Any] | None = None,
+            params: dict[str, str] | None = None,
+            max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[SSEEvent]:
+        """Yields Server-Sent Events (text/event-stream) as they are dispatched by the upstream."""
+        async with aclosing(self.stream_bytes(
+            method, path, headers={"Accept": "text/event-stream", **(headers or {})},
+            cookies=cookies, json_data=json_data, data=data, params=params, deadline=deadline,
+        )) as chunks:
+            async for event in iter_sse_events(iter_lines(chunks, max_line_size)):
+                yield event
+
+    async def stream_json_chunks(
+            self,
+            method: HTTPMethods,
+            path: str,
+            *,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+            json_data: dict[str, Any] | None = None,
+            data: str | bytes | dict[str, Any] | None = None,
+            params: dict[str, str] | None = None,
+            max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[Any]:
+        """Yields parsed documents of a newline delimited JSON response as they arrive."""
+        async with aclosing(self.stream_bytes(
+            method, path, headers=headers, cookies=cookies,
+            json_data=json_data, data=data, params=params, deadline=deadline,
+        )) as chunks:
+            async for document in iter_json_lines(iter_lines(chunks, max_line_size)):
+                yield document
+
     async def get(
             self,
             path: str,
@@ -161,6 +331,10 @@ class AIHttpClient:
         )
 
 
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
     async def close(self) -> None:
         """
         Explicitly closes the underlying aiohttp.ClientSession.
@@ -0,0 +1,147 @@
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from contextlib import aclosing
+
+from aiohttp import ClientResponseError
+from yarl import URL
+
+from src.core.ModelGateway.adapters import ChatMessage, get_adapter
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.core.ModelGateway.limiter import EndpointLimiterRegistry, QueuedCallback, endpoint_limiters
+from src.core.ModelGateway.registry import AIHttpClientRegistry, ai_client_registry
+from src.core.ModelGateway.resilience import ResilientStreamer, resilient_streamer
+from src.core.ModelGateway.response_cache import ResponseCache, request_key, response_cache
+from src.tables.integration_ai import IntegrationAIDTO
+from src.utils.deadline import Deadline
+
+# Index is the value stored in 'integration_ai.http_method'
+HTTP_METHODS_BY_VALUE: tuple[HTTPMethods, ...] = (
+    HTTPMethods.GET,
+    HTTPMethods.POST,
+    HTTPMethods.PUT,
+    HTTPMethods.DELETE,
+    HTTPMethods.PATCH,
+)
+
+# Safe to send twice: requests of other methods, chat completions included, may be billed twice
+IDEMPOTENT_METHODS = frozenset({HTTPMethods.GET, HTTPMethods.PUT, HTTPMethods.DELETE})
+
+AUTH_NONE, AUTH_COOKIES, AUTH_HEADERS = 0, 1, 2 # 'integration_ai.auth_type'
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """Splits an endpoint URL into the origin (session base URL) and the path with query."""
+    parsed = URL(url)
+    return str(parsed.origin()), parsed.raw_path_qs
+
+
+def auth_from_integration(integration: IntegrationAIDTO) -> tuple[dict[str, str], dict[str, str]]:
+    """Returns (headers, cookies) built from the stored 'auth_creds'."""
+    creds = integration.auth_creds
+    if not creds or integration.auth_type == AUTH_NONE:
+        return {}, {}
+    if integration.auth_type == AUTH_COOKIES:
+        key, _, value = creds.partition("=")
+        return {}, {key.strip(): value.strip()}
+    key, _, value = creds.partition(" ")
+    return {key.strip(): value.strip()}, {}
+
+
+class ModelGateway:
+    """Entry point for querying user-registered LLM endpoints."""
+
+    def __init__(
+            self,
+            registry: AIHttpClientRegistry = ai_client_registry,
+            limiters: EndpointLimiterRegistry = endpoint_limiters,
+            streamer: ResilientStreamer = resilient_streamer,
+            cache: ResponseCache = response_cache,
+    ) -> None:
+        self._registry = registry
+        self._limiters = limiters
+        self._streamer = streamer
+        self._cache = cache
+
+    async def stream_text(
+            self,
+            integration: IntegrationAIDTO,
+            messages: Sequence[ChatMessage],
+            on_queued: QueuedCallback | None = None,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Sends the messages (history followed by the prompt) in the dialect of the
+        integration (see `adapters`) and yields the answer text as it arrives.
+
+        Requests are limited per endpoint origin, `on_queued` is awaited with the queue
+        position when the endpoint is busy. Raises EndpointOverloadedError when shed.
+        Failures before the first byte are retried and slow answers hedged, each attempt
+        with a slot of its own. POST and PATCH requests are only retried when the endpoint
+        refused them (429/503) and never hedged, see `IDEMPOTENT_METHODS`.
+        Raises CircuitOpenError right away while the endpoint is considered down.
+        Queueing, retries and reads all stop at `deadline`.
+
+        With the response cache enabled, answers to identical requests are replayed
+        and concurrent identical requests share one upstream call (see `response_cache`).
+        That call has no deadline of its own, each request stops reading it at `deadline`.
+        """
+        if not self._cache.enabled:
+            async for text in self._fetch(integration, messages, on_queued, deadline):
+                yield text
+            return
+
+        key = request_key(integration, messages)
+        async for text in self._cache.stream(
+                key,
+                integration.id,
+                lambda announce: self._fetch(integration, messages, announce),
+                on_queued,
+                deadline,
+        ):
+            yield text
+
+    async def _fetch(
+            self,
+            integration: IntegrationAIDTO,
+            messages: Sequence[ChatMessage],
+            on_queued: QueuedCallback | None = None,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[str]:
+        base_url, path = split_url(integration.url)
+        headers, cookies = auth_from_integration(integration)
+        method = HTTP_METHODS_BY_VALUE[integration.http_method]
+
+        adapter = get_adapter(integration.dialect, URL(integration.url).path)
+        request = adapter.build_request(method, messages, integration.model).as_kwargs()
+
+        self._streamer.breaker(base_url).check(reserve_probe=False) # fail fast before queueing
+        limiter = self._limiters.get(base_url)
+        queue_deadline = asyncio.get_running_loop().time() + self._limiters.max_wait
+        if deadline is not None:
+            queue_deadline = min(queue_deadline, deadline.loop_time())
+        async with self._registry.lease(base_url, headers, cookies) as client:
+            async def attempt() -> AsyncIterator[bytes]:
+                try:
+                    chunks = client.stream_bytes(method, path, deadline=deadline, **request)
+                    async with aclosing(chunks):
+                        async for chunk in chunks:
+                            yield chunk
+                except ClientResponseError as e:
+                    limiter.observe(e.status, e.headers)
+                    raise
+
+            body = self._streamer.stream(
+                base_url,
+                attempt,
+                idempotent=method in IDEMPOTENT_METHODS,
+                deadline=deadline,
+                limiter=limiter,
+                queue_deadline=queue_deadline,
+                on_queued=on_queued,
+            )
+            async with aclosing(body):
+                async for text in adapter.parse_stream(body):
+                    yield text
+
+
+model_gateway = ModelGateway()
@@ -0,0 +1,275 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+from src.core.config import config
+
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+DEFAULT_RETRY_AFTER = 1.0 # seconds, when a 429 comes without Retry-After
+
+type QueuedCallback = Callable[[int], Awaitable[None]]
+
+
+class EndpointOverloadedError(Exception):
+    """Base class of the errors raised when the limiter sheds a request."""
+
+
+class EndpointQueueFullError(EndpointOverloadedError):
+    """Raised when the wait queue of the endpoint is full."""
+
+
+class EndpointQueueTimeoutError(EndpointOverloadedError, TimeoutError):
+    """Raised when a request could not get a slot before its deadline."""
+
+
+@dataclass(frozen=True)
+class LimiterState:
+    in_flight: int
+    max_in_flight: int
+    queued: int
+    max_queue: int
+    tokens: float
+    blocked_for: float # seconds left of an upstream Retry-After
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header, given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class EndpointLimiter:
+    """
+    Concurrency limiter and rate shaper of one upstream endpoint.
+
+    A request needs a free in-flight slot (at most `max_in_flight`) and a token
+    from a bucket refilled at `rate` per second up to `burst`. Requests that cannot
+    start right away wait in a FIFO queue of at most `max_queue` entries and are shed
+    once their deadline passes. A Retry-After from the upstream pauses the endpoint.
+    """
+
+    def __init__(
+            self,
+            max_in_flight: int = 4,
+            rate: float = 0.0,
+            burst: int = 1,
+            max_queue: int = 32,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("'max_in_flight' must be at least 1")
+        self._max_in_flight = max_in_flight
+        self._rate = rate # <= 0 disables rate shaping
+        self._burst = max(1, burst)
+        self._max_queue = max_queue
+
+        self._in_flight = 0
+        self._tokens = float(self._burst)
+        self._refilled_at: float | None = None
+        self._blocked_until = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def _refill(self, now: float) -> None:
+        if self._rate <= 0:
+            self._tokens = float(self._burst)
+        elif self._refilled_at is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a request may start, ignoring the in-flight limit."""
+        self._refill(now)
+        token_wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+        return max(self._blocked_until - now, token_wait)
+
+    def _grant(self) -> None:
+        self._tokens -= 1
+        self._in_flight += 1
+
+    def _dispatch(self) -> None:
+        """Hands slots to queued requests in FIFO order."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters and self._in_flight < self._max_in_flight:
+            waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            now = self._now()
+            wait = self._wait_time(now)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_at(now + wait, self._dispatch)
+                return
+            self._waiters.popleft()
+            self._grant()
+            waiter.set_result(None)
+
+    def position(self, waiter: asyncio.Future) -> int:
+        """1-based queue position of a waiter, 0 if it is not queued."""
+        try:
+            return self._waiters.index(waiter) + 1
+        except ValueError:
+            return 0
+
+    def try_acquire(self) -> bool:
+        """Takes a slot only if one is free right now and no request is queued for it."""
+        if self._waiters or self._in_flight >= self._max_in_flight or self._wait_time(self._now()) > 0:
+            return False
+        self._grant()
+        return True
+
+    async def acquire(
+            self,
+            deadline: float | None = None,
+            on_queued: QueuedCallback | None = None,
+    ) -> None:
+        """
+        Takes a slot, waiting in the queue if needed.
+
+        Args:
+            deadline: Event loop time after which the request is shed, None waits forever.
+            on_queued: Awaited with the queue position when the request has to wait.
+        """
+        if self.try_acquire():
+            return
+
+        if len(self._waiters) >= self._max_queue:
+            raise EndpointQueueFullError(f"Endpoint queue is full ({self._max_queue} waiting)")
+        if deadline is not None and self._blocked_until >= deadline:
+            raise EndpointQueueTimeoutError("Endpoint is paused by Retry-After past the request deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._timer is None:
+            self._dispatch()
+        try:
+            if on_queued is not None and not waiter.done():
+                await on_queued(self.position(waiter))
+            async with asyncio.timeout_at(deadline):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release() # granted while we were leaving
+            else:
+                # Left the queue: it must not count toward max_queue or the positions of the others
+                waiter.cancel()
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+                self._dispatch()
+            if isinstance(e, TimeoutError):
+                raise EndpointQueueTimeoutError("No endpoint slot before the request deadline") from e
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+            self,
+            deadline: float | None = None,
+            on_queued: QueuedCallback | None = None,
+    ) -> AsyncIterator[None]:
+        await self.acquire(deadline, on_queued)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def penalize(self, retry_after: float) -> None:
+        """Pauses the endpoint for `retry_after` seconds."""
+        self._blocked_until = max(self._blocked_until, self._now() + retry_after)
+
+    def observe(self, status: int, headers: Mapping[str, str] | None = None) -> None:
+        """Honors Retry-After of upstream 429/503 responses."""
+        if status not in RETRY_AFTER_STATUSES:
+            return
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+        if retry_after is None and status == 429: # noqa: PLR2004
+            retry_after = DEFAULT_RETRY_AFTER
+        if retry_after:
+            self.penalize(retry_after)
+
+    @property
+    def idle(self) -> bool:
+        return not self._in_flight and not self._waiters and self._blocked_until <= self._now()
+
+    def state(self) -> LimiterState:
+        now = self._now()
+        self._refill(now)
+        return LimiterState(
+            in_flight=self._in_flight,
+            max_in_flight=self._max_in_flight,
+            queued=sum(not waiter.done() for waiter in self._waiters),
+            max_queue=self._max_queue,
+            tokens=self._tokens,
+            blocked_for=max(0.0, self._blocked_until - now),
+        )
+
+
+class EndpointLimiterRegistry:
+    """Limiters keyed by endpoint (origin of the integration URL), created on first use."""
+
+    PRUNE_THRESHOLD = 1024
+
+    def __init__(
+            self,
+            max_in_flight: int = 4,
+            rate: float = 0.0,
+            burst: int = 1,
+            max_queue: int = 32,
+            max_wait: float = 30.0,
+    ) -> None:
+        self._max_in_flight = max_in_flight
+        self._rate = rate
+        self._burst = burst
+        self._max_queue = max_queue
+        self.max_wait = max_wait # default queue deadline, seconds
+        self._limiters: dict[str, EndpointLimiter] = {}
+
+    def get(self, key: str) -> EndpointLimiter:
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            if len(self._limiters) >= self.PRUNE_THRESHOLD:
+                self._prune()
+            limiter = self._limiters[key] = EndpointLimiter(
+                max_in_flight=self._max_in_flight,
+                rate=self._rate,
+                burst=self._burst,
+                max_queue=self._max_queue,
+            )
+        return limiter
+
+    def _prune(self) -> None:
+        for key in [key for key, limiter in self._limiters.items() if limiter.idle]:
+            del self._limiters[key]
+
+    def state(self, key: str) -> LimiterState | None:
+        limiter = self._limiters.get(key)
+        return limiter.state() if limiter else None
+
+
+endpoint_limiters = EndpointLimiterRegistry(
+    max_in_flight=config.gateway.max_in_flight,
+    rate=config.gateway.rate,
+    burst=config.gateway.burst,
+    max_queue=config.gateway.max_queue,
+    max_wait=config.gateway.max_queue_wait,
+)
@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from logging import getLogger
+
+import aiohttp
+
+from src.core.config import config
+from src.core.ModelGateway.ai_http_client import AIHttpClient
+
+logger = getLogger(__name__)
+
+type ClientKey = tuple[str, tuple[tuple[str, str], ...], tuple[tuple[str, str], ...]]
+
+
+@dataclass(slots=True)
+class _ClientEntry:
+    client: AIHttpClient
+    last_used: float
+    leases: int = 0
+
+
+class AIHttpClientRegistry:
+    """
+    Process-wide registry of AIHttpClient instances keyed by (origin, auth profile).
+
+    All clients share one tuned TCPConnector, so keep-alive connections, TLS sessions
+    and DNS results are reused across requests and across users of the same provider.
+    A client keeps its own cookie jar, which is why the auth profile is part of the key.
+    Clients unused for `idle_timeout` seconds are closed by a background sweeper.
+    """
+
+    def __init__(
+            self,
+            limit: int = 100,
+            limit_per_host: int = 0,
+            ttl_dns_cache: int = 10,
+            keepalive_timeout: float = 15.0,
+            idle_timeout: float = 600.0,
+            sweep_interval: float = 60.0,
+            connect_timeout: float | None = None,
+            first_byte_timeout: float | None = None,
+            chunk_timeout: float | None = None,
+    ) -> None:
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._ttl_dns_cache = ttl_dns_cache
+        self._keepalive_timeout = keepalive_timeout
+        self._idle_timeout = idle_timeout
+        self._sweep_interval = sweep_interval
+        self._connect_timeout = connect_timeout
+        self._first_byte_timeout = first_byte_timeout
+        self._chunk_timeout = chunk_timeout
+
+        self._connector: aiohttp.TCPConnector | None = None
+        self._clients: dict[ClientKey, _ClientEntry] = {}
+        self._sweeper: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=self._ttl_dns_cache,
+                use_dns_cache=True,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+        return self._connector
+
+    @staticmethod
+    def _key(base_url: str, headers: dict[str, str], cookies: dict[str, str]) -> ClientKey:
+        return base_url, tuple(sorted(headers.items())), tuple(sorted(cookies.items()))
+
+    def _entry(
+            self,
+            base_url: str,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+    ) -> _ClientEntry:
+        headers, cookies = headers or {}, cookies or {}
+        key = self._key(base_url, headers, cookies)
+        entry = self._clients.get(key)
+        if entry is None or entry.client.closed:
+            client = AIHttpClient(
+                base_url=base_url,
+                headers=headers,
+                cookies=cookies,
+                connector=self._get_connector(),
+                connect_timeout=self._connect_timeout,
+                first_byte_timeout=self._first_byte_timeout,
+                chunk_timeout=self._chunk_timeout,
+            )
+            entry = self._clients[key] = _ClientEntry(client, last_used=0.0)
+        entry.last_used = asyncio.get_running_loop().time()
+        return entry
+
+    def get(
+            self,
+            base_url: str,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+    ) -> AIHttpClient:
+        """Returns the shared client of the origin and auth profile, do not close it."""
+        return self._entry(base_url, headers, cookies).client
+
+    @asynccontextmanager
+    async def lease(
+            self,
+            base_url: str,
+            headers: dict[str, str] | None = None,
+            cookies: dict[str, str] | None = None,
+    ) -> AsyncIterator[AIHttpClient]:
+        """Same as `get`, but the client is never evicted while leased (e.g. during a long stream)."""
+        entry = self._entry(base_url, headers, cookies)
+        entry.leases += 1
+        try:
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            entry.last_used = asyncio.get_running_loop().time()
+
+    async def evict_idle(self) -> int:
+        """Closes clients that are not leased and were unused for `idle_timeout` seconds."""
+        now = asyncio.get_running_loop().time()
+        idle = [
+            key for key, entry in self._clients.items()
+            if not entry.leases and now - entry.last_used >= self._idle_timeout
+        ]
+        for key in idle:
+            await self._clients.pop(key).client.close()
+        return len(idle)
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            try:
+                if evicted := await self.evict_idle():
+                    logger.debug(f"Closed {evicted} idle AI http clients")
+            except Exception as e:
+                logger.error(f"Evicting idle AI http clients failed: {e}")
+
+    async def start(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep(), name="ai-http-client-sweeper")
+
+    async def close(self) -> None:
+        """Stops the sweeper, closes every client and the shared connector."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+        clients, self._clients = self._clients, {}
+        for entry in clients.values():
+            await entry.client.close()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+
+ai_client_registry = AIHttpClientRegistry(
+    limit=config.gateway.connection_limit,
+    limit_per_host=config.gateway.connection_limit_per_host,
+    ttl_dns_cache=config.gateway.dns_cache_ttl,
+    keepalive_timeout=config.gateway.keepalive_timeout,
+    idle_timeout=config.gateway.client_idle_timeout,
+    connect_timeout=config.gateway.connect_timeout,
+    first_byte_timeout=config.gateway.first_byte_timeout,
+    chunk_timeout=config.gateway.chunk_timeout,
+)
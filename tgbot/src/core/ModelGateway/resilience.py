@@ -0,0 +1,359 @@
+import asyncio
+import random
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from enum import IntEnum
+from logging import getLogger
+
+import aiohttp
+
+from src.core.config import config
+from src.core.metrics import metrics
+from src.core.ModelGateway.limiter import EndpointLimiter, QueuedCallback, parse_retry_after
+from src.utils.deadline import Deadline, DeadlineExceededError
+
+logger = getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+NOT_PROCESSED_STATUSES = frozenset({429, 503}) # the upstream refused the request, safe to resend
+SERVER_ERROR = 500
+
+type StreamFactory = Callable[[], AsyncIterator[bytes]]
+
+retries_total = metrics.counter("gateway_retries_total", "Retried LLM endpoint requests")
+hedges_total = metrics.counter("gateway_hedges_total", "Hedged LLM endpoint requests")
+hedge_wins_total = metrics.counter("gateway_hedge_wins_total", "Hedged requests answered by the hedge")
+breaker_state = metrics.gauge("gateway_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open")
+breaker_rejections_total = metrics.counter(
+    "gateway_breaker_rejections_total", "Requests rejected by an open circuit breaker",
+)
+
+
+class CircuitState(IntEnum):
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+def is_breaker_failure(error: BaseException) -> bool:
+    """Errors that tell the endpoint itself is down (refused/reset connections, timeouts, 5xx)."""
+    if isinstance(error, DeadlineExceededError):
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= SERVER_ERROR
+    return isinstance(error, (aiohttp.ClientConnectionError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls fail
+    fast with CircuitOpenError. After `recovery_timeout` seconds one probe call is let
+    through (half-open): its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.open and self._now() - self._opened_at >= self._recovery_timeout:
+            self._set_state(CircuitState.half_open)
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state != self._state:
+            logger.info(f"Circuit breaker of {self.name}: {self._state.name} -> {state.name}")
+        self._state = state
+        breaker_state.set(state, endpoint=self.name)
+
+    def check(self, reserve_probe: bool = True) -> None:
+        """
+        Raises CircuitOpenError if a call is not allowed right now.
+        With `reserve_probe=False` the half-open probe is not taken (a pre-check).
+        """
+        state = self.state
+        if state == CircuitState.closed:
+            return
+        now = self._now()
+        if state == CircuitState.half_open and (
+            self._probe_started_at is None or now - self._probe_started_at >= self._recovery_timeout
+        ):
+            if reserve_probe:
+                self._probe_started_at = now
+            return
+        breaker_rejections_total.inc(endpoint=self.name)
+        raise CircuitOpenError(f"Circuit breaker of {self.name} is {state.name}")
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_started_at = None
+        self._set_state(CircuitState.closed)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.half_open or self._failures >= self._failure_threshold:
+            self._opened_at = self._now()
+            self._probe_started_at = None
+            self._set_state(CircuitState.open)
+
+
+class LatencyTracker:
+    """Sliding window of time-to-first-byte samples of one endpoint."""
+
+    def __init__(self, window: int = 100) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, quantile: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class RetryPolicy:
+    """Decides which failures are retried and how long to back off (full jitter)."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 5.0) -> None:
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(error: BaseException, idempotent: bool) -> bool:
+        """
+        Idempotent requests are retried on connection errors, timeouts and 429/502/503/504.
+        Other requests only when the upstream surely did not process them.
+        """
+        if isinstance(error, DeadlineExceededError):
+            return False
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in (RETRYABLE_STATUSES if idempotent else NOT_PROCESSED_STATUSES)
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        return idempotent and isinstance(error, (aiohttp.ClientConnectionError, TimeoutError))
+
+    def backoff(self, attempt: int, error: BaseException | None = None) -> float | None:
+        """Delay before retry number `attempt` (1-based), None if Retry-After asks for too long."""
+        delay = random.uniform(0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1))) # noqa: S311
+        if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+            retry_after = parse_retry_after(error.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self._max_delay:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+
+
+class ResilientStreamer:
+    """
+    Opens streaming requests with retries, hedging and per-endpoint circuit breakers.
+
+    Only the part before the first byte is retried or hedged: once a chunk was yielded,
+    the answer cannot be replayed. A hedge is a second attempt started when the first
+    one has not answered within the p95 time-to-first-byte of the endpoint, the attempt
+    answering first wins and the other one is cancelled.
+
+    With an endpoint limiter every attempt holds a slot of its own until its stream is
+    closed: retries wait for one in the queue, a hedge is skipped when none is free.
+    """
+
+    def __init__(
+            self,
+            retry_policy: RetryPolicy | None = None,
+            failure_threshold: int = 5,
+            recovery_timeout: float = 30.0,
+            hedge_min_samples: int = 20,
+            hedge_min_delay: float = 0.5,
+    ) -> None:
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._hedge_min_samples = hedge_min_samples
+        self._hedge_min_delay = hedge_min_delay
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, LatencyTracker] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(
+                endpoint, self._failure_threshold, self._recovery_timeout,
+            )
+        return breaker
+
+    def latency(self, endpoint: str) -> LatencyTracker:
+        tracker = self._latencies.get(endpoint)
+        if tracker is None:
+            tracker = self._latencies[endpoint] = LatencyTracker()
+        return tracker
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """p95 time-to-first-byte, None until enough samples are collected."""
+        tracker = self.latency(endpoint)
+        if len(tracker) < self._hedge_min_samples:
+            return None
+        return max(self._hedge_min_delay, tracker.percentile(0.95))
+
+    @staticmethod
+    async def _first_chunk(stream: AsyncIterator[bytes]) -> bytes | None:
+        return await anext(stream, None)
+
+    @staticmethod
+    async def _close(stream: AsyncIterator[bytes], limiter: EndpointLimiter | None) -> None:
+        """Closes a losing or failed attempt and releases its slot."""
+        try:
+            with suppress(Exception):
+                await stream.aclose()
+        finally:
+            if limiter is not None:
+                limiter.release()
+
+    async def _race(
+            self,
+            endpoint: str,
+            factory: StreamFactory,
+            hedge_delay: float | None,
+            limiter: EndpointLimiter | None = None,
+    ) -> tuple[AsyncIterator[bytes], bytes | None]:
+        """
+        Returns the stream that produced its first chunk first, with that chunk.
+        The first attempt comes with a limiter slot taken by the caller, which also
+        releases the slot of the returned stream. The other slots are released here.
+        """
+        attempts: dict[asyncio.Task, AsyncIterator[bytes]] = {}
+
+        def launch() -> asyncio.Task:
+            stream = factory()
+            task = asyncio.create_task(self._first_chunk(stream))
+            attempts[task] = stream
+            return task
+
+        launch()
+        hedge: asyncio.Task | None = None
+        error: BaseException | None = None
+        try:
+            while attempts:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_delay = None # one hedge at most
+                    if limiter is None or limiter.try_acquire():
+                        hedges_total.inc(endpoint=endpoint)
+                        hedge = launch()
+                    continue
+                for task in done:
+                    stream = attempts.pop(task)
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedge_wins_total.inc(endpoint=endpoint)
+                        return stream, task.result()
+                    error = task.exception()
+                    await self._close(stream, limiter)
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            for stream in attempts.values():
+                await self._close(stream, limiter)
+
+    async def stream(
+            self,
+            endpoint: str,
+            factory: StreamFactory,
+            idempotent: bool = True,
+            deadline: Deadline | None = None,
+            *,
+            limiter: EndpointLimiter | None = None,
+            queue_deadline: float | None = None,
+            on_queued: QueuedCallback | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the body of the request made by `factory`, which must return a new
+        stream each time it is called. Raises CircuitOpenError while the endpoint is down.
+        No retry is started that could not finish its backoff before `deadline`.
+        Requests that are not idempotent are never hedged.
+
+        With a `limiter`, every attempt first takes a slot, queueing until
+        `queue_deadline` (event loop time) and awaiting `on_queued` like `EndpointLimiter.acquire`.
+        """
+        loop = asyncio.get_running_loop()
+        breaker = self.breaker(endpoint)
+        breaker.check()
+        attempt = 0
+        while True:
+            attempt += 1
+            if limiter is not None:
+                await limiter.acquire(queue_deadline, on_queued)
+            started = loop.time()
+            try:
+                stream, first = await self._race(
+                    endpoint, factory, self.hedge_delay(endpoint) if idempotent else None, limiter,
+                )
+            except Exception as e:
+                if is_breaker_failure(e):
+                    breaker.record_failure()
+                policy = self._retry_policy
+                if (
+                    attempt >= policy.max_attempts
+                    or not policy.is_retryable(e, idempotent)
+                    or breaker.state == CircuitState.open
+                ):
+                    raise
+                delay = policy.backoff(attempt, e)
+                if delay is None or (deadline is not None and delay >= deadline.remaining()):
+                    raise
+                retries_total.inc(endpoint=endpoint)
+                logger.debug(f"Retrying {endpoint} in {delay:.2f}s after {e!r}")
+                await asyncio.sleep(delay)
+                continue
+            break
+
+        breaker.record_success()
+        self.latency(endpoint).observe(loop.time() - started)
+        try:
+            if first is not None:
+                yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            try:
+                await stream.aclose()
+            finally:
+                if limiter is not None:
+                    limiter.release()
+
+
+resilient_streamer = ResilientStreamer(
+    retry_policy=RetryPolicy(
+        max_attempts=config.gateway.retry_attempts,
+        base_delay=config.gateway.retry_base_delay,
+        max_delay=config.gateway.retry_max_delay,
+    ),
+    failure_threshold=config.gateway.breaker_failure_threshold,
+    recovery_timeout=config.gateway.breaker_recovery_timeout,
+    hedge_min_samples=config.gateway.hedge_min_samples,
+    hedge_min_delay=config.gateway.hedge_min_delay,
+)
@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import time
+import unicodedata
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import suppress
+from logging import getLogger
+
+import orjson
+
+from src.core.config import config
+from src.core.db.pool import sqlite_pool
+from src.core.db.writer import sqlite_writer
+from src.core.metrics import metrics
+from src.core.ModelGateway.adapters import ChatMessage
+from src.core.ModelGateway.limiter import QueuedCallback
+from src.repository.response_cache import ResponseCacheRepository
+from src.tables.integration_ai import IntegrationAIDTO
+from src.tables.response_cache import ResponseCacheDTO, ResponseCacheInputDTO
+from src.utils.cache import TTLCache
+from src.utils.deadline import Deadline, DeadlineExceededError
+from src.utils.single_flight import SingleFlight
+
+logger = getLogger(__name__)
+
+REPLAY_CHUNK_CHARS = 512 # cached answers are replayed in chunks, like a streamed answer
+PRUNE_EVERY = 100 # writes between two prunes of the database tier
+
+# Called with the callback announcing the queue position of the upstream call to its readers
+type TextStreamFactory = Callable[[QueuedCallback], AsyncIterator[str]]
+
+lookups_total = metrics.counter(
+    "response_cache_lookups_total", "LLM response cache lookups by result: memory, sqlite, coalesced or miss",
+)
+hit_ratio = metrics.gauge("response_cache_hit_ratio", "Share of LLM requests answered without an upstream call")
+bytes_saved_total = metrics.counter(
+    "response_cache_bytes_saved_total", "Bytes of LLM answers served without an upstream call",
+)
+
+
+def normalize(text: str) -> str:
+    """
+    NFC form without trailing whitespace and surrounding blank lines, so trivially
+    different prompts share a key. Line breaks and indentation are kept, they can
+    change the question (code, lists).
+    """
+    lines = unicodedata.normalize("NFC", text).splitlines()
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def request_key(integration: IntegrationAIDTO, messages: Sequence[ChatMessage]) -> str:
+    """
+    "<integration id>:<sha256>" of everything that shapes the request body.
+    URL, method, dialect and model are hashed too, so editing the integration
+    does not replay answers of its previous configuration.
+    """
+    body = orjson.dumps([
+        integration.url,
+        integration.http_method,
+        integration.dialect,
+        integration.model,
+        [(message.role, normalize(message.content)) for message in messages],
+    ])
+    return f"{integration.id}:{hashlib.sha256(body).hexdigest()}"
+
+
+async def replay(text: str) -> AsyncIterator[str]:
+    for start in range(0, len(text), REPLAY_CHUNK_CHARS):
+        yield text[start:start + REPLAY_CHUNK_CHARS]
+
+
+class SharedStream:
+    """Chunks of one upstream answer, read by every request waiting for it."""
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.readers = 0
+        self.task: asyncio.Task | None = None
+        self.position = 0 # in the endpoint queue, while the upstream call waits there
+        self._listeners: list[QueuedCallback] = []
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def publish(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    async def announce(self, position: int) -> None:
+        """Hands the queue position of the upstream call to every reader, one failing does not stop the rest."""
+        self.position = position
+        results = await asyncio.gather(
+            *(listener(position) for listener in self._listeners), return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Announcing queue position {position} failed: {result!r}")
+
+    async def listen(self, on_queued: QueuedCallback) -> None:
+        """Adds a reader callback, a reader joining while the call is queued gets its position right away."""
+        self._listeners.append(on_queued)
+        if self.position and not self.chunks and not self.done:
+            await on_queued(self.position)
+
+    def forget(self, on_queued: QueuedCallback) -> None:
+        with suppress(ValueError):
+            self._listeners.remove(on_queued)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def read(self, deadline: Deadline | None = None) -> AsyncIterator[str]:
+        """
+        Yields every chunk from the first one, raises the error of the upstream call,
+        or DeadlineExceededError when `deadline` passes while waiting for a chunk.
+        """
+        index = 0
+        while True:
+            if index < len(self.chunks):
+                index += 1
+                yield self.chunks[index - 1]
+                continue
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            try:
+                async with asyncio.timeout_at(deadline.loop_time() if deadline else None):
+                    await self._changed.wait()
+            except TimeoutError as e:
+                raise DeadlineExceededError("Request deadline exceeded") from e
+
+
+class ResponseCache:
+    """
+    Opt-in cache of complete LLM answers with two tiers: an in-memory LRU
+    and a SQLite table that survives restarts, both bounded by TTL and size.
+
+    Identical requests made while an answer is being streamed are coalesced:
+    they read the chunks of the same upstream call instead of starting another one.
+    """
+
+    def __init__(
+            self,
+            repository: ResponseCacheRepository,
+            ttl: float,
+            max_size: int,
+            max_rows: int,
+            max_chars: int,
+            clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._repository = repository
+        self._ttl = ttl
+        self._max_rows = max_rows
+        self._max_chars = max_chars
+        self._clock = clock
+        # Entries carry their own expiry (unix time), shared with the database tier
+        self._memory: TTLCache[str, tuple[float, str, int]] = TTLCache(max_size=max_size, ttl=max(ttl, 1.0))
+        self._in_flight: dict[str, SharedStream] = {}
+        self._reads: SingleFlight[str, ResponseCacheDTO | None] = SingleFlight("response_cache_get")
+        self._writes = 0
+        self._hits = 0
+        self._lookups = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def _count(self, result: str, size: int = 0) -> None:
+        self._lookups += 1
+        lookups_total.inc(result=result)
+        if result != "miss":
+            self._hits += 1
+            bytes_saved_total.inc(size) # coalesced answers are counted once they are complete
+        hit_ratio.set(self._hits / self._lookups)
+
+    async def get(self, key: str) -> tuple[str, str, int] | None:
+        """Returns (tier, answer, size in bytes) of a live entry."""
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, text, size = entry
+            if expires_at > now:
+                return "memory", text, size
+            self._memory.pop(key)
+
+        row = await self._reads.do(key, lambda: self._repository.get_live(key, now))
+        if row is None:
+            return None
+        self._memory.set(key, (row.expires_at, row.body, row.size))
+        return "sqlite", row.body, row.size
+
+    async def set(self, key: str, integration_id: int, text: str) -> None:
+        if not text or len(text) > self._max_chars:
+            return
+        now = self._clock()
+        size = len(text.encode())
+        self._memory.set(key, (now + self._ttl, text, size))
+        await self._repository.add(
+            ResponseCacheInputDTO(
+                key=key,
+                integration_id=integration_id,
+                body=text,
+                size=size,
+                created_at=now,
+                expires_at=now + self._ttl,
+            ),
+        )
+        self._reads.forget(key)
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            await self._repository.prune(now, self._max_rows)
+
+    async def _produce(
+            self,
+            key: str,
+            integration_id: int,
+            shared: SharedStream,
+            fetch: TextStreamFactory,
+    ) -> None:
+        try:
+            async for chunk in fetch(shared.announce):
+                shared.publish(chunk)
+        except asyncio.CancelledError as e:
+            shared.finish(e)
+            raise
+        except Exception as e: # handed to every reader of the stream
+            shared.finish(e)
+            return
+        finally:
+            self._in_flight.pop(key, None)
+
+        shared.finish()
+        try:
+            await self.set(key, integration_id, "".join(shared.chunks))
+        except Exception as e: # the answer was delivered, caching is best effort
+            logger.warning(f"Caching LLM answer {key} failed: {e!r}")
+
+    async def stream(
+            self,
+            key: str,
+            integration_id: int,
+            fetch: TextStreamFactory,
+            on_queued: QueuedCallback | None = None,
+            deadline: Deadline | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yields the cached answer of `key`, the answer being fetched by an identical
+        request, or starts `fetch` and caches its answer once it is complete.
+
+        The upstream call runs in its own task, belongs to no request and is cancelled
+        only when every request reading it has gone away. Its queue position is
+        announced to the `on_queued` of every reader, and each reader stops at its own
+        `deadline`, so the call lasts at most until the latest one.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            tier, text, size = cached
+            self._count(tier, size)
+            async for chunk in replay(text):
+                yield chunk
+            return
+
+        shared = self._in_flight.get(key)
+        coalesced = shared is not None
+        if shared is None:
+            self._count("miss")
+            shared = self._in_flight[key] = SharedStream()
+            shared.task = asyncio.create_task(self._produce(key, integration_id, shared, fetch))
+        else:
+            self._count("coalesced")
+
+        shared.readers += 1
+        try:
+            if on_queued is not None:
+                await shared.listen(on_queued)
+            async for chunk in shared.read(deadline):
+                yield chunk
+            if coalesced:
+                bytes_saved_total.inc(sum(len(chunk.encode()) for chunk in shared.chunks))
+        finally:
+            if on_queued is not None:
+                shared.forget(on_queued)
+            shared.readers -= 1
+            if not shared.readers and not shared.done and shared.task is not None:
+                shared.task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await shared.task
+
+
+response_cache = ResponseCache(
+    ResponseCacheRepository(sqlite_pool.get_async_session, sqlite_writer),
+    ttl=config.cache.response_ttl,
+    max_size=config.cache.response_max_size,
+    max_rows=config.cache.response_max_rows,
+    max_chars=config.cache.response_max_chars,
+)
@@ -0,0 +1,79 @@
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+DEFAULT_MAX_LINE_SIZE = 1024 * 1024 # 1 MB
+
+
+@dataclass(frozen=True, slots=True)
+class SSEEvent:
+    """A dispatched Server-Sent Event."""
+    data: str
+    event: str = "message"
+    id: str | None = None
+    retry: int | None = None
+
+
+async def iter_lines(
+        chunks: AsyncIterable[bytes],
+        max_line_size: int = DEFAULT_MAX_LINE_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Splits a byte stream into lines as chunks arrive.
+    Line terminators ('\\n', '\\r\\n') are stripped, a trailing line without terminator is yielded too.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end # noqa: PLR2004, '\r'
+            yield bytes(buffer[start:line_end])
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_size:
+            raise ValueError(f"Line exceeds {max_line_size} bytes")
+    if buffer:
+        yield bytes(buffer.removesuffix(b"\r"))
+
+
+async def iter_sse_events(lines: AsyncIterable[bytes]) -> AsyncIterator[SSEEvent]:
+    """Parses Server-Sent Events (text/event-stream) from a stream of lines."""
+    data: list[str] = []
+    event = ""
+    last_id: str | None = None
+    retry: int | None = None
+
+    async for raw_line in lines:
+        if not raw_line:
+            if data:
+                yield SSEEvent(data="\n".join(data), event=event or "message", id=last_id, retry=retry)
+            data, event, retry = [], "", None
+            continue
+
+        line = raw_line.decode()
+        if line.startswith(":"): # comment / keep-alive
+            continue
+        field, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id" and "\0" not in value:
+            last_id = value
+        elif field == "retry" and value.isdigit():
+            retry = int(value)
+
+    if data:
+        yield SSEEvent(data="\n".join(data), event=event or "message", id=last_id, retry=retry)
+
+
+async def iter_json_lines(lines: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Parses newline delimited JSON (one document per line), blank lines are skipped."""
+    async for line in lines:
+        if line.strip():
+            yield orjson.loads(line)
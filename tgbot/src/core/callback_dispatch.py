@@ -0,0 +1,157 @@
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any
+
+from aiogram import Dispatcher, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters.callback_data import CallbackQueryFilter
+from aiogram.types import CallbackQuery
+
+from src.core.metrics import metrics
+from src.keyboards.codec import CompactCallbackData, unpack
+
+logger = getLogger(__name__)
+
+CALLBACK_QUERY = "callback_query"
+
+callback_queries_total = metrics.counter(
+    "callback_queries_total", "Callback queries by route: indexed (by callback class) or unknown data",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedHandler:
+    router: Router
+    observer: TelegramEventObserver
+    handler: HandlerObject
+
+
+def iter_routers(router: Router) -> Iterator[Router]:
+    """`router` and its sub-routers, in the order events are propagated to them."""
+    yield router
+    for sub_router in router.sub_routers:
+        yield from iter_routers(sub_router)
+
+
+def handler_callback_class(handler: HandlerObject) -> type[CompactCallbackData] | None:
+    """Callback class the handler filters on, None when it may take any callback query."""
+    for filter_object in handler.filters or ():
+        callback_filter = filter_object.callback
+        if isinstance(callback_filter, CallbackQueryFilter) and issubclass(
+            callback_filter.callback_data, CompactCallbackData,
+        ):
+            return callback_filter.callback_data
+    return None
+
+
+class CallbackIndex:
+    """
+    Callback query handlers of a router tree, by the callback class they filter on.
+
+    The handlers of a class keep their propagation order, and handlers without a
+    callback filter (e.g. a catch-all) are part of every class, so trying them in
+    turn picks the same handler as propagating through the routers.
+    """
+
+    def __init__(self, handlers: Mapping[type[CompactCallbackData] | None, tuple[IndexedHandler, ...]]) -> None:
+        self._handlers = handlers
+
+    @classmethod
+    def build(cls, root: Router) -> "CallbackIndex | None":
+        """
+        None when a sub-router has callback query middlewares or filters of its own,
+        skipping routers would skip them, the routers are then propagated as usual.
+        """
+        classified: list[tuple[type[CompactCallbackData] | None, IndexedHandler]] = []
+        for router in iter_routers(root):
+            observer = router.observers[CALLBACK_QUERY]
+            if router is not root and (observer.outer_middleware or observer._handler.filters): # noqa: SLF001
+                logger.info(f"Router {router.name} has its own callback query middlewares or filters, no index")
+                return None
+            classified.extend(
+                (handler_callback_class(handler), IndexedHandler(router, observer, handler))
+                for handler in observer.handlers
+            )
+
+        classes = {callback_class for callback_class, _ in classified}
+        return cls({
+            key: tuple(entry for callback_class, entry in classified if callback_class in {key, None})
+            for key in classes | {None}
+        })
+
+    def handlers(self, callback_class: type[CompactCallbackData] | None) -> tuple[IndexedHandler, ...]:
+        handlers = self._handlers.get(callback_class)
+        return self._handlers[None] if handlers is None else handlers
+
+
+class IndexedDispatcher(Dispatcher):
+    """
+    Dispatcher that unpacks the data of a callback query once and tries only the
+    handlers of its callback class (see CallbackIndex), instead of propagating it
+    through every router where each callback filter unpacks the data again.
+
+    The index is built on the first callback query: routers are included before.
+    """
+
+    def __init__(self, *, fast_callbacks: bool = True, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self.fast_callbacks = fast_callbacks
+        self._callback_index: CallbackIndex | None = None
+        self._callback_index_built = False
+
+    def include_router(self, router: Router) -> Router:
+        self._callback_index_built = False
+        return super().include_router(router)
+
+    def _index(self) -> CallbackIndex | None:
+        if not self._callback_index_built:
+            self._callback_index = CallbackIndex.build(self)
+            self._callback_index_built = True
+        return self._callback_index
+
+    async def propagate_event(self, update_type: str, event: Any, **kwargs: Any) -> Any: # noqa: ANN401
+        index = self._index() if self.fast_callbacks and update_type == CALLBACK_QUERY else None
+        if index is None:
+            return await super().propagate_event(update_type, event, **kwargs)
+
+        kwargs.update(event_router=self)
+        observer = self.observers[CALLBACK_QUERY]
+
+        async def _dispatch(query: CallbackQuery, **data: Any) -> Any: # noqa: ANN401
+            result, filters_data = await observer.check_root_filters(query, **data)
+            if not result:
+                return UNHANDLED
+            data.update(filters_data)
+            return await self._dispatch_callback(index, query, data)
+
+        return await observer.wrap_outer_middleware(_dispatch, event=event, data=kwargs)
+
+    @staticmethod
+    async def _dispatch_callback(index: CallbackIndex, query: CallbackQuery, data: dict[str, Any]) -> Any: # noqa: ANN401
+        try:
+            callback = unpack(query.data or "")
+        except (TypeError, ValueError):
+            callback = None
+            callback_queries_total.inc(route="unknown")
+        else:
+            data["callback_data"] = callback # taken by the callback filters instead of unpacking again
+            callback_queries_total.inc(route="indexed")
+
+        # Same loop as TelegramEventObserver.trigger, over the routers of the handlers
+        for entry in index.handlers(type(callback) if callback is not None else None):
+            kwargs = {**data, "event_router": entry.router, "handler": entry.handler}
+            result, kwargs = await entry.handler.check(query, **kwargs)
+            if not result:
+                continue
+            try:
+                wrapped_inner = entry.observer.outer_middleware.wrap_middlewares(
+                    entry.observer._resolve_middlewares(), # noqa: SLF001
+                    entry.handler.call,
+                )
+                return await wrapped_inner(query, kwargs)
+            except SkipHandler:
+                continue
+        return UNHANDLED
@@ -12,6 +12,22 @@ load_dotenv()
 class BotConfig:
     token: str # Telegram bot token
     admin_ids: list[int] = field(default_factory=list)
+    mode: str = "polling" # how updates are received: "polling" or "webhook"
+
+@dataclass
+class WebhookConfig:
+    url: str | None # public HTTPS URL registered with Telegram, None to skip 'set_webhook'
+    secret_token: str | None # expected X-Telegram-Bot-Api-Secret-Token, required in webhook mode
+    host: str = "0.0.0.0" # noqa: S104, the server usually runs behind a reverse proxy
+    port: int = 8080
+    path: str = "/webhook"
+
+@dataclass
+class SchedulerConfig:
+    # Updates of one chat are processed in order, chats concurrently without a cap: handlers wait on
+    # Telegram and the LLM endpoints (which have their own limits), a cap would let slow answers stall /start
+    max_pending: int # max updates queued or in process, polling waits and the webhook answers 503 beyond it
+    drain_timeout: float = 30.0 # seconds queued updates may take to finish on shutdown
 
 @dataclass
 class LogConfig:
@@ -28,17 +44,90 @@ class DBConfig:
     path: str
     pool_size: int
     max_overflow: int
+    checkout_timeout: float = 10.0 # seconds to wait for a free connection
+    busy_timeout: int = 5000 # ms, PRAGMA busy_timeout
+    mmap_size: int = 64 * 1024 * 1024 # bytes, PRAGMA mmap_size
+    cache_size: int = -16000 # negative value is KiB, PRAGMA cache_size
+    write_batch_size: int = 64 # max write statements per group commit
+    write_batch_delay: float = 0.005 # seconds to wait for more writes before committing
+
+@dataclass
+class CacheConfig:
+    user_max_size: int # max cached telegram users
+    user_ttl: float # seconds
+    response_ttl: float = 0.0 # seconds LLM answers are reused, 0 disables the response cache
+    response_max_size: int = 1000 # max answers kept in memory
+    response_max_rows: int = 100_000 # max answers kept in the database
+    response_max_chars: int = 32_000 # longer answers are not cached
+
+@dataclass
+class FSMConfig:
+    state_ttl: float # seconds an untouched FSM state is kept, abandoned dialogs expire after it
+    cache_max_size: int # max FSM keys cached in memory
+    cache_ttl: float # seconds
+    flush_delay: float = 0.05 # seconds FSM writes are held back to be flushed together
+
+@dataclass
+class GatewayConfig:
+    connection_limit: int # max open connections to all LLM endpoints
+    connection_limit_per_host: int # max open connections to one endpoint host
+    dns_cache_ttl: int # seconds
+    keepalive_timeout: float # seconds an idle keep-alive connection is kept
+    client_idle_timeout: float # seconds after which an unused client session is closed
+    connect_timeout: float = 10.0 # seconds to get a connection to an endpoint
+    first_byte_timeout: float = 60.0 # seconds from sending a prompt to the first byte of the answer
+    chunk_timeout: float = 30.0 # max seconds between two chunks of a streamed answer
+    request_deadline: float = 300.0 # seconds a chat message may take end to end
+    max_in_flight: int = 4 # max concurrent requests to one endpoint
+    rate: float = 0.0 # max requests per second to one endpoint, 0 disables
+    burst: int = 4 # requests allowed at once above 'rate'
+    max_queue: int = 32 # max requests waiting for one endpoint
+    max_queue_wait: float = 30.0 # seconds a request may wait in the queue
+    retry_attempts: int = 3 # attempts per request, including the first one
+    retry_base_delay: float = 0.25 # seconds, backoff grows as base * 2 ** attempt with full jitter
+    retry_max_delay: float = 5.0 # seconds, longer Retry-After is not waited for
+    hedge_min_samples: int = 20 # latency samples needed before requests are hedged
+    hedge_min_delay: float = 0.5 # seconds, lower bound of the p95 hedge delay
+    breaker_failure_threshold: int = 5 # consecutive failures that open the circuit
+    breaker_recovery_timeout: float = 30.0 # seconds before an open circuit lets a probe through
+
+@dataclass
+class ConversationConfig:
+    context_max_chars: int # chars of history sent with a prompt, ~4 chars per token
+    recent_messages: int # newest messages always sent verbatim
+    older_message_chars: int # older messages are truncated to this many chars
+    history_rows: int # max messages read from the database to rebuild a context
+    cache_max_size: int # max cached context windows (active chats)
+    cache_ttl: float # seconds
 
 @dataclass
 class AppConfig:
     bot: BotConfig
+    webhook: WebhookConfig
+    scheduler: SchedulerConfig
     log: LogConfig
     db: DBConfig
+    cache: CacheConfig
+    fsm: FSMConfig
+    gateway: GatewayConfig
+    conversation: ConversationConfig
 
 config: AppConfig = AppConfig(
     bot=BotConfig(
         token=getenv("BOT_TOKEN"),
         admin_ids=literal_eval(getenv("BOT_ADMIN_IDS", "[]")),
+        mode=getenv("BOT_MODE", "polling"),
+    ),
+    webhook=WebhookConfig(
+        url=getenv("WEBHOOK_URL"),
+        secret_token=getenv("WEBHOOK_SECRET_TOKEN"),
+        host=getenv("WEBHOOK_HOST", "0.0.0.0"), # noqa: S104
+        port=int(getenv("WEBHOOK_PORT", "8080")),
+        path=getenv("WEBHOOK_PATH", "/webhook"),
+    ),
+    scheduler=SchedulerConfig(
+        max_pending=int(getenv("SCHEDULER_MAX_PENDING", "1000")),
+        drain_timeout=float(getenv("SCHEDULER_DRAIN_TIMEOUT", "30")),
     ),
     log=LogConfig(
         level=getenv("LOG_LEVEL"),
@@ -47,6 +136,57 @@ config: AppConfig = AppConfig(
         path=getenv("DB_PATH"),
         pool_size=int(getenv("DB_POOL_SIZE", "2")),
         max_overflow=int(getenv("DB_MAX_OVERFLOW", "1")),
+        checkout_timeout=float(getenv("DB_CHECKOUT_TIMEOUT", "10")),
+        busy_timeout=int(getenv("DB_BUSY_TIMEOUT", "5000")),
+        mmap_size=int(getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024))),
+        cache_size=int(getenv("DB_CACHE_SIZE", "-16000")),
+        write_batch_size=int(getenv("DB_WRITE_BATCH_SIZE", "64")),
+        write_batch_delay=float(getenv("DB_WRITE_BATCH_DELAY", "0.005")),
+    ),
+    cache=CacheConfig(
+        user_max_size=int(getenv("USER_CACHE_SIZE", "10000")),
+        user_ttl=float(getenv("USER_CACHE_TTL", "300")),
+        response_ttl=float(getenv("RESPONSE_CACHE_TTL", "0")),
+        response_max_size=int(getenv("RESPONSE_CACHE_SIZE", "1000")),
+        response_max_rows=int(getenv("RESPONSE_CACHE_MAX_ROWS", "100000")),
+        response_max_chars=int(getenv("RESPONSE_CACHE_MAX_CHARS", "32000")),
+    ),
+    fsm=FSMConfig(
+        state_ttl=float(getenv("FSM_STATE_TTL", str(7 * 24 * 3600))),
+        cache_max_size=int(getenv("FSM_CACHE_SIZE", "10000")),
+        cache_ttl=float(getenv("FSM_CACHE_TTL", "600")),
+        flush_delay=float(getenv("FSM_FLUSH_DELAY", "0.05")),
+    ),
+    gateway=GatewayConfig(
+        connection_limit=int(getenv("GATEWAY_CONNECTION_LIMIT", "200")),
+        connection_limit_per_host=int(getenv("GATEWAY_CONNECTION_LIMIT_PER_HOST", "32")),
+        dns_cache_ttl=int(getenv("GATEWAY_DNS_CACHE_TTL", "300")),
+        keepalive_timeout=float(getenv("GATEWAY_KEEPALIVE_TIMEOUT", "60")),
+        client_idle_timeout=float(getenv("GATEWAY_CLIENT_IDLE_TIMEOUT", "600")),
+        connect_timeout=float(getenv("GATEWAY_CONNECT_TIMEOUT", "10")),
+        first_byte_timeout=float(getenv("GATEWAY_FIRST_BYTE_TIMEOUT", "60")),
+        chunk_timeout=float(getenv("GATEWAY_CHUNK_TIMEOUT", "30")),
+        request_deadline=float(getenv("GATEWAY_REQUEST_DEADLINE", "300")),
+        max_in_flight=int(getenv("GATEWAY_MAX_IN_FLIGHT", "4")),
+        rate=float(getenv("GATEWAY_RATE", "2")),
+        burst=int(getenv("GATEWAY_BURST", "4")),
+        max_queue=int(getenv("GATEWAY_MAX_QUEUE", "32")),
+        max_queue_wait=float(getenv("GATEWAY_MAX_QUEUE_WAIT", "30")),
+        retry_attempts=int(getenv("GATEWAY_RETRY_ATTEMPTS", "3")),
+        retry_base_delay=float(getenv("GATEWAY_RETRY_BASE_DELAY", "0.25")),
+        retry_max_delay=float(getenv("GATEWAY_RETRY_MAX_DELAY", "5")),
+        hedge_min_samples=int(getenv("GATEWAY_HEDGE_MIN_SAMPLES", "20")),
+        hedge_min_delay=float(getenv("GATEWAY_HEDGE_MIN_DELAY", "0.5")),
+        breaker_failure_threshold=int(getenv("GATEWAY_BREAKER_FAILURE_THRESHOLD", "5")),
+        breaker_recovery_timeout=float(getenv("GATEWAY_BREAKER_RECOVERY_TIMEOUT", "30")),
+    ),
+    conversation=ConversationConfig(
+        context_max_chars=int(getenv("CONTEXT_MAX_CHARS", "16000")),
+        recent_messages=int(getenv("CONTEXT_RECENT_MESSAGES", "6")),
+        older_message_chars=int(getenv("CONTEXT_OLDER_MESSAGE_CHARS", "500")),
+        history_rows=int(getenv("CONTEXT_HISTORY_ROWS", "200")),
+        cache_max_size=int(getenv("CONTEXT_CACHE_SIZE", "1000")),
+        cache_ttl=float(getenv("CONTEXT_CACHE_TTL", "1800")),
     ),
 )
 
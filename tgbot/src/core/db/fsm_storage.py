@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from logging import getLogger
+from typing import Any
+
+import orjson
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.repository.fsm_state import FsmStateRepository
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Languages, Menu, Models
+from src.tables.fsm_state import FsmStateInputDTO
+from src.utils.cache import TTLCache
+from src.utils.single_flight import SingleFlight
+
+logger = getLogger(__name__)
+
+ENUM_TAG = "__enum__"
+PURGE_INTERVAL = 3600.0 # seconds between two deletions of expired states
+
+# Enums that handlers put in FSM data, stored as {"__enum__": "<name>", "value": ...}
+STORED_ENUMS: dict[str, type[Enum]] = {
+    enum.__name__: enum for enum in (Languages, Menu, Models, AuthMethod, Dialect, Confirmation, HTTPMethods)
+}
+
+
+def _encode(value: Any) -> Any: # noqa: ANN401, any FSM data value
+    # orjson would write enums as their bare value, they are tagged to be restored on load
+    if isinstance(value, Enum):
+        if STORED_ENUMS.get(type(value).__name__) is not type(value):
+            raise TypeError(f"Unsupported FSM data value: {value!r}")
+        return {ENUM_TAG: type(value).__name__, "value": value.value}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any: # noqa: ANN401, any JSON value
+    if isinstance(value, dict):
+        if ENUM_TAG in value:
+            return STORED_ENUMS[value[ENUM_TAG]](value["value"])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def dump_data(data: dict[str, Any]) -> str:
+    return orjson.dumps(_encode(data)).decode()
+
+
+def load_data(document: str) -> dict[str, Any]:
+    return _decode(orjson.loads(document))
+
+
+@dataclass(slots=True)
+class _Entry:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    aiogram FSM storage persisted in the 'fsm_state' table.
+
+    Reads are served from an in-memory cache, writes change the cached entry and are
+    written back together, `flush_delay` seconds after the first one, in a single
+    upsert. The several `update_data` calls of one wizard step therefore cost one
+    write, and a process always reads its own writes. A crash loses at most the
+    writes of the last `flush_delay` seconds.
+
+    States untouched for `state_ttl` seconds are treated as absent and deleted.
+    """
+
+    def __init__(
+            self,
+            repository: FsmStateRepository,
+            state_ttl: float,
+            cache_max_size: int,
+            cache_ttl: float,
+            flush_delay: float = 0.05,
+            key_builder: KeyBuilder | None = None,
+            clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._repository = repository
+        self._state_ttl = state_ttl
+        self._flush_delay = flush_delay
+        self._key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        self._clock = clock
+        self._cache: TTLCache[str, _Entry] = TTLCache(max_size=cache_max_size, ttl=cache_ttl)
+        self._dirty: dict[str, _Entry] = {} # written but not flushed yet, never evicted
+        self._loads: SingleFlight[str, _Entry] = SingleFlight("fsm_storage_load")
+        self._flush_scheduled = False
+        self._flushes: set[asyncio.Task] = set() # kept until their flush is done, see close()
+        self._purged_at = 0.0
+
+    async def _read(self, key: str) -> _Entry:
+        row = await self._repository.get(key=key)
+        if row is None or row.updated_at < self._clock() - self._state_ttl:
+            return _Entry()
+        return _Entry(row.state, load_data(row.data))
+
+    async def _entry(self, key: str) -> _Entry:
+        entry = self._dirty.get(key)
+        if entry is None:
+            entry = self._cache.get(key)
+        if entry is None:
+            loaded = await self._loads.do(key, lambda: self._read(key))
+            # A write may have created the entry while the row was being read
+            entry = self._dirty.get(key) or self._cache.get(key) or loaded
+            self._cache.set(key, entry)
+        return entry
+
+    def _mark_dirty(self, key: str, entry: _Entry) -> None:
+        self._dirty[key] = entry
+        self._cache.set(key, entry)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            task = asyncio.create_task(self._flush_later())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_delay)
+        self._flush_scheduled = False # writes made during the flush schedule the next one
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Writes every pending state, a failed flush is retried with the next write."""
+        if not self._dirty:
+            return
+        pending, self._dirty = self._dirty, {}
+        now = self._clock()
+        upserts = []
+        deletions = []
+        for key, entry in pending.items():
+            if entry.state is None and not entry.data:
+                deletions.append(key)
+            else:
+                upserts.append(
+                    FsmStateInputDTO(key=key, state=entry.state, data=dump_data(entry.data), updated_at=now),
+                )
+
+        try:
+            if upserts:
+                await self._repository.upsert_many(upserts)
+            if deletions:
+                await self._repository.delete_keys(deletions)
+            if now - self._purged_at > PURGE_INTERVAL:
+                self._purged_at = now
+                await self._repository.delete_expired(now - self._state_ttl)
+        except Exception as e:
+            logger.error(f"Flushing {len(pending)} FSM states failed: {e!r}")
+            # Newer writes made during the flush win over the failed ones
+            self._dirty = pending | self._dirty
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self._key_builder.build(key)
+        entry = await self._entry(storage_key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(storage_key, entry)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        entry = await self._entry(self._key_builder.build(key))
+        return entry.state
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, not {type(data).__name__}")
+        storage_key = self._key_builder.build(key)
+        entry = await self._entry(storage_key)
+        entry.data = data.copy()
+        self._mark_dirty(storage_key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        entry = await self._entry(self._key_builder.build(key))
+        return entry.data.copy()
+
+    async def close(self) -> None:
+        """Writes every pending state, call it before the database writer is stopped."""
+        # A flush in progress may still have writes to submit, it must be done before the last one
+        await asyncio.gather(*self._flushes)
+        await self.flush()
@@ -1,11 +1,126 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from logging import getLogger
+
 from aiosqlite import Connection
 
-from src.tables import tables
+from src.tables import (
+    Conversation,
+    ConversationMessage,
+    FsmState,
+    IntegrationAI,
+    ResponseCache,
+    TelegramUser,
+    tables,
+)
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SchemaMigration:
+    """Forward-only schema change, applied once and recorded in 'schema_version'."""
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Append only, never edit or reorder a migration that has been released.
+MIGRATIONS: tuple[SchemaMigration, ...] = (
+    SchemaMigration(
+        version=1,
+        name="unique index on telegram_user.user_id",
+        statements=(
+            # Keep the newest row per Telegram user before enforcing uniqueness
+            f"""
+            DELETE FROM {TelegramUser.get_name()}
+            WHERE id NOT IN (SELECT MAX(id) FROM {TelegramUser.get_name()} GROUP BY user_id)
+            """,
+            f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_{TelegramUser.get_name()}_user_id
+            ON {TelegramUser.get_name()} (user_id)
+            """,
+        ),
+    ),
+    SchemaMigration(
+        version=2,
+        name="index on integration_ai.creator_id",
+        statements=(
+            f"""
+            CREATE INDEX IF NOT EXISTS ix_{IntegrationAI.get_name()}_creator_id
+            ON {IntegrationAI.get_name()} (creator_id)
+            """,
+        ),
+    ),
+    SchemaMigration(
+        version=3,
+        name="dialect and model of integration_ai",
+        statements=(
+            f"""
+            ALTER TABLE {IntegrationAI.get_name()}
+            ADD COLUMN dialect INTEGER NOT NULL DEFAULT 0 CHECK(dialect IN (0, 1, 2))
+            """,
+            f"ALTER TABLE {IntegrationAI.get_name()} ADD COLUMN model TEXT",
+        ),
+    ),
+    SchemaMigration(
+        version=4,
+        name="index on conversation_message (conversation_id, id)",
+        statements=(
+            f"""
+            CREATE INDEX IF NOT EXISTS ix_{ConversationMessage.get_name()}_conversation_id_id
+            ON {ConversationMessage.get_name()} (conversation_id, id)
+            """,
+        ),
+    ),
+    SchemaMigration(
+        version=5,
+        name="index on response_cache.expires_at",
+        statements=(
+            f"""
+            CREATE INDEX IF NOT EXISTS ix_{ResponseCache.get_name()}_expires_at
+            ON {ResponseCache.get_name()} (expires_at)
+            """,
+        ),
+    ),
+    SchemaMigration(
+        version=6,
+        name="index on fsm_state.updated_at",
+        statements=(
+            f"""
+            CREATE INDEX IF NOT EXISTS ix_{FsmState.get_name()}_updated_at
+            ON {FsmState.get_name()} (updated_at)
+            """,
+        ),
+    ),
+    SchemaMigration(
+        version=7,
+        name="conversation deletes cascade to conversation_message",
+        statements=(
+            # Part of the DELETE statement itself, so a conversation never loses only some of its rows
+            f"""
+            CREATE TRIGGER IF NOT EXISTS td_{Conversation.get_name()}_messages
+            AFTER DELETE ON {Conversation.get_name()}
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM {ConversationMessage.get_name()} WHERE conversation_id = OLD.id;
+            END
+            """,
+        ),
+    ),
+)
 
 
 class Migration:
-    def __init__(self, session: Connection) -> None:
+    def __init__(
+            self,
+            session: Connection,
+            migrations: tuple[SchemaMigration, ...] = MIGRATIONS,
+    ) -> None:
         self._session = session
+        self._migrations = tuple(sorted(migrations, key=lambda migration: migration.version))
 
     async def create_all(self) -> None:
         for table in tables:
@@ -15,4 +130,50 @@ class Migration:
     async def drop_all(self) -> None:
         for table in tables:
             await self._session.execute(f"DROP TABLE IF EXISTS {table.get_name()};")
+        await self._session.execute(f"DROP TABLE IF EXISTS {SCHEMA_VERSION_TABLE};")
         await self._session.commit()
+
+    async def current_version(self) -> int:
+        await self._session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version     INTEGER PRIMARY KEY,
+                name        TEXT NOT NULL,
+                applied_at  TEXT NOT NULL
+            );
+        """)
+        await self._session.commit()
+        result = await self._session.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")
+        row = await result.fetchone()
+        return row[0] or 0
+
+    async def upgrade(self) -> list[int]:
+        """
+        Applies pending migrations in version order, each in its own transaction.
+        Safe to call on every startup.
+
+        Returns:
+            Versions applied by this call.
+        """
+        current = await self.current_version()
+        applied = []
+        for migration in self._migrations:
+            if migration.version <= current:
+                continue
+
+            await self._session.execute("BEGIN")
+            try:
+                for statement in migration.statements:
+                    await self._session.execute(statement)
+                await self._session.execute(
+                    f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?)",
+                    (migration.version, migration.name, datetime.now(UTC).isoformat()),
+                )
+                await self._session.commit()
+            except Exception:
+                await self._session.rollback()
+                raise
+
+            logger.info(f"Applied migration {migration.version}: {migration.name}")
+            applied.append(migration.version)
+        return applied
@@ -1,23 +1,176 @@
-from collections.abc import AsyncIterator
+import asyncio
+import sqlite3
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
+from logging import getLogger
 
 import aiosqlite
 
 from src.core.config import config
 
+logger = getLogger(__name__)
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection could be checked out within the checkout timeout."""
+
 
 class SQlitePool:
-    def __init__(self, db_path: str) -> None:
+    """
+    Asynchronous pool of aiosqlite connections.
+
+    Keeps up to `pool_size` connections warm and opens at most `max_overflow`
+    extra ones under load; overflow connections are closed once returned.
+    Callers that find the pool exhausted wait in a FIFO queue for at most
+    `checkout_timeout` seconds. PRAGMAs are applied once per connection.
+    """
+
+    def __init__(
+            self,
+            db_path: str,
+            pool_size: int = 2,
+            max_overflow: int = 0,
+            checkout_timeout: float = 10.0,
+            busy_timeout: int = 5000,
+            mmap_size: int = 0,
+            cache_size: int = -2000,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("'pool_size' must be at least 1")
+        if max_overflow < 0:
+            raise ValueError("'max_overflow' must not be negative")
+
         self._db_path = db_path
+        self._pool_size = pool_size
+        self._max_size = pool_size + max_overflow
+        self._checkout_timeout = checkout_timeout
+        self._pragmas = (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            f"PRAGMA busy_timeout={int(busy_timeout)};"
+            f"PRAGMA mmap_size={int(mmap_size)};"
+            f"PRAGMA cache_size={int(cache_size)};"
+        )
+
+        self._idle: list[aiosqlite.Connection] = [] # LIFO, the most recently used connection goes first
+        self._slots = asyncio.Semaphore(self._max_size)
+        self._opened = 0
+        self._closed = False
+        self._trace_callback: Callable[[str], object] | None = None
+
+    @property
+    def size(self) -> int:
+        """Number of currently open connections (idle and checked out)."""
+        return self._opened
+
+    @property
+    def idle(self) -> int:
+        """Number of idle connections ready for checkout."""
+        return len(self._idle)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        connection = await aiosqlite.connect(self._db_path)
+        connection.row_factory = aiosqlite.Row
+        try:
+            await connection.executescript(self._pragmas)
+            if self._trace_callback is not None:
+                await connection.set_trace_callback(self._trace_callback)
+        except BaseException:
+            await connection.close()
+            raise
+        self._opened += 1
+        return connection
+
+    async def _discard(self, connection: aiosqlite.Connection) -> None:
+        self._opened -= 1
+        try:
+            await connection.close()
+        except Exception as e:
+            logger.warning(f"Closing sqlite connection failed: {e}")
+
+    @staticmethod
+    async def _is_healthy(connection: aiosqlite.Connection) -> bool:
+        """Rolls back a transaction left open by the caller; a closed or broken connection is unhealthy."""
+        try:
+            if connection.in_transaction:
+                await connection.rollback()
+        except (ValueError, sqlite3.Error):
+            return False
+        return True
+
+    async def _checkout(self) -> aiosqlite.Connection:
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+        try:
+            async with asyncio.timeout(self._checkout_timeout):
+                await self._slots.acquire()
+        except TimeoutError as e:
+            raise PoolTimeoutError(
+                f"No sqlite connection available within {self._checkout_timeout}s "
+                f"(pool size {self._max_size})",
+            ) from e
+
+        try:
+            if self._idle:
+                return self._idle.pop()
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _checkin(self, connection: aiosqlite.Connection) -> None:
+        try:
+            try:
+                reuse = (
+                        not self._closed
+                        and len(self._idle) < self._pool_size
+                        and await self._is_healthy(connection)
+                )
+            except BaseException:
+                # Cancelled during the rollback: the transaction may still be open, close it anyway
+                await asyncio.shield(self._discard(connection))
+                raise
+            if reuse:
+                self._idle.append(connection)
+            else:
+                await self._discard(connection)
+        finally:
+            self._slots.release()
 
     @asynccontextmanager
     async def get_async_session(self) -> AsyncIterator[aiosqlite.Connection]:
-        session = await aiosqlite.connect(self._db_path)
-        session.row_factory = aiosqlite.Row
+        session = await self._checkout()
         try:
             yield session
         finally:
-            await session.close()
+            await self._checkin(session)
+
+    def set_trace_callback(self, callback: Callable[[str], object] | None) -> None:
+        """
+        Passes every statement run by connections opened afterwards to `callback`
+        (from the thread of the connection), e.g. to count them. Set it before `open`.
+        """
+        self._trace_callback = callback
+
+    async def open(self) -> None:
+        """Warms up the pool by opening `pool_size` connections."""
+        self._closed = False
+        while self._opened < self._pool_size:
+            self._idle.append(await self._connect())
+
+    async def close(self) -> None:
+        """Closes idle connections; checked out connections are closed when returned."""
+        self._closed = True
+        while self._idle:
+            await self._discard(self._idle.pop())
 
 
-sqlite_pool = SQlitePool(db_path=config.db.path)
+sqlite_pool = SQlitePool(
+    db_path=config.db.path,
+    pool_size=config.db.pool_size,
+    max_overflow=config.db.max_overflow,
+    checkout_timeout=config.db.checkout_timeout,
+    busy_timeout=config.db.busy_timeout,
+    mmap_size=config.db.mmap_size,
+    cache_size=config.db.cache_size,
+)
@@ -0,0 +1,208 @@
+"""
+EXPLAIN QUERY PLAN check for the repository queries.
+
+Run `python -m src.core.db.query_plan [db_path]` to build the schema
+(in memory by default), apply migrations and fail with a non-zero exit code
+when any of the queries below scans a whole table.
+"""
+import asyncio
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import aiosqlite
+
+from src.core.db.migrations import Migration
+from src.tables import (
+    Conversation,
+    ConversationMessage,
+    FsmState,
+    IntegrationAI,
+    ResponseCache,
+    TelegramUser,
+)
+
+
+class FullTableScanError(Exception):
+    """Raised when a repository query is planned as a full table scan."""
+
+
+@dataclass(frozen=True)
+class PlannedQuery:
+    name: str
+    sql: str
+    parameters: Sequence[Any] = ()
+
+
+# Mirrors the lookups issued by the repositories, keep in sync with src/repository
+REPOSITORY_QUERIES: tuple[PlannedQuery, ...] = (
+    PlannedQuery(
+        "UserRepository.get(user_id)",
+        f"SELECT * FROM {TelegramUser.get_name()} WHERE user_id = ? LIMIT 1",
+        (1,),
+    ),
+    PlannedQuery(
+        "UserRepository.get(id)",
+        f"SELECT * FROM {TelegramUser.get_name()} WHERE id = ? LIMIT 1",
+        (1,),
+    ),
+    PlannedQuery(
+        "UserRepository.list",
+        f"SELECT * FROM {TelegramUser.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "UserRepository.update",
+        f"UPDATE {TelegramUser.get_name()} SET first_name = ? WHERE id = ?",
+        ("", 1),
+    ),
+    PlannedQuery(
+        "UserRepository.delete",
+        f"DELETE FROM {TelegramUser.get_name()} WHERE id = ?",
+        (1,),
+    ),
+    PlannedQuery(
+        "LLMRepository.get(id)",
+        f"SELECT * FROM {IntegrationAI.get_name()} WHERE id = ? LIMIT 1",
+        (1,),
+    ),
+    PlannedQuery(
+        "LLMRepository.get(creator_id)",
+        f"SELECT * FROM {IntegrationAI.get_name()} WHERE creator_id = ? LIMIT 1",
+        (1,),
+    ),
+    PlannedQuery(
+        "LLMRepository.list",
+        f"SELECT * FROM {IntegrationAI.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "LLMRepository.list_by_creator",
+        f"SELECT * FROM {IntegrationAI.get_name()} WHERE creator_id = ? AND id > ? ORDER BY id LIMIT ?",
+        (1, 0, 100),
+    ),
+    PlannedQuery(
+        "LLMRepository.update",
+        f"UPDATE {IntegrationAI.get_name()} SET url = ? WHERE id = ?",
+        ("", 1),
+    ),
+    PlannedQuery(
+        "LLMRepository.delete",
+        f"DELETE FROM {IntegrationAI.get_name()} WHERE id = ?",
+        (1,),
+    ),
+    PlannedQuery(
+        "ConversationRepository.get(id)",
+        f"SELECT * FROM {Conversation.get_name()} WHERE id = ? LIMIT 1",
+        (1,),
+    ),
+    PlannedQuery(
+        "ConversationRepository.list",
+        f"SELECT * FROM {Conversation.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "ConversationMessageRepository.recent",
+        f"SELECT * FROM {ConversationMessage.get_name()} WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+        (1, 100),
+    ),
+    PlannedQuery(
+        "ConversationMessageRepository.list",
+        f"SELECT * FROM {ConversationMessage.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "ConversationRepository.delete (trigger on conversation)",
+        f"DELETE FROM {ConversationMessage.get_name()} WHERE conversation_id = ?",
+        (1,),
+    ),
+    PlannedQuery(
+        "ResponseCacheRepository.get_live",
+        f"SELECT * FROM {ResponseCache.get_name()} WHERE key = ? AND expires_at > ? LIMIT 1",
+        ("", 0.0),
+    ),
+    PlannedQuery(
+        "ResponseCacheRepository.list",
+        f"SELECT * FROM {ResponseCache.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "ResponseCacheRepository.prune(expired)",
+        f"DELETE FROM {ResponseCache.get_name()} WHERE expires_at <= ?",
+        (0.0,),
+    ),
+    PlannedQuery(
+        "ResponseCacheRepository.prune(max_rows)",
+        f"""
+        DELETE FROM {ResponseCache.get_name()}
+        WHERE id <= (SELECT MAX(id) FROM {ResponseCache.get_name()}) - ?
+        """,
+        (1000,),
+    ),
+    PlannedQuery(
+        "FsmStateRepository.get(key)",
+        f"SELECT * FROM {FsmState.get_name()} WHERE key = ? LIMIT 1",
+        ("",),
+    ),
+    PlannedQuery(
+        "FsmStateRepository.list",
+        f"SELECT * FROM {FsmState.get_name()} WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 100),
+    ),
+    PlannedQuery(
+        "FsmStateRepository.delete_keys",
+        f"DELETE FROM {FsmState.get_name()} WHERE key IN (?, ?)",
+        ("", ""),
+    ),
+    PlannedQuery(
+        "FsmStateRepository.delete_expired",
+        f"DELETE FROM {FsmState.get_name()} WHERE updated_at < ?",
+        (0.0,),
+    ),
+)
+
+
+def is_full_scan(detail: str) -> bool:
+    """'SCAN <table>' means every row is visited, 'SEARCH' means an index or rowid lookup."""
+    return detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT ROW")
+
+
+async def find_full_scans(
+        session: aiosqlite.Connection,
+        queries: Sequence[PlannedQuery] = REPOSITORY_QUERIES,
+) -> list[tuple[PlannedQuery, str]]:
+    """Returns (query, plan detail) for every plan step that scans a full table."""
+    scans = []
+    for query in queries:
+        result = await session.execute(f"EXPLAIN QUERY PLAN {query.sql}", query.parameters)
+        scans.extend((query, row[3]) for row in await result.fetchall() if is_full_scan(row[3]))
+    return scans
+
+
+async def check_query_plans(
+        session: aiosqlite.Connection,
+        queries: Sequence[PlannedQuery] = REPOSITORY_QUERIES,
+) -> None:
+    scans = await find_full_scans(session, queries)
+    if scans:
+        details = "; ".join(f"{query.name}: {detail}" for query, detail in scans)
+        raise FullTableScanError(f"Full table scans found: {details}")
+
+
+async def main(db_path: str = ":memory:") -> int:
+    async with aiosqlite.connect(db_path) as session:
+        migration = Migration(session)
+        await migration.create_all()
+        await migration.upgrade()
+        scans = await find_full_scans(session)
+
+    for query, detail in scans:
+        print(f"FULL SCAN  {query.name}: {detail}\n    {query.sql}") # noqa: T201
+    if not scans:
+        print(f"OK: {len(REPOSITORY_QUERIES)} queries, no full table scans") # noqa: T201
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(*sys.argv[1:2])))
@@ -0,0 +1,169 @@
+import asyncio
+import sqlite3
+from collections.abc import Sequence
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any
+
+import aiosqlite
+
+from src.core.config import config
+from src.core.db.pool import SQlitePool, sqlite_pool
+
+logger = getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WriteOperation:
+    """A single write statement waiting in the writer queue."""
+    sql: str
+    parameters: Sequence[Any]
+    fetch_all: bool
+    future: asyncio.Future
+
+
+class SQLiteWriter:
+    """
+    Single writer task with group commit.
+
+    Write statements are queued and executed by one background task, which
+    packs up to `max_batch_size` of them (or whatever arrived within
+    `max_delay` seconds of the first one) into one transaction. Every statement
+    runs inside its own savepoint, so a failing statement only fails its caller.
+    Callers get their `RETURNING` rows once the batch is committed.
+    """
+
+    def __init__(
+            self,
+            pool: SQlitePool,
+            max_batch_size: int = 64,
+            max_delay: float = 0.005,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("'max_batch_size' must be at least 1")
+        self._pool = pool
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._queue: asyncio.Queue[WriteOperation | None] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="sqlite-writer")
+
+    async def stop(self) -> None:
+        """Stops the writer after every already queued operation has been committed."""
+        if not self.running:
+            return
+        self._stopping = True # no operation may land behind the sentinel
+        await self._queue.put(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._fail_queued(RuntimeError("Writer stopped before the operation was committed"))
+
+    def _fail_queued(self, error: Exception) -> None:
+        while not self._queue.empty():
+            operation = self._queue.get_nowait()
+            if operation is not None and not operation.future.done():
+                operation.future.set_exception(error)
+
+    async def _submit(
+            self,
+            sql: str,
+            parameters: Sequence[Any],
+            fetch_all: bool,
+    ) -> aiosqlite.Row | list[aiosqlite.Row] | None:
+        if not self.running or self._stopping:
+            raise RuntimeError("Writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(WriteOperation(sql, parameters, fetch_all, future))
+        return await future
+
+    async def execute(self, sql: str, parameters: Sequence[Any] = ()) -> aiosqlite.Row | None:
+        """Queues a write statement and returns the first row it returned, if any."""
+        return await self._submit(sql, parameters, fetch_all=False)
+
+    async def execute_fetchall(self, sql: str, parameters: Sequence[Any] = ()) -> list[aiosqlite.Row]:
+        """Queues a write statement and returns every row it returned."""
+        return await self._submit(sql, parameters, fetch_all=True)
+
+    async def _collect_batch(self, first: WriteOperation) -> tuple[list[WriteOperation], bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_delay
+        while len(batch) < self._max_batch_size:
+            try:
+                operation = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(remaining):
+                        operation = await self._queue.get()
+                except TimeoutError:
+                    break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect_batch(first)
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} operations failed: {e}")
+                for operation in batch:
+                    if not operation.future.done():
+                        operation.future.set_exception(e)
+
+    async def _commit_batch(self, batch: list[WriteOperation]) -> None:
+        results: list[tuple[WriteOperation, list[aiosqlite.Row] | None, Exception | None]] = []
+        async with self._pool.get_async_session() as session:
+            await session.execute("BEGIN IMMEDIATE")
+            for operation in batch:
+                if operation.future.cancelled():
+                    continue
+                await session.execute("SAVEPOINT write_operation")
+                try:
+                    cursor = await session.execute(operation.sql, operation.parameters)
+                    rows = await cursor.fetchall()
+                except sqlite3.Error as e:
+                    await session.execute("ROLLBACK TO write_operation")
+                    results.append((operation, None, e))
+                else:
+                    results.append((operation, rows, None))
+                await session.execute("RELEASE write_operation")
+            await session.commit()
+
+        for operation, rows, error in results:
+            if operation.future.done():
+                continue
+            if error is not None:
+                operation.future.set_exception(error)
+            elif operation.fetch_all:
+                operation.future.set_result(rows)
+            else:
+                operation.future.set_result(rows[0] if rows else None)
+
+
+sqlite_writer = SQLiteWriter(
+    pool=sqlite_pool,
+    max_batch_size=config.db.write_batch_size,
+    max_delay=config.db.write_batch_delay,
+)
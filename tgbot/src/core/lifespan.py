@@ -2,19 +2,59 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from logging import getLogger
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
 from src.core.config import config
+from src.core.db.fsm_storage import SQLiteStorage
 from src.core.db.migrations import Migration
 from src.core.db.pool import sqlite_pool
+from src.core.db.writer import sqlite_writer
 from src.core.logger import setup_logging
+from src.core.ModelGateway.registry import ai_client_registry
+from src.core.scheduler import ScheduledDispatcher, UpdateScheduler
 from src.handlers import routers
+from src.repository.fsm_state import FsmStateRepository
+
+
+async def init_database() -> None:
+    logger = getLogger(__name__)
+
+    logger.info("Opening database pool")
+    await sqlite_pool.open()
+
+    logger.info("Creating tables")
+    async with sqlite_pool.get_async_session() as session:
+        migration = Migration(session)
+        await migration.create_all()
+        logger.info("Tables created")
+
+        applied = await migration.upgrade()
+        logger.info(f"Schema is up to date, applied migrations: {applied or 'none'}")
+
+    logger.info("Starting database writer")
+    await sqlite_writer.start()
+
+
+async def close_database() -> None:
+    logger = getLogger(__name__)
+
+    try:
+        logger.info("Stopping database writer")
+        await sqlite_writer.stop()
+    except Exception as e:
+        logger.error(f"Stopping database writer failed: {e}")
+
+    try:
+        logger.info("Closing database pool")
+        await sqlite_pool.close()
+    except Exception as e:
+        logger.error(f"Closing database pool failed: {e}")
 
 
 @asynccontextmanager
-async def init_application() -> AsyncGenerator[tuple[Bot, Dispatcher]]:
+async def init_application() -> AsyncGenerator[tuple[Bot, ScheduledDispatcher]]:
     setup_logging()
     logger = getLogger(__name__)
     logger.info("Logging configured")
@@ -23,10 +63,10 @@ async def init_application() -> AsyncGenerator[tuple[Bot, Dispatcher]]:
     dp = None
 
     try:
-        logger.info("Creating tables")
-        async with sqlite_pool.get_async_session() as session:
-            await Migration(session).create_all()
-        logger.info("Tables created")
+        await init_database()
+
+        logger.info("Starting AI http client registry")
+        await ai_client_registry.start()
 
         logger.info("Creating bot")
         bot = Bot(
@@ -37,13 +77,25 @@ async def init_application() -> AsyncGenerator[tuple[Bot, Dispatcher]]:
         )
 
         logger.info("Creating dispatcher")
-        dp = Dispatcher()
+        dp = ScheduledDispatcher(
+            UpdateScheduler(max_pending=config.scheduler.max_pending),
+            storage=SQLiteStorage(
+                FsmStateRepository(sqlite_pool.get_async_session, sqlite_writer),
+                state_ttl=config.fsm.state_ttl,
+                cache_max_size=config.fsm.cache_max_size,
+                cache_ttl=config.fsm.cache_ttl,
+                flush_delay=config.fsm.flush_delay,
+            ),
+        )
+        await dp.scheduler.start()
 
         logger.info("Include routers")
         dp.include_routers(*routers)
 
-        logger.info("Deleting webhook")
-        await bot.delete_webhook(drop_pending_updates=True)
+        if config.bot.mode == "polling":
+            # A registered webhook would keep Telegram from answering getUpdates
+            logger.info("Deleting webhook")
+            await bot.delete_webhook(drop_pending_updates=True)
 
         yield bot, dp
 
@@ -53,6 +105,12 @@ async def init_application() -> AsyncGenerator[tuple[Bot, Dispatcher]]:
 
     finally:
         if dp:
+            try:
+                logger.info("Stopping update scheduler")
+                await dp.scheduler.stop(config.scheduler.drain_timeout)
+            except Exception as e:
+                logger.error(f"Stopping update scheduler failed: {e}")
+
             try:
                 logger.info("Closing dispatcher storage")
                 await dp.storage.close()
@@ -65,3 +123,11 @@ async def init_application() -> AsyncGenerator[tuple[Bot, Dispatcher]]:
                 await bot.session.close()
             except Exception as e:
                 logger.error(f"Closing bot session failed: {e}")
+
+        try:
+            logger.info("Closing AI http clients")
+            await ai_client_registry.close()
+        except Exception as e:
+            logger.error(f"Closing AI http clients failed: {e}")
+
+        await close_database()
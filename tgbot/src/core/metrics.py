@@ -0,0 +1,91 @@
+from collections.abc import Iterator
+
+type LabelSet = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[LabelSet, float] = {}
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def samples(self) -> Iterator[tuple[LabelSet, float]]:
+        yield from self._values.items()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, e.g. a number of retries."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. a circuit breaker state."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[_labels(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class MetricsRegistry:
+    """In-process metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create[M: _Metric](self, metric_class: type[M], name: str, documentation: str) -> M:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = metric_class(name, documentation)
+        elif not isinstance(metric, metric_class):
+            raise TypeError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._get_or_create(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation)
+
+    def snapshot(self) -> dict[str, dict[LabelSet, float]]:
+        return {name: dict(metric.samples()) for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(f"{name}{_format_labels(labels)} {value:g}" for labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
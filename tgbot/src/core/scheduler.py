@@ -0,0 +1,165 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from functools import partial
+from logging import getLogger
+from typing import Any
+
+from aiogram import Bot
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+from src.core.callback_dispatch import IndexedDispatcher
+from src.core.metrics import metrics
+
+logger = getLogger(__name__)
+
+type Job = Callable[[], Awaitable[Any]]
+
+jobs_total = metrics.counter(
+    "scheduler_updates_total", "Updates by result: queued, waited (scheduler was full) or refused",
+)
+pending_updates = metrics.gauge("scheduler_pending_updates", "Updates queued or in process on the scheduler")
+active_chats = metrics.gauge("scheduler_active_chats", "Chats with updates queued or being processed")
+
+
+def update_chat_key(update: Update) -> int:
+    """Chat of the update, its user when it has no chat (e.g. inline queries), else the update itself."""
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat_id is not None:
+        return context.chat_id
+    if context.user_id is not None:
+        return context.user_id
+    return update.update_id
+
+
+class UpdateScheduler:
+    """
+    Runs jobs of the same key one at a time in submission order, and jobs of
+    different keys in parallel.
+
+    Each key with pending jobs has its own FIFO queue and worker task, created on
+    its first job and dropped once the queue is empty, so a slow chat only delays
+    itself. Handlers mostly wait on I/O (a chat answer streams for minutes), so
+    there is no cap on concurrent chats. At most `max_pending` jobs are queued
+    or running in total: `submit` waits for room (backpressure), `try_submit`
+    refuses instead.
+    """
+
+    def __init__(self, max_pending: int = 1000) -> None:
+        if max_pending < 1:
+            raise ValueError("'max_pending' must be at least 1")
+        # One item per pending job, its bound is the backpressure and join() the drain
+        self._pending: asyncio.Queue[None] = asyncio.Queue(maxsize=max_pending)
+        self._chats: dict[int, deque[Job]] = {}
+        self._workers: set[asyncio.Task] = set()
+        self._accepting = False
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    def _check_running(self) -> None:
+        if not self._accepting:
+            raise RuntimeError("Scheduler is not running")
+
+    def _enqueue(self, key: int, job: Job) -> None:
+        jobs_total.inc(result="queued")
+        pending_updates.set(self._pending.qsize())
+        jobs = self._chats.get(key)
+        if jobs is not None: # its worker is running and takes the job in turn
+            jobs.append(job)
+            return
+        jobs = self._chats[key] = deque((job,))
+        active_chats.set(len(self._chats))
+        worker = asyncio.create_task(self._work(key, jobs))
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    def _done(self) -> None:
+        self._pending.get_nowait()
+        self._pending.task_done()
+        pending_updates.set(self._pending.qsize())
+
+    async def submit(self, key: int, job: Job) -> None:
+        self._check_running()
+        if self._pending.full():
+            jobs_total.inc(result="waited")
+        await self._pending.put(None)
+        if not self._accepting: # stopped while waiting for room
+            self._done()
+            raise RuntimeError("Scheduler is not running")
+        self._enqueue(key, job)
+
+    def try_submit(self, key: int, job: Job) -> bool:
+        self._check_running()
+        try:
+            self._pending.put_nowait(None)
+        except asyncio.QueueFull:
+            jobs_total.inc(result="refused")
+            return False
+        self._enqueue(key, job)
+        return True
+
+    async def _work(self, key: int, jobs: deque[Job]) -> None:
+        try:
+            while jobs:
+                job = jobs.popleft()
+                try:
+                    await job()
+                except Exception:
+                    logger.exception(f"Job of chat {key} failed")
+                finally:
+                    self._done()
+        finally:
+            del self._chats[key]
+            active_chats.set(len(self._chats))
+
+    async def start(self) -> None:
+        self._accepting = True
+
+    async def stop(self, drain_timeout: float = 30.0) -> None:
+        """Refuses new jobs, lets pending ones finish within `drain_timeout` seconds, then stops workers."""
+        self._accepting = False
+        logger.info(f"Draining {self._pending.qsize()} pending updates")
+        try:
+            async with asyncio.timeout(drain_timeout):
+                await self._pending.join()
+        except TimeoutError:
+            logger.warning(f"Drain timed out, {self._pending.qsize()} updates dropped")
+
+        workers = list(self._workers)
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+
+
+class ScheduledDispatcher(IndexedDispatcher):
+    """
+    Dispatcher that processes updates on the scheduler, in order per chat.
+
+    `feed_update` only queues the update, so polling (with `handle_as_tasks=False`)
+    waits when the scheduler is full, and the webhook uses `try_feed_update` to refuse it.
+    Updates of one chat reach the FSM one at a time and in order.
+    """
+
+    def __init__(self, scheduler: UpdateScheduler, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    async def _process(self, bot: Bot, update: Update, **kwargs: object) -> None:
+        response = await super().feed_update(bot, update, **kwargs)
+        if isinstance(response, TelegramMethod):
+            await self.silent_call_request(bot=bot, result=response)
+
+    async def feed_update(self, bot: Bot, update: Update, **kwargs: object) -> None:
+        await self.scheduler.submit(update_chat_key(update), partial(self._process, bot, update, **kwargs))
+
+    def try_feed_update(self, bot: Bot, update: Update, **kwargs: object) -> bool:
+        """Queues the update unless the scheduler is full."""
+        job = partial(self._process, bot, update, **kwargs)
+        return self.scheduler.try_submit(update_chat_key(update), job)
@@ -0,0 +1,132 @@
+"""
+Webhook runtime: Telegram POSTs updates to an aiohttp server instead of being polled.
+
+Updates are acknowledged as soon as they are queued on the scheduler of the dispatcher.
+To try it locally, run with BOT_MODE=webhook, WEBHOOK_SECRET_TOKEN set and no WEBHOOK_URL,
+then POST a recorded update:
+
+    curl -X POST localhost:8080/webhook -H "Content-Type: application/json" \\
+         -H "X-Telegram-Bot-Api-Secret-Token: $WEBHOOK_SECRET_TOKEN" -d @update.json
+"""
+import asyncio
+import hmac
+import signal
+from contextlib import suppress
+from logging import getLogger
+
+import orjson
+from aiogram import Bot
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from src.core.config import WebhookConfig
+from src.core.metrics import metrics
+from src.core.scheduler import ScheduledDispatcher
+
+logger = getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token" # noqa: S105, a header name
+
+received_total = metrics.counter(
+    "webhook_updates_total", "Webhook requests by result: queued, rejected, invalid, full or unavailable",
+)
+
+
+class WebhookServer:
+    """
+    aiohttp app receiving Telegram updates.
+
+    Requests without the secret token are refused with 401, unparsable ones with 400.
+    Valid updates are queued on the scheduler, in order per chat (see `scheduler`),
+    and acknowledged right away. When the scheduler is full, or the server is shutting down,
+    the request is refused with 503 and Telegram delivers the update again later.
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            dp: ScheduledDispatcher,
+            secret_token: str,
+            path: str = "/webhook",
+    ) -> None:
+        if not secret_token:
+            raise ValueError("Webhook mode requires a secret token")
+        self._bot = bot
+        self._dp = dp
+        self._secret_token = secret_token.encode()
+        self._path = path
+        self._runner: web.AppRunner | None = None
+        self._accepting = False
+
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle)
+
+    @classmethod
+    def from_config(cls, bot: Bot, dp: ScheduledDispatcher, webhook: WebhookConfig) -> "WebhookServer":
+        return cls(bot, dp, secret_token=webhook.secret_token, path=webhook.path)
+
+    def _is_authorized(self, request: web.Request) -> bool:
+        received = request.headers.get(SECRET_TOKEN_HEADER, "").encode()
+        return hmac.compare_digest(received, self._secret_token)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            received_total.inc(result="rejected")
+            return web.Response(status=401)
+        if not (self._accepting and self._dp.scheduler.running):
+            received_total.inc(result="unavailable")
+            return web.Response(status=503)
+
+        try:
+            update = Update.model_validate(orjson.loads(await request.read()), context={"bot": self._bot})
+        except (orjson.JSONDecodeError, ValidationError) as e:
+            logger.warning(f"Invalid webhook update: {e}")
+            received_total.inc(result="invalid")
+            return web.Response(status=400)
+
+        if not self._dp.try_feed_update(self._bot, update):
+            logger.warning(f"Scheduler is full, update {update.update_id} refused")
+            received_total.inc(result="full")
+            return web.Response(status=503)
+
+        received_total.inc(result="queued")
+        return web.Response()
+
+    async def start(self, host: str, port: int) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self._accepting = True
+        logger.info(f"Webhook server listening on {host}:{port}{self._path}")
+
+    async def stop(self) -> None:
+        """Stops taking updates, the queued ones are drained by the scheduler."""
+        self._accepting = False
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def run_webhook(bot: Bot, dp: ScheduledDispatcher, webhook: WebhookConfig) -> None:
+    """Serves the webhook until SIGINT/SIGTERM."""
+    server = WebhookServer.from_config(bot, dp, webhook)
+    await server.start(webhook.host, webhook.port)
+
+    if webhook.url:
+        logger.info(f"Setting webhook to {webhook.url}")
+        await bot.set_webhook(
+            url=webhook.url,
+            secret_token=webhook.secret_token,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError): # not available on Windows
+            loop.add_signal_handler(signal_number, stopping.set)
+    try:
+        await stopping.wait()
+    finally:
+        await server.stop()
@@ -1,9 +1,12 @@
-from . import add_models, menu, start, un_handled
+from . import add_models, admin, chat, list_models, menu, start, un_handled
 
 routers = [
     start.router,
+    admin.router,
     menu.router,
     add_models.router,
+    list_models.router,
+    chat.router,
 
 
     # Stay last
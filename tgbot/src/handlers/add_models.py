@@ -4,13 +4,21 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
-from src.keyboards.builder import InlineKeyboardFactory
-from src.keyboards.callback import AICallback, AuthMethodCallback, ConfirmationCallback, HTTPMethodCallback
-from src.schemes.enums import AuthMethod, Confirmation, Models
+from src.keyboards.callback import (
+    AICallback,
+    AuthMethodCallback,
+    ConfirmationCallback,
+    DialectCallback,
+    HTTPMethodCallback,
+)
+from src.keyboards.catalog import keyboards
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Models
 from src.services.model import LLMService, LLMServiceFactory
 from src.states.ai import AddAIStates
 from src.text.builder import TextBuilder
+from src.text.catalog import texts
 from src.utils.validators.auth_data import AuthDataValidator
+from src.utils.validators.model_name import ModelNameValidator
 from src.utils.validators.url import URLValidator
 
 router = Router()
@@ -26,7 +34,7 @@ async def handle_add_ai_start(
     selected_language = callback_data.language
     await callback.answer()
     await callback.message.edit_text(
-        text = TextBuilder(selected_language).add_ai_url(),
+        text = texts[selected_language].add_ai_url,
         reply_markup=None,
     )
     await state.update_data(language=selected_language)
@@ -39,14 +47,14 @@ async def handle_ai_url_input(
 ) -> None:
     language = await state.get_value("language")
     user_url = message.text
-    text_builder = TextBuilder(language)
+    language_texts = texts[language]
     if URLValidator().is_valid(user_url):
        await state.update_data(ai_url=user_url)
        await state.set_state(AddAIStates.waiting_for_http_method)
-       text = text_builder.choose_http_method_prompt()
-       reply_markup = InlineKeyboardFactory(language).choose_http_method()
+       text = language_texts.choose_http_method_prompt
+       reply_markup = keyboards[language].choose_http_method
     else:
-        text = text_builder.invalid_url()
+        text = language_texts.invalid_url
         reply_markup = None
 
     await message.answer(
@@ -65,11 +73,59 @@ async def handle_http_method_choice(
 ) -> None:
     await callback.answer()
     await state.update_data(http_method=callback_data.method)
-    await state.set_state(AddAIStates.waiting_for_auth_method)
+    await state.set_state(AddAIStates.waiting_for_dialect)
+    selected_language = callback_data.language
+    await callback.message.edit_text(
+        text=texts[selected_language].choose_dialect_prompt,
+        reply_markup=keyboards[selected_language].choose_dialect,
+    )
+
+@router.callback_query(
+    DialectCallback.filter(),
+    AddAIStates.waiting_for_dialect,
+)
+async def handle_dialect_choice(
+    callback: CallbackQuery,
+    callback_data: DialectCallback,
+    state: FSMContext,
+) -> None:
+    await callback.answer()
+    await state.update_data(dialect=callback_data.dialect, model=None)
     selected_language = callback_data.language
+    language_texts = texts[selected_language]
+    if callback_data.dialect == Dialect.RAW:
+        await state.set_state(AddAIStates.waiting_for_auth_method)
+        text = language_texts.choose_auth_method_prompt
+        reply_markup = keyboards[selected_language].choose_auth_method
+    else:
+        await state.set_state(AddAIStates.waiting_for_model)
+        text = language_texts.enter_model_prompt
+        reply_markup = None
     await callback.message.edit_text(
-        text=TextBuilder(selected_language).choose_auth_method_prompt(),
-        reply_markup=InlineKeyboardFactory(selected_language).choose_auth_method(),
+        text=text,
+        reply_markup=reply_markup,
+    )
+
+@router.message(AddAIStates.waiting_for_model)
+async def handle_model_input(
+        message: Message,
+        state: FSMContext,
+) -> None:
+    language = await state.get_value("language")
+    model_name = message.text
+    language_texts = texts[language]
+    if ModelNameValidator().is_valid(model_name):
+        await state.update_data(model=model_name)
+        await state.set_state(AddAIStates.waiting_for_auth_method)
+        text = language_texts.choose_auth_method_prompt
+        reply_markup = keyboards[language].choose_auth_method
+    else:
+        text = language_texts.invalid_model_name
+        reply_markup = None
+
+    await message.answer(
+        text=text,
+        reply_markup=reply_markup,
     )
 
 
@@ -84,25 +140,25 @@ async def handle_auth_method_choice(
 ) -> None:
     auth_method = callback_data.method
     language = callback_data.language
-    keyboard_factory = InlineKeyboardFactory(language)
-    text_builder = TextBuilder(language)
     await callback.answer()
 
     if auth_method == AuthMethod.NONE:
-        await state.update_data(auth_data=None)
+        await state.update_data(auth_method=auth_method, auth_data=None)
 
         state_user_data = await state.get_data()
-        text = text_builder.confirm_ai_config_prompt(
+        text = TextBuilder(language).confirm_ai_config_prompt(
             url = state_user_data.get("ai_url"),
             http_method = state_user_data.get("http_method"),
             auth_data = state_user_data.get("auth_data"),
             auth_method = state_user_data.get("auth_method"),
+            dialect = state_user_data.get("dialect", Dialect.RAW),
+            model = state_user_data.get("model"),
         )
-        reply_markup = keyboard_factory.confirm_config()
+        reply_markup = keyboards[language].confirm_config
         await state.set_state(AddAIStates.confirming_config)
     else:
         await state.update_data(auth_method=auth_method)
-        text=text_builder.enter_auth_data_prompt(auth_method)
+        text=texts[language].enter_auth_data_prompt[auth_method]
         reply_markup=None
         await state.set_state(AddAIStates.waiting_for_auth_data)
     await callback.message.edit_text(
@@ -119,8 +175,6 @@ async def handle_auth_data_input(
     auth_data_input = message.text
     auth_method = await state.get_value("auth_method")
     language = await state.get_value("language")
-    keyboard_factory = InlineKeyboardFactory(language)
-    text_builder = TextBuilder(language)
 
     if AuthDataValidator(auth_data_input).validate(auth_method):
         user_data = await state.get_data()
@@ -128,18 +182,20 @@ async def handle_auth_data_input(
         ai_url = user_data.get("ai_url")
         http_method = user_data.get("http_method")
         auth_data = auth_data_input
-        text = text_builder.confirm_ai_config_prompt(
+        text = TextBuilder(language).confirm_ai_config_prompt(
             url = ai_url,
             http_method=http_method,
             auth_method=auth_method,
             auth_data = auth_data,
+            dialect = user_data.get("dialect", Dialect.RAW),
+            model = user_data.get("model"),
         )
-        reply_markup = keyboard_factory.confirm_config()
+        reply_markup = keyboards[language].confirm_config
         await state.set_state(AddAIStates.confirming_config)
         await state.update_data(auth_data=auth_data)
 
     else:
-        text = text_builder.invalid_auth_creds(auth_method)
+        text = texts[language].invalid_auth_creds[auth_method]
         reply_markup = None
 
     await message.answer(
@@ -169,6 +225,8 @@ async def handle_confirmation_confirm(
             http_method = ai_data.get("http_method"),
             auth_method = ai_data.get("auth_method"),
             auth_creds= ai_data.get("auth_data"),
+            dialect = ai_data.get("dialect", Dialect.RAW),
+            model = ai_data.get("model"),
         )
 
     else:
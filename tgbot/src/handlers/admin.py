@@ -0,0 +1,18 @@
+from logging import getLogger
+
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from src.core.config import config
+from src.core.metrics import metrics
+from src.utils.stream_renderer import TELEGRAM_MESSAGE_LIMIT
+
+router = Router()
+
+logger = getLogger(__name__)
+
+@router.message(Command("metrics"), F.from_user.id.in_(config.bot.admin_ids))
+async def handle_metrics(message: Message) -> None:
+    logger.info(f"{message.from_user.id}: requested metrics")
+    await message.answer(text=metrics.render()[:TELEGRAM_MESSAGE_LIMIT], parse_mode=None)
@@ -0,0 +1,87 @@
+from logging import getLogger
+
+import aiohttp
+from aiogram import F, Router
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+
+from src.core.config import config
+from src.core.ModelGateway.adapters import AdapterResponseError
+from src.core.ModelGateway.limiter import EndpointOverloadedError
+from src.core.ModelGateway.resilience import CircuitOpenError
+from src.keyboards.callback import ChatCallback
+from src.keyboards.catalog import keyboards
+from src.services.model import LLMService, LLMServiceFactory
+from src.states.chat import ChatStates
+from src.text.builder import TextBuilder
+from src.text.catalog import texts
+from src.utils.deadline import Deadline
+from src.utils.stream_renderer import StreamingMessageRenderer
+
+router = Router()
+
+logger = getLogger(__name__)
+
+@router.callback_query(ChatCallback.filter())
+async def handle_chat_start(
+        callback: CallbackQuery,
+        callback_data: ChatCallback,
+        state: FSMContext,
+) -> None:
+    selected_language = callback_data.language
+    logger.info(f"{callback.from_user.id}: started chat with AI {callback_data.integration_id}")
+    await callback.answer()
+    service: LLMService = LLMServiceFactory.create(callback)
+    integration = await service.get_ai(callback_data.integration_id)
+    if integration is None:
+        await callback.message.edit_text(text=texts[selected_language].ai_not_found)
+        return
+
+    conversation_id = await service.start_chat(integration, callback.message.chat.id)
+    await state.set_state(ChatStates.chatting)
+    await state.update_data(
+        language=selected_language,
+        integration_id=callback_data.integration_id,
+        conversation_id=conversation_id,
+    )
+    await callback.message.edit_text(
+        text=TextBuilder(selected_language).chat_started(callback_data.integration_id),
+        reply_markup=keyboards[selected_language].leave_chat,
+    )
+
+@router.message(ChatStates.chatting, F.text)
+async def handle_chat_message(
+        message: Message,
+        state: FSMContext,
+) -> None:
+    chat_data = await state.get_data()
+    language = chat_data.get("language")
+    language_texts = texts[language]
+    service: LLMService = LLMServiceFactory.create(message)
+
+    integration = await service.get_ai(chat_data.get("integration_id"))
+    if integration is None:
+        await state.clear()
+        await message.answer(text=language_texts.ai_not_found)
+        return
+
+    deadline = Deadline.after(config.gateway.request_deadline)
+    renderer = StreamingMessageRenderer(message, empty_text=language_texts.empty_ai_answer)
+
+    async def show_queue_position(position: int) -> None:
+        await renderer.show_status(TextBuilder(language).ai_queued(position))
+
+    try:
+        await renderer.render(service.ask(
+            integration,
+            message.text,
+            show_queue_position,
+            deadline,
+            chat_data.get("conversation_id"),
+        ))
+    except EndpointOverloadedError as e:
+        logger.info(f"{message.from_user.id}: AI {integration.id} request shed: {e}")
+        await message.answer(text=language_texts.ai_busy)
+    except (aiohttp.ClientError, TimeoutError, CircuitOpenError, AdapterResponseError) as e:
+        logger.warning(f"{message.from_user.id}: AI {integration.id} request failed: {e!r}")
+        await message.answer(text=language_texts.ai_request_failed)
@@ -0,0 +1,34 @@
+from logging import getLogger
+
+from aiogram import F, Router
+from aiogram.types import CallbackQuery
+
+from src.keyboards.builder import InlineKeyboardFactory
+from src.keyboards.callback import AICallback
+from src.schemes.enums import Models
+from src.services.model import LLMService, LLMServiceFactory
+from src.text.builder import TextBuilder
+
+router = Router()
+
+logger = getLogger(__name__)
+
+@router.callback_query(AICallback.filter(F.action == Models.list))
+async def handle_list_ai(
+        callback: CallbackQuery,
+        callback_data: AICallback,
+) -> None:
+    selected_language = callback_data.language
+    logger.info(f"{callback.from_user.id}: listing AI models after id {callback_data.after_id}")
+    await callback.answer()
+    service: LLMService = LLMServiceFactory.create(callback)
+    integrations, next_after_id = await service.list_ais(after_id=callback_data.after_id)
+    await callback.message.edit_text(
+        text=TextBuilder(selected_language).list_ai_models(integrations),
+        reply_markup=InlineKeyboardFactory(selected_language).list_ai(
+            integrations=integrations,
+            after_id=callback_data.after_id,
+            next_after_id=next_after_id,
+        ),
+        disable_web_page_preview=True,
+    )
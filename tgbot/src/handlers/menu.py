@@ -1,11 +1,12 @@
 from logging import getLogger
 
 from aiogram import Router
+from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
-from src.keyboards.builder import InlineKeyboardFactory
 from src.keyboards.callback import BackCallback, LanguageCallback, MenuCallback
-from src.text.builder import TextBuilder
+from src.keyboards.catalog import keyboards
+from src.text.catalog import texts
 
 router = Router()
 
@@ -20,18 +21,23 @@ async def select_language_handler(
     logger.info(f"{callback.from_user.id}: selected language {selected_language.value}")
     await callback.answer()
     await callback.message.edit_text(
-        text=TextBuilder(selected_language).main_menu_greeting(),
-        reply_markup=InlineKeyboardFactory(selected_language).main_menu(),
+        text=texts[selected_language].main_menu_greeting,
+        reply_markup=keyboards[selected_language].main_menu,
     )
 
 @router.callback_query(BackCallback.filter())
-async def back_to_menu_handler(callback: CallbackQuery, callback_data: BackCallback) -> None:
+async def back_to_menu_handler(
+        callback: CallbackQuery,
+        callback_data: BackCallback,
+        state: FSMContext,
+) -> None:
     language = callback_data.language
     logger.info(f"{callback.from_user.id}: clicked back to main menu in language '{language.value}'")
+    await state.clear() # leave any wizard or chat
     await callback.answer()
     await callback.message.edit_text(
-        text=TextBuilder(language).main_menu_greeting(),
-        reply_markup=InlineKeyboardFactory(language).main_menu(),
+        text=texts[language].main_menu_greeting,
+        reply_markup=keyboards[language].main_menu,
     )
 
 @router.callback_query(MenuCallback.filter())
@@ -47,7 +53,7 @@ async def menu_handler(
     )
     await callback.answer()
     await callback.message.edit_text(
-        text = TextBuilder(selected_language).main(selected_item),
-        reply_markup = InlineKeyboardFactory(selected_language).main(selected_item),
+        text = texts[selected_language].menu[selected_item],
+        reply_markup = keyboards[selected_language].menu[selected_item],
         disable_web_page_preview = True,
     )
@@ -4,9 +4,9 @@ from aiogram import Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message
 
-from src.keyboards.builder import InlineKeyboardFactory
+from src.keyboards.catalog import keyboards
 from src.services.user import UserService, UserServiceFactory
-from src.text.builder import TextBuilder
+from src.text.catalog import texts
 
 router = Router()
 
@@ -16,8 +16,8 @@ logger = getLogger(__name__)
 async def start_handler(message: Message) -> None:
     logger.info(f"{message.from_user.id}: started bot")
     await message.answer(
-        text=TextBuilder.start_handler(),
-        reply_markup=InlineKeyboardFactory.choose_language(),
+        text=texts.start_handler,
+        reply_markup=keyboards.choose_language,
     )
     service: UserService = UserServiceFactory.create(message)
     await service.add_new_user()
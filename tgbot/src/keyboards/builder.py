@@ -6,16 +6,20 @@ from src.keyboards.callback import (
     AICallback,
     AuthMethodCallback,
     BackCallback,
+    ChatCallback,
     ConfirmationCallback,
+    DialectCallback,
     HTTPMethodCallback,
     LanguageCallback,
     MenuCallback,
 )
-from src.schemes.enums import AuthMethod, Confirmation, Languages, Menu, Models
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Languages, Menu, Models
+from src.tables.integration_ai import IntegrationAIDTO
+from src.text.localization import locales
 
 
 class InlineKeyboardFactory:
-    """Factory for creating inline keyboards"""
+    """Factory for creating inline keyboards, labels come from the locale files in src/text/locales"""
     def __init__(
             self,
             language: Languages,
@@ -23,45 +27,33 @@ class InlineKeyboardFactory:
         if not isinstance(language, Languages):
             raise TypeError("Language must be an instance of Languages Enum.")
         self._language = language
+        self._locale = locales[language]
         self._builder = InlineKeyboardBuilder()
 
     @staticmethod
     def choose_language() -> InlineKeyboardMarkup:
-        """Create inline keyboard for choosing language"""
+        """Create inline keyboard for choosing language, one button per locale"""
         builder = InlineKeyboardBuilder()
-        builder.button(text="🇷🇺 Русский", callback_data=LanguageCallback(language=Languages.ru).pack())
-        builder.button(text="🇺🇸 English", callback_data=LanguageCallback(language=Languages.en).pack())
+        for language in Languages:
+            builder.button(
+                text=locales[language].text("button.language"),
+                callback_data=LanguageCallback(language=language).pack(),
+            )
         builder.adjust(2)
         return builder.as_markup()
 
+    def _back_button(self, key: str = "button.back") -> None:
+        self._builder.button(
+            text=self._locale.text(key),
+            callback_data=BackCallback(language=self._language).pack(),
+        )
 
     def main_menu(self) -> InlineKeyboardMarkup:
         """Create inline keyboard for main menu"""
-        if self._language == Languages.ru:
-            self._builder.button(
-                text="🧠 Модели",
-                callback_data=MenuCallback(item="models", language=self._language).pack(),
-            )
-            self._builder.button(
-                text="ℹ️ Информация",
-                callback_data=MenuCallback(item="info", language=self._language).pack(),
-            )
-            self._builder.button(
-                text="⚙️ Настройки",
-                callback_data=MenuCallback(item="settings", language=self._language).pack(),
-            )
-        elif self._language == Languages.en:
+        for item in (Menu.models, Menu.info, Menu.settings):
             self._builder.button(
-                text="🧠 Models",
-                callback_data=MenuCallback(item="models", language=self._language).pack(),
-            )
-            self._builder.button(
-                text="ℹ️ Information",
-                callback_data=MenuCallback(item="info", language=self._language).pack(),
-            )
-            self._builder.button(
-                text="⚙️ Settings",
-                callback_data=MenuCallback(item="settings", language=self._language).pack(),
+                text=self._locale.text(f"button.menu.{item.value}"),
+                callback_data=MenuCallback(item=item, language=self._language).pack(),
             )
         self._builder.adjust(1)
         return self._builder.as_markup()
@@ -70,74 +62,17 @@ class InlineKeyboardFactory:
         if not isinstance(item, Menu):
             raise TypeError("Item must be an instance of Menu Enum.")
 
-        if self._language == Languages.ru:
-            if item == Menu.info:
-                self._builder.button(
-                    text="↩️ Назад в меню",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(1)
-            elif item == Menu.models:
-                self._builder.button(
-                    text="➕ Добавить ИИ",
-                    callback_data=AICallback(action=Models.add, language=self._language).pack(),
-                )
-                self._builder.button(
-                    text="🗑️ Удалить ИИ",
-                    callback_data=AICallback(action=Models.delete, language=self._language).pack(),
-                )
-                self._builder.button(
-                    text="📋 Список ИИ",
-                    callback_data=AICallback(action=Models.list, language=self._language).pack(),
-                )
-                self._builder.button(
-                    text="↩️ Назад в меню",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(2, 1, 1) # Изменено для расположения кнопок
-            elif item == Menu.settings:
-                self._builder.button(
-                    text="↩️ Назад в меню",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(1)
-            else:
-                return self.main_menu()
-
-        elif self._language == Languages.en:
-            if item == Menu.info:
-                self._builder.button(
-                    text="↩️ Back to menu",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(1)
-            elif item == Menu.models:
-                self._builder.button(
-                    text="➕ Add AI",
-                    callback_data=AICallback(action=Models.add, language=self._language).pack(),
-                )
-                self._builder.button(
-                    text="🗑️ Delete AI",
-                    callback_data=AICallback(action=Models.delete, language=self._language).pack(),
-                )
+        if item == Menu.models:
+            for action in (Models.add, Models.delete, Models.list):
                 self._builder.button(
-                    text="📋 List AI",
-                    callback_data=AICallback(action=Models.list, language=self._language).pack(),
+                    text=self._locale.text(f"button.models.{action.value}"),
+                    callback_data=AICallback(action=action, language=self._language).pack(),
                 )
-                self._builder.button(
-                    text="↩️ Back to menu",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(2, 1, 1) # Изменено для расположения кнопок
-            elif item == Menu.settings:
-                self._builder.button(
-                    text="↩️ Back to menu",
-                    callback_data=BackCallback(language=self._language).pack(),
-                )
-                self._builder.adjust(1)
-            else:
-                return self.main_menu()
-
+            self._back_button("button.back_to_menu")
+            self._builder.adjust(2, 1, 1)
+        else:
+            self._back_button("button.back_to_menu")
+            self._builder.adjust(1)
         return self._builder.as_markup()
 
     def choose_http_method(self) -> InlineKeyboardMarkup:
@@ -148,76 +83,84 @@ class InlineKeyboardFactory:
                 text=method.value,  # Используем строковое значение Enum
                 callback_data=HTTPMethodCallback(method=method, language=self._language).pack(),
             )
-
-        if self._language == Languages.ru:
-            self._builder.button(text="↩️ Назад", callback_data=BackCallback(language=self._language).pack())
-        elif self._language == Languages.en:
-            self._builder.button(text="↩️ Back", callback_data=BackCallback(language=self._language).pack())
-
+        self._back_button()
         self._builder.adjust(3, 2, 1)
         return self._builder.as_markup()
 
+    def choose_dialect(self) -> InlineKeyboardMarkup:
+        """Create inline keyboard for choosing the API dialect."""
+        for dialect in (Dialect.RAW, Dialect.OPENAI, Dialect.OLLAMA):
+            self._builder.button(
+                text=self._locale.text(f"button.dialect.{dialect.value}"),
+                callback_data=DialectCallback(dialect=dialect, language=self._language).pack(),
+            )
+        self._back_button()
+        self._builder.adjust(3, 1)
+        return self._builder.as_markup()
+
     def choose_auth_method(self) -> InlineKeyboardMarkup:
         """Create inline keyboard for choosing authentication method."""
-        if self._language == Languages.ru:
-            self._builder.button(text="Нет", callback_data=AuthMethodCallback(
-                method=AuthMethod.NONE,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="Куки", callback_data=AuthMethodCallback(
-                method=AuthMethod.COOKIES,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="Заголовки", callback_data=AuthMethodCallback(
-                method=AuthMethod.HEADERS,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="↩️ Назад", callback_data=BackCallback(language=self._language).pack())
-        elif self._language == Languages.en:
-            self._builder.button(text="None", callback_data=AuthMethodCallback(
-                method=AuthMethod.NONE,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="Cookies", callback_data=AuthMethodCallback(
-                method=AuthMethod.COOKIES,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="Headers", callback_data=AuthMethodCallback(
-                method=AuthMethod.HEADERS,
-                language=self._language,
-            ).pack())
-            self._builder.button(text="↩️ Back", callback_data=BackCallback(
-                language=self._language,
-            ).pack())
-
+        for method in (AuthMethod.NONE, AuthMethod.COOKIES, AuthMethod.HEADERS):
+            self._builder.button(
+                text=self._locale.text(f"button.auth_method.{method.value}"),
+                callback_data=AuthMethodCallback(method=method, language=self._language).pack(),
+            )
+        self._back_button()
         self._builder.adjust(3, 1)
         return self._builder.as_markup()
 
     def confirm_config(self) -> InlineKeyboardMarkup:
         """Create inline keyboard for confirming AI configuration."""
-        if self._language == Languages.ru:
-            self._builder.button(text="✅ Да",
-                           callback_data=ConfirmationCallback(
-                               choice=Confirmation.YES,
-                               language=self._language,
-                           ).pack())
-            self._builder.button(text="❌ Нет",
-                           callback_data=ConfirmationCallback(
-                               choice=Confirmation.NO,
-                               language=self._language,
-                           ).pack())
-        elif self._language == Languages.en:
-            self._builder.button(text="✅ Yes",
-                           callback_data=ConfirmationCallback(
-                               choice=Confirmation.YES,
-                               language=self._language,
-                           ).pack())
-            self._builder.button(text="❌ No",
-                           callback_data=ConfirmationCallback(
-                               choice=Confirmation.NO,
-                               language=self._language,
-                           ).pack())
-
+        for choice in (Confirmation.YES, Confirmation.NO):
+            self._builder.button(
+                text=self._locale.text(f"button.confirmation.{choice.value}"),
+                callback_data=ConfirmationCallback(choice=choice, language=self._language).pack(),
+            )
         self._builder.adjust(2)
         return self._builder.as_markup()
 
+    def leave_chat(self) -> InlineKeyboardMarkup:
+        """Create inline keyboard shown while chatting with an AI."""
+        self._back_button("button.leave_chat")
+        return self._builder.as_markup()
+
+    def list_ai(
+            self,
+            integrations: list[IntegrationAIDTO],
+            after_id: int,
+            next_after_id: int | None,
+    ) -> InlineKeyboardMarkup:
+        """
+        Create inline keyboard for one page of the "List AI" menu, one chat button per AI.
+        Pages are addressed by keyset cursor, so every page costs the same to load.
+        """
+        for integration in integrations:
+            self._builder.button(
+                text=f"💬 {integration.id}",
+                callback_data=ChatCallback(integration_id=integration.id, language=self._language).pack(),
+            )
+
+        if after_id:
+            self._builder.button(
+                text=self._locale.text("button.first_page"),
+                callback_data=AICallback(action=Models.list, language=self._language).pack(),
+            )
+        if next_after_id is not None:
+            self._builder.button(
+                text=self._locale.text("button.next_page"),
+                callback_data=AICallback(
+                    action=Models.list,
+                    language=self._language,
+                    after_id=next_after_id,
+                ).pack(),
+            )
+        self._builder.button(
+            text=self._locale.text("button.back"),
+            callback_data=MenuCallback(item=Menu.models, language=self._language).pack(),
+        )
+        full_rows, last_row = divmod(len(integrations), 5)
+        paging = bool(after_id) + (next_after_id is not None)
+        sizes = [5] * full_rows + [size for size in (last_row, paging) if size]
+        self._builder.adjust(*sizes, 1)
+        return self._builder.as_markup()
+
@@ -1,34 +1,44 @@
-from aiogram.filters.callback_data import CallbackData
-
 from src.core.ModelGateway.ai_http_client import HTTPMethods
-from src.schemes.enums import AuthMethod, Confirmation, Languages, Menu, Models
+from src.keyboards.codec import CompactCallbackData
+from src.schemes.enums import AuthMethod, Confirmation, Dialect, Languages, Menu, Models
 
 
-class LanguageCallback(CallbackData, prefix="lang"):
+class LanguageCallback(CompactCallbackData, prefix="lang", code="l"):
     language: Languages
 
-class MenuCallback(CallbackData, prefix="menu"):
+class MenuCallback(CompactCallbackData, prefix="menu", code="m"):
     item: Menu
     language: Languages
 
-class AICallback(CallbackData, prefix="ai"):
+class AICallback(CompactCallbackData, prefix="ai", code="a"):
     action: Models
     language: Languages
+    after_id: int = 0 # keyset cursor of the "List AI" pages
 
-class BackCallback(CallbackData, prefix="back"):
+class BackCallback(CompactCallbackData, prefix="back", code="b"):
     language: Languages
 
 
-class HTTPMethodCallback(CallbackData, prefix="http_method"):
+class HTTPMethodCallback(CompactCallbackData, prefix="http_method", code="h"):
     method: HTTPMethods
     language: Languages
 
 
-class AuthMethodCallback(CallbackData, prefix="auth_method"):
+class DialectCallback(CompactCallbackData, prefix="dialect", code="d"):
+    dialect: Dialect
+    language: Languages
+
+
+class AuthMethodCallback(CompactCallbackData, prefix="auth_method", code="u"):
     method: AuthMethod
     language: Languages
 
 
-class ConfirmationCallback(CallbackData, prefix="confirm"):
+class ConfirmationCallback(CompactCallbackData, prefix="confirm", code="c"):
     choice: Confirmation
     language: Languages
+
+
+class ChatCallback(CompactCallbackData, prefix="chat", code="t"):
+    integration_id: int
+    language: Languages
@@ -0,0 +1,54 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from aiogram.types import InlineKeyboardMarkup
+
+from src.keyboards.builder import InlineKeyboardFactory
+from src.schemes.enums import Languages, Menu
+
+
+@dataclass(frozen=True, slots=True)
+class LanguageKeyboards:
+    """Static keyboards of one language."""
+    main_menu: InlineKeyboardMarkup
+    menu: Mapping[Menu, InlineKeyboardMarkup] # keyboard of each main menu item
+    choose_http_method: InlineKeyboardMarkup
+    choose_dialect: InlineKeyboardMarkup
+    choose_auth_method: InlineKeyboardMarkup
+    confirm_config: InlineKeyboardMarkup
+    leave_chat: InlineKeyboardMarkup
+
+
+def build_keyboards(language: Languages) -> LanguageKeyboards:
+    # A factory keeps its buttons between calls, so every keyboard gets a new one
+    return LanguageKeyboards(
+        main_menu=InlineKeyboardFactory(language).main_menu(),
+        menu=MappingProxyType({item: InlineKeyboardFactory(language).main(item) for item in Menu}),
+        choose_http_method=InlineKeyboardFactory(language).choose_http_method(),
+        choose_dialect=InlineKeyboardFactory(language).choose_dialect(),
+        choose_auth_method=InlineKeyboardFactory(language).choose_auth_method(),
+        confirm_config=InlineKeyboardFactory(language).confirm_config(),
+        leave_chat=InlineKeyboardFactory(language).leave_chat(),
+    )
+
+
+class KeyboardCatalog:
+    """
+    Keyboards that do not depend on user data, built once per language at startup
+    instead of on every callback (packing each button's CallbackData included).
+
+    The same objects are sent to every user: markups are frozen pydantic models,
+    their button rows must not be modified either.
+    Keyboards with user data (e.g. the "List AI" pages) are still built by InlineKeyboardFactory.
+    """
+
+    def __init__(self) -> None:
+        self.choose_language = InlineKeyboardFactory.choose_language()
+        self._languages = MappingProxyType({language: build_keyboards(language) for language in Languages})
+
+    def __getitem__(self, language: Languages) -> LanguageKeyboards:
+        return self._languages[language]
+
+
+keyboards = KeyboardCatalog()
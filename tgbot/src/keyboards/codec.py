@@ -0,0 +1,204 @@
+"""
+Compact callback_data for inline buttons.
+
+A CompactCallbackData is packed as its one-character code followed by its fields,
+in declaration order: an enum member as one base-36 digit (its position in the enum),
+an int in base 36, ended by "." unless it is the last field. `http_method:POST:en`
+becomes `h01` and `ai:list:en:123456` becomes `a112n9c`, which leaves room in the
+64 bytes Telegram allows for cursors and ids. As the digit of a member is its position,
+new members of these enums go last, or buttons already sent would change meaning.
+
+Unpacking reads the fields by position and builds the model without pydantic
+validation, the codec validates every field itself. Callbacks are frozen, so the
+same button pressed again gets the instance unpacked the first time, from a small
+per-class cache. Data in the aiogram format ("<prefix>:<field>:..."), e.g. of
+keyboards sent before, is still unpacked.
+"""
+import math
+from collections.abc import Mapping
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, ClassVar, Literal, Self
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData, CallbackQueryFilter
+from aiogram.types import CallbackQuery
+from magic_filter import MagicFilter
+from pydantic import ConfigDict
+
+from src.utils.cache import TTLCache
+
+BASE = 36
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+INT_END = "."
+LEGACY_SEPARATOR = ":" # of the aiogram format
+UNPACKED_CACHE_SIZE = 1024 # per class, callbacks of enum fields only have a few values
+
+_by_code: dict[str, type["CompactCallbackData"]] = {}
+_by_prefix: dict[str, type["CompactCallbackData"]] = {}
+callback_classes: Mapping[str, type["CompactCallbackData"]] = MappingProxyType(_by_code)
+
+
+def encode_int(number: int) -> str:
+    if number < 0:
+        raise ValueError(f"Only non-negative ints can be packed, got {number}")
+    digits = []
+    while True:
+        number, digit = divmod(number, BASE)
+        digits.append(DIGITS[digit])
+        if not number:
+            return "".join(reversed(digits))
+
+
+class _EnumField:
+    __slots__ = ("by_digit", "digits", "name")
+
+    def __init__(self, name: str, enum: type[Enum]) -> None:
+        members = tuple(enum)
+        if len(members) > BASE:
+            raise TypeError(f"{enum.__name__} has more than {BASE} members, too many for one digit")
+        self.name = name
+        self.digits = {member: DIGITS[index] for index, member in enumerate(members)}
+        self.by_digit = {DIGITS[index]: member for index, member in enumerate(members)}
+
+    def encode(self, value: Enum) -> str:
+        return self.digits[value]
+
+    def decode(self, data: str, position: int) -> tuple[Enum, int]:
+        member = self.by_digit.get(data[position:position + 1])
+        if member is None:
+            raise ValueError(f"Bad {self.name} in callback data {data!r}")
+        return member, position + 1
+
+
+class _IntField:
+    __slots__ = ("last", "name")
+
+    def __init__(self, name: str, last: bool) -> None:
+        self.name = name
+        self.last = last
+
+    def encode(self, value: int) -> str:
+        return encode_int(value) if self.last else encode_int(value) + INT_END
+
+    def decode(self, data: str, position: int) -> tuple[int, int]:
+        end = len(data) if self.last else data.find(INT_END, position)
+        token = data[position:end]
+        if end < 0 or not token.isalnum() or not token.isascii():
+            raise ValueError(f"Bad {self.name} in callback data {data!r}")
+        return int(token, BASE), end if self.last else end + 1
+
+
+def _field_codec(name: str, annotation: Any, last: bool) -> _EnumField | _IntField: # noqa: ANN401, a type
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return _EnumField(name, annotation)
+    if annotation is int:
+        return _IntField(name, last)
+    raise TypeError(f"Field {name}: {annotation} can not be packed, only enums and ints can")
+
+
+class CompactCallbackData(CallbackData, prefix="compact"):
+    """
+    CallbackData packed with a short code instead of its prefix (see the module docstring),
+    declared as `class MenuCallback(CompactCallbackData, prefix="menu", code="m")`.
+    Codes are one character and unique, `prefix` is kept to read data of older keyboards.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    __short_code__: ClassVar[str]
+    __fields_codecs__: ClassVar[tuple[_EnumField | _IntField, ...]]
+    __unpacked__: ClassVar[TTLCache[str, "CompactCallbackData"]]
+
+    def __init_subclass__(cls, code: str = "", **kwargs: Any) -> None: # noqa: ANN401, class keywords
+        if len(code) != 1 or code not in DIGITS:
+            raise ValueError(f"{cls.__name__}: code must be one of {DIGITS!r}, got {code!r}")
+        cls.__short_code__ = code
+        super().__init_subclass__(**kwargs)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None: # noqa: ANN401, class keywords
+        super().__pydantic_init_subclass__(**kwargs)
+        names = tuple(cls.model_fields)
+        cls.__fields_codecs__ = tuple(
+            _field_codec(name, field.annotation, last=index == len(names) - 1)
+            for index, (name, field) in enumerate(cls.model_fields.items())
+        )
+        cls.__unpacked__ = TTLCache(max_size=UNPACKED_CACHE_SIZE, ttl=math.inf)
+        for registry, key in ((_by_code, cls.__short_code__), (_by_prefix, cls.__prefix__)):
+            if registry.setdefault(key, cls) is not cls:
+                raise ValueError(f"{cls.__name__}: {key!r} is already used by {registry[key].__name__}")
+
+    def pack(self) -> str:
+        data = self.__short_code__ + "".join(
+            codec.encode(getattr(self, codec.name)) for codec in self.__fields_codecs__
+        )
+        if len(data) > MAX_CALLBACK_LENGTH: # the digits are ASCII, one byte each
+            raise ValueError(f"Resulted callback data is too long! len({data!r}) > {MAX_CALLBACK_LENGTH}")
+        return data
+
+    @classmethod
+    def unpack(cls, value: str) -> Self:
+        if LEGACY_SEPARATOR in value: # never in compact data
+            return super().unpack(value)
+        if value[:1] != cls.__short_code__:
+            raise ValueError(f"Bad code ({value[:1]!r} != {cls.__short_code__!r})")
+        callback = cls.__unpacked__.get(value)
+        if callback is None:
+            callback = cls.decode(value)
+            cls.__unpacked__.set(value, callback)
+        return callback
+
+    @classmethod
+    def decode(cls, value: str) -> Self:
+        """Unpacks compact data of this class, without the cache."""
+        fields = {}
+        position = 1
+        for codec in cls.__fields_codecs__:
+            fields[codec.name], position = codec.decode(value, position)
+        if position != len(value):
+            raise ValueError(f"Callback data {value!r} is longer than {cls.__name__}")
+        return cls.model_construct(**fields)
+
+    @classmethod
+    def filter(cls, rule: MagicFilter | None = None) -> "CompactCallbackQueryFilter":
+        return CompactCallbackQueryFilter(callback_data=cls, rule=rule)
+
+
+class CompactCallbackQueryFilter(CallbackQueryFilter):
+    """
+    CallbackQueryFilter reusing the callback unpacked once for the update
+    (passed as `callback_data`, see src/core/callback_dispatch.py), it unpacks
+    the data itself only when there is none of its class.
+    """
+
+    async def __call__(
+            self,
+            query: CallbackQuery,
+            callback_data: CallbackData | None = None,
+    ) -> Literal[False] | dict[str, Any]:
+        if type(callback_data) is not self.callback_data:
+            if not isinstance(query, CallbackQuery) or not query.data:
+                return False
+            try:
+                callback_data = self.callback_data.unpack(query.data)
+            except (TypeError, ValueError):
+                return False
+
+        if self.rule is None or self.rule.resolve(callback_data):
+            return {"callback_data": callback_data}
+        return False
+
+
+def callback_class(data: str) -> type[CompactCallbackData] | None:
+    """Class that packed `data`, in either format."""
+    if LEGACY_SEPARATOR in data: # never in compact data
+        return _by_prefix.get(data.partition(LEGACY_SEPARATOR)[0])
+    return _by_code.get(data[:1])
+
+
+def unpack(data: str) -> CompactCallbackData:
+    """Unpacks `data` with the class that packed it, raises ValueError or TypeError when none did."""
+    cls = callback_class(data)
+    if cls is None:
+        raise ValueError(f"Unknown callback data {data!r}")
+    return cls.unpack(data)
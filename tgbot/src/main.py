@@ -1,11 +1,19 @@
 import asyncio
 
+from src.core.config import config
 from src.core.lifespan import init_application
+from src.core.webhook import run_webhook
 
 
 async def start_bot() -> None:
     async with init_application() as (bot, dp):
-        await dp.start_polling(bot)
+        if config.bot.mode == "webhook":
+            await run_webhook(bot, dp, config.webhook)
+        elif config.bot.mode == "polling":
+            # Updates are queued on the scheduler, waiting on it is the backpressure
+            await dp.start_polling(bot, handle_as_tasks=False)
+        else:
+            raise ValueError(f"Invalid bot mode: {config.bot.mode}")
 
 if __name__ == "__main__":
     asyncio.run(start_bot())
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator, Awaitable, Callable
-from typing import TypeVar
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable, Sequence
+from typing import Any, TypeVar
 
-from aiosqlite import Connection
+from aiosqlite import Connection, Row
 
+from src.core.db.writer import SQLiteWriter
 from src.tables.base import Base
+from src.utils.single_flight import SingleFlight
 
 T = TypeVar("T")
 TableType = TypeVar("TableType", bound=Base)
@@ -14,9 +16,55 @@ class AbstractRepository(ABC):
             self,
             db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
             table_class: TableType,
+            writer: SQLiteWriter | None = None,
+            reads: SingleFlight | None = None,
     ) -> None:
         self._db_session_factory = db_session_factory
         self._table_name = table_class.get_name()
+        self._writer = writer
+        self._reads = reads
+
+    async def _read_once[R](self, key: Hashable, read: Callable[[], Awaitable[R]]) -> R:
+        """Runs 'read', sharing it with concurrent identical reads when the repository has a 'reads' group."""
+        if self._reads is None:
+            return await read()
+        # Groups are shared by repositories of every database, only reads of the same one may be shared
+        return await self._reads.do((self._db_session_factory, key), read)
+
+    def _forget_reads(self) -> None:
+        # Reads already in flight may not see the write, later callers start new ones
+        if self._reads is not None:
+            self._reads.forget()
+
+    async def _write(self, query: str, parameters: Sequence[Any]) -> Row | None:
+        """Executes a write statement, through the group-commit writer when one is set.
+        Returns the first row produced by 'RETURNING', if any.
+        """
+        try:
+            if self._writer is not None:
+                return await self._writer.execute(query, parameters)
+
+            async with self._db_session_factory() as session:
+                result = await session.execute(query, parameters)
+                rows = await result.fetchall()
+                await session.commit()
+            return rows[0] if rows else None
+        finally:
+            self._forget_reads()
+
+    async def _write_all(self, query: str, parameters: Sequence[Any]) -> list[Row]:
+        """Same as '_write', but returns every row produced by 'RETURNING'."""
+        try:
+            if self._writer is not None:
+                return await self._writer.execute_fetchall(query, parameters)
+
+            async with self._db_session_factory() as session:
+                result = await session.execute(query, parameters)
+                rows = await result.fetchall()
+                await session.commit()
+            return list(rows)
+        finally:
+            self._forget_reads()
 
     @abstractmethod
     async def get(self, **kwargs: dict) -> T | None:
@@ -25,7 +73,7 @@ class AbstractRepository(ABC):
         """
 
     @abstractmethod
-    async def list(self, limit: int, offset: int) -> list[T]:
+    async def list(self, after_id: int, limit: int) -> list[T]:
         pass
 
     @abstractmethod
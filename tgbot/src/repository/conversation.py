@@ -0,0 +1,136 @@
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+
+from aiosqlite import Connection
+
+from src.core.db.writer import SQLiteWriter
+from src.tables.conversation import (
+    Conversation,
+    ConversationDTO,
+    ConversationInputDTO,
+    ConversationMessage,
+    ConversationMessageDTO,
+    ConversationMessageInputDTO,
+)
+
+from .base import AbstractRepository
+
+
+class ConversationRepository(AbstractRepository):
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+    ) -> None:
+        super().__init__(db_session_factory, Conversation, writer)
+
+    async def get(self, **kwargs: dict[str, int | str]) -> ConversationDTO | None:
+        if len(kwargs) != 1:
+            raise ValueError("'kwargs' must have exactly 1 argument")
+
+        column, value = next(iter(kwargs.items()))
+        valid_fields = ConversationDTO.__annotations__.keys()
+
+        if column not in valid_fields:
+            raise ValueError(f"Invalid column name: {column}")
+
+        query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (value,))
+            row = await result.fetchone()
+        return ConversationDTO(**dict(row)) if row else None
+
+    async def add(self, dto: ConversationInputDTO) -> ConversationDTO:
+        query = f"""
+            INSERT INTO {self._table_name} (user_id, chat_id, integration_id, created_at)
+            VALUES (?, ?, ?, ?)
+            RETURNING *
+        """
+        row = await self._write(query, (dto.user_id, dto.chat_id, dto.integration_id, dto.created_at))
+        return ConversationDTO(**dict(row))
+
+    async def list(
+            self,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[ConversationDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (after_id, limit))
+            rows = await result.fetchall()
+        return [ConversationDTO(**dict(row)) for row in rows] if rows else []
+
+    async def delete(self, row_id: int) -> ConversationDTO | None:
+        """Deletes the conversation, its messages are deleted by a trigger in the same statement."""
+        row = await self._write(f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *", (row_id,))
+        return ConversationDTO(**dict(row)) if row else None
+
+
+class ConversationMessageRepository(AbstractRepository):
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+    ) -> None:
+        super().__init__(db_session_factory, ConversationMessage, writer)
+
+    async def get(self, **kwargs: dict[str, int | str]) -> ConversationMessageDTO | None:
+        if len(kwargs) != 1:
+            raise ValueError("'kwargs' must have exactly 1 argument")
+
+        column, value = next(iter(kwargs.items()))
+        valid_fields = ConversationMessageDTO.__annotations__.keys()
+
+        if column not in valid_fields:
+            raise ValueError(f"Invalid column name: {column}")
+
+        query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (value,))
+            row = await result.fetchone()
+        return ConversationMessageDTO(**dict(row)) if row else None
+
+    async def add(self, dto: ConversationMessageInputDTO) -> ConversationMessageDTO:
+        rows = await self.add_many([dto])
+        return rows[0]
+
+    async def add_many(self, dtos: Sequence[ConversationMessageInputDTO]) -> list[ConversationMessageDTO]:
+        """Appends messages with one multi-row INSERT, e.g. a whole user/assistant turn."""
+        if not dtos:
+            return []
+        query = f"""
+            INSERT INTO {self._table_name} (conversation_id, role, content, created_at)
+            VALUES {", ".join(["(?, ?, ?, ?)"] * len(dtos))}
+            RETURNING *
+        """
+        parameters = [
+            value
+            for dto in dtos
+            for value in (dto.conversation_id, dto.role, dto.content, dto.created_at)
+        ]
+        rows = await self._write_all(query, parameters)
+        return sorted((ConversationMessageDTO(**dict(row)) for row in rows), key=lambda dto: dto.id)
+
+    async def recent(self, conversation_id: int, limit: int = 100) -> list[ConversationMessageDTO]:
+        """Returns the last 'limit' messages of the conversation, oldest first."""
+        query = f"SELECT * FROM {self._table_name} WHERE conversation_id = ? ORDER BY id DESC LIMIT ?"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (conversation_id, limit))
+            rows = await result.fetchall()
+        return [ConversationMessageDTO(**dict(row)) for row in reversed(rows)]
+
+    async def list(
+            self,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[ConversationMessageDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (after_id, limit))
+            rows = await result.fetchall()
+        return [ConversationMessageDTO(**dict(row)) for row in rows] if rows else []
+
+    async def delete(self, row_id: int) -> ConversationMessageDTO | None:
+        row = await self._write(f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *", (row_id,))
+        return ConversationMessageDTO(**dict(row)) if row else None
@@ -0,0 +1,86 @@
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+
+from aiosqlite import Connection
+
+from src.core.db.writer import SQLiteWriter
+from src.tables.fsm_state import FsmState, FsmStateDTO, FsmStateInputDTO
+
+from .base import AbstractRepository
+
+
+class FsmStateRepository(AbstractRepository):
+    # Rows per multi-row statement, keeps bound parameters far below SQLite's limit
+    CHUNK_SIZE = 500
+
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+    ) -> None:
+        super().__init__(db_session_factory, FsmState, writer)
+
+    async def get(self, **kwargs: dict[str, int | str]) -> FsmStateDTO | None:
+        if len(kwargs) != 1:
+            raise ValueError("'kwargs' must have exactly 1 argument")
+
+        column, value = next(iter(kwargs.items()))
+        valid_fields = FsmStateDTO.__annotations__.keys()
+
+        if column not in valid_fields:
+            raise ValueError(f"Invalid column name: {column}")
+
+        query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (value,))
+            row = await result.fetchone()
+        return FsmStateDTO(**dict(row)) if row else None
+
+    async def add(self, dto: FsmStateInputDTO) -> FsmStateDTO:
+        rows = await self.upsert_many([dto])
+        return rows[0]
+
+    async def upsert_many(self, dtos: Sequence[FsmStateInputDTO]) -> list[FsmStateDTO]:
+        """Inserts or replaces the state and data of every key, one statement per 'CHUNK_SIZE' keys."""
+        result = []
+        for start in range(0, len(dtos), self.CHUNK_SIZE):
+            chunk = dtos[start:start + self.CHUNK_SIZE]
+            query = f"""
+                INSERT INTO {self._table_name} (key, state, data, updated_at)
+                VALUES {", ".join(["(?, ?, ?, ?)"] * len(chunk))}
+                ON CONFLICT(key) DO UPDATE SET
+                    state = excluded.state,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                RETURNING *
+            """
+            parameters = [value for dto in chunk for value in (dto.key, dto.state, dto.data, dto.updated_at)]
+            rows = await self._write_all(query, parameters)
+            result.extend(FsmStateDTO(**dict(row)) for row in rows)
+        return result
+
+    async def list(
+            self,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[FsmStateDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (after_id, limit))
+            rows = await result.fetchall()
+        return [FsmStateDTO(**dict(row)) for row in rows] if rows else []
+
+    async def delete(self, row_id: int) -> FsmStateDTO | None:
+        row = await self._write(f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *", (row_id,))
+        return FsmStateDTO(**dict(row)) if row else None
+
+    async def delete_keys(self, keys: Sequence[str]) -> None:
+        for start in range(0, len(keys), self.CHUNK_SIZE):
+            chunk = keys[start:start + self.CHUNK_SIZE]
+            await self._write(
+                f"DELETE FROM {self._table_name} WHERE key IN ({", ".join("?" * len(chunk))})",
+                chunk,
+            )
+
+    async def delete_expired(self, updated_before: float) -> None:
+        await self._write(f"DELETE FROM {self._table_name} WHERE updated_at < ?", (updated_before,))
@@ -1,15 +1,30 @@
-from collections.abc import AsyncGenerator, Awaitable, Callable
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable
 
 from aiosqlite import Connection
 
+from src.core.db.writer import SQLiteWriter
 from src.tables.integration_ai import IntegrationAI, IntegrationAIDTO, IntegrationAIInputDTO
+from src.utils.single_flight import SingleFlight
 
 from .base import AbstractRepository
 
+# Concurrent 'get' calls on the same database with the same column and value share one query
+llm_reads: SingleFlight[Hashable, IntegrationAIDTO | None] = SingleFlight("llm_repository_get")
+
 
 class LLMRepository(AbstractRepository):
-    def __init__(self, db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]]) -> None:
-        super().__init__(db_session_factory, IntegrationAI)
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+            reads: SingleFlight[Hashable, IntegrationAIDTO | None] | None = None,
+    ) -> None:
+        super().__init__(
+            db_session_factory,
+            IntegrationAI,
+            writer,
+            reads if reads is not None else llm_reads,
+        )
 
     async def get(self, **kwargs: dict[str, int | str]) -> IntegrationAIDTO | None:
         if len(kwargs) != 1:
@@ -22,76 +37,96 @@ class LLMRepository(AbstractRepository):
             raise ValueError(f"Invalid column name: {column}")
 
         query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
-        async with self._db_session_factory() as session:
-            result = await session.execute(query, (value, ))
-            row = await result.fetchone()
-        return IntegrationAIDTO(**dict(row)) if row else None
+
+        async def read() -> IntegrationAIDTO | None:
+            async with self._db_session_factory() as session:
+                result = await session.execute(query, (value,))
+                row = await result.fetchone()
+            return IntegrationAIDTO(**dict(row)) if row else None
+
+        return await self._read_once((column, value), read)
 
     async def add(self, dto: IntegrationAIInputDTO) -> IntegrationAIDTO:
         query = (f"""
         INSERT INTO {self._table_name} (
             creator_id, url, auth_type,
-            auth_creds, http_method
-        ) VALUES (?, ?, ?, ?, ?)
+            auth_creds, http_method, dialect, model
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
         RETURNING *
         """)
-        async with self._db_session_factory() as session:
-            result = await session.execute(
-                sql=query,
-                parameters=(
-                    dto.creator_id,
-                    dto.url,
-                    dto.auth_type,
-                    dto.auth_creds,
-                    dto.http_method,
-                ),
-            )
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(
+            query,
+            (
+                dto.creator_id,
+                dto.url,
+                dto.auth_type,
+                dto.auth_creds,
+                dto.http_method,
+                dto.dialect,
+                dto.model,
+            ),
+        )
         return IntegrationAIDTO(**dict(row))
 
+    async def list_by_creator(
+            self,
+            creator_id: int,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[IntegrationAIDTO]:
+        """Keyset pagination over integrations of one creator, served by the creator_id index."""
+        query = f"""
+            SELECT * FROM {self._table_name}
+            WHERE creator_id = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (creator_id, after_id, limit))
+            rows = await result.fetchall()
+        return [IntegrationAIDTO(**dict(row)) for row in rows] if rows else []
+
     async def list(
             self,
-            offset: int = 0,
+            after_id: int = 0,
             limit: int = 100,
-    ) -> list[IntegrationAIDTO | None]:
-        query = f"SELECT * FROM {self._table_name} ORDER BY id LIMIT ? OFFSET ?"
+    ) -> list[IntegrationAIDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
         async with self._db_session_factory() as session:
-            result = await session.execute(query, (limit, offset))
+            result = await session.execute(query, (after_id, limit))
             rows = await result.fetchall()
         return [IntegrationAIDTO(**dict(row)) for row in rows] if rows else []
 
     async def delete(self, row_id: int) -> IntegrationAIDTO | None:
         query = f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *"
-        async with self._db_session_factory() as session:
-            result = await session.execute(query, (row_id,))
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(query, (row_id,))
         return IntegrationAIDTO(**dict(row)) if row else None
 
     async def update(self, dto: IntegrationAIDTO) -> IntegrationAIDTO | None:
         query = (f"""
                 UPDATE {self._table_name}
-                SET id = ?
-                    creator_id = ?
-                    url = ?
-                    auth_type = ?
-                    auth_creds = ?
-                    http_method = ?
+                SET creator_id = ?,
+                    url = ?,
+                    auth_type = ?,
+                    auth_creds = ?,
+                    http_method = ?,
+                    dialect = ?,
+                    model = ?
                 WHERE id = ?
                 RETURNING *
         """)
-        async with self._db_session_factory() as session:
-            result = await session.execute(
-                sql=query,
-                parameters=(
-                    dto.creator_id,
-                    dto.url,
-                    dto.auth_type,
-                    dto.auth_creds,
-                    dto.http_method,
-                ),
-            )
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(
+            query,
+            (
+                dto.creator_id,
+                dto.url,
+                dto.auth_type,
+                dto.auth_creds,
+                dto.http_method,
+                dto.dialect,
+                dto.model,
+                dto.id,
+            ),
+        )
         return IntegrationAIDTO(**dict(row)) if row else None
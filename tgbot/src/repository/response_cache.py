@@ -0,0 +1,82 @@
+from collections.abc import AsyncGenerator, Awaitable, Callable
+
+from aiosqlite import Connection
+
+from src.core.db.writer import SQLiteWriter
+from src.tables.response_cache import ResponseCache, ResponseCacheDTO, ResponseCacheInputDTO
+
+from .base import AbstractRepository
+
+
+class ResponseCacheRepository(AbstractRepository):
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+    ) -> None:
+        super().__init__(db_session_factory, ResponseCache, writer)
+
+    async def get(self, **kwargs: dict[str, int | str]) -> ResponseCacheDTO | None:
+        if len(kwargs) != 1:
+            raise ValueError("'kwargs' must have exactly 1 argument")
+
+        column, value = next(iter(kwargs.items()))
+        valid_fields = ResponseCacheDTO.__annotations__.keys()
+
+        if column not in valid_fields:
+            raise ValueError(f"Invalid column name: {column}")
+
+        query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (value,))
+            row = await result.fetchone()
+        return ResponseCacheDTO(**dict(row)) if row else None
+
+    async def get_live(self, key: str, now: float) -> ResponseCacheDTO | None:
+        """Returns the entry of 'key' unless it has expired at 'now' (unix time)."""
+        query = f"SELECT * FROM {self._table_name} WHERE key = ? AND expires_at > ? LIMIT 1"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (key, now))
+            row = await result.fetchone()
+        return ResponseCacheDTO(**dict(row)) if row else None
+
+    async def add(self, dto: ResponseCacheInputDTO) -> ResponseCacheDTO:
+        """Stores the entry, replacing the one with the same 'key' (the new row gets a new id)."""
+        query = f"""
+            INSERT OR REPLACE INTO {self._table_name} (
+                key, integration_id, body, size, created_at, expires_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            RETURNING *
+        """
+        row = await self._write(
+            query,
+            (dto.key, dto.integration_id, dto.body, dto.size, dto.created_at, dto.expires_at),
+        )
+        return ResponseCacheDTO(**dict(row))
+
+    async def list(
+            self,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[ResponseCacheDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
+        async with self._db_session_factory() as session:
+            result = await session.execute(query, (after_id, limit))
+            rows = await result.fetchall()
+        return [ResponseCacheDTO(**dict(row)) for row in rows] if rows else []
+
+    async def delete(self, row_id: int) -> ResponseCacheDTO | None:
+        row = await self._write(f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *", (row_id,))
+        return ResponseCacheDTO(**dict(row)) if row else None
+
+    async def prune(self, now: float, max_rows: int) -> None:
+        """
+        Deletes expired entries, then the oldest ones beyond 'max_rows'.
+        Ids grow with every write, so the id range is used instead of counting rows.
+        """
+        await self._write(f"DELETE FROM {self._table_name} WHERE expires_at <= ?", (now,))
+        await self._write(
+            f"DELETE FROM {self._table_name} WHERE id <= (SELECT MAX(id) FROM {self._table_name}) - ?",
+            (max_rows,),
+        )
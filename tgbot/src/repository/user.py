@@ -1,15 +1,35 @@
-from collections.abc import AsyncGenerator, Awaitable, Callable
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable, Sequence
 
 from aiosqlite import Connection
 
+from src.core.config import config
+from src.core.db.writer import SQLiteWriter
 from src.tables.telegram_users import TelegramUser, TelegramUserDTO, TelegramUserInputDTO
+from src.utils.cache import TTLCache
+from src.utils.single_flight import SingleFlight
 
 from .base import AbstractRepository
 
+# Concurrent 'get' calls on the same database with the same column and value share one query
+user_reads: SingleFlight[Hashable, TelegramUserDTO | None] = SingleFlight("user_repository_get")
+
 
 class UserRepository(AbstractRepository):
-    def __init__(self, db_session_factory: Callable[[],Awaitable[AsyncGenerator[Connection]]]) -> None:
-        super().__init__(db_session_factory, TelegramUser)
+    # Rows per multi-row upsert statement, keeps bound parameters far below SQLite's limit
+    UPSERT_CHUNK_SIZE = 500
+
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+            reads: SingleFlight[Hashable, TelegramUserDTO | None] | None = None,
+    ) -> None:
+        super().__init__(
+            db_session_factory,
+            TelegramUser,
+            writer,
+            reads if reads is not None else user_reads,
+        )
 
     async def get(self, **kwargs: dict[str, int | str]) -> TelegramUserDTO | None:
         if len(kwargs) != 1:
@@ -22,10 +42,14 @@ class UserRepository(AbstractRepository):
             raise ValueError(f"Invalid column name: {column}")
 
         query = f"SELECT * FROM {self._table_name} WHERE {column} = ? LIMIT 1"
-        async with self._db_session_factory() as session:
-            result = await session.execute(query, (value,))
-            row = await result.fetchone()
-        return TelegramUserDTO(**dict(row)) if row else None
+
+        async def read() -> TelegramUserDTO | None:
+            async with self._db_session_factory() as session:
+                result = await session.execute(query, (value,))
+                row = await result.fetchone()
+            return TelegramUserDTO(**dict(row)) if row else None
+
+        return await self._read_once((column, value), read)
 
     async def add(self, dto: TelegramUserInputDTO) -> TelegramUserDTO:
         query = (f"""
@@ -35,40 +59,95 @@ class UserRepository(AbstractRepository):
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
             RETURNING *
         """)
-        async with self._db_session_factory() as session:
-            result = await session.execute(
-                sql=query,
-                parameters=(
-                    dto.user_id,
-                    dto.is_bot,
-                    dto.first_name,
-                    dto.last_name,
-                    dto.username,
-                    dto.language_code,
-                    dto.added_date,
-                ),
-            )
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(
+            query,
+            (
+                dto.user_id,
+                dto.is_bot,
+                dto.first_name,
+                dto.last_name,
+                dto.username,
+                dto.language_code,
+                dto.added_date,
+            ),
+        )
         return TelegramUserDTO(**dict(row))
 
+    def _upsert_query(self, rows: int) -> str:
+        """Builds an upsert that touches an existing row only when profile fields differ."""
+        values = ", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * rows)
+        return f"""
+            INSERT INTO {self._table_name} (
+                user_id, is_bot, first_name, last_name,
+                username, language_code, added_date
+            ) VALUES {values}
+            ON CONFLICT(user_id) DO UPDATE SET
+                is_bot = excluded.is_bot,
+                first_name = excluded.first_name,
+                last_name = excluded.last_name,
+                username = excluded.username,
+                language_code = excluded.language_code
+            WHERE {self._table_name}.is_bot IS NOT excluded.is_bot
+                OR {self._table_name}.first_name IS NOT excluded.first_name
+                OR {self._table_name}.last_name IS NOT excluded.last_name
+                OR {self._table_name}.username IS NOT excluded.username
+                OR {self._table_name}.language_code IS NOT excluded.language_code
+            RETURNING *
+        """
+
+    @staticmethod
+    def _upsert_parameters(dto: TelegramUserInputDTO) -> tuple:
+        return (
+            dto.user_id,
+            dto.is_bot,
+            dto.first_name,
+            dto.last_name,
+            dto.username,
+            dto.language_code,
+            dto.added_date,
+        )
+
+    async def upsert(self, dto: TelegramUserInputDTO) -> TelegramUserDTO | None:
+        """
+        Inserts the user or refreshes its profile in a single statement.
+        'added_date' of an existing user is preserved.
+
+        Returns:
+            The inserted or updated row, None if the stored profile was already up to date.
+        """
+        row = await self._write(self._upsert_query(1), self._upsert_parameters(dto))
+        return TelegramUserDTO(**dict(row)) if row else None
+
+    async def upsert_many(self, dtos: Sequence[TelegramUserInputDTO]) -> list[TelegramUserDTO]:
+        """
+        Bulk variant of 'upsert', one statement per 'UPSERT_CHUNK_SIZE' users.
+
+        Returns:
+            Only the rows that were inserted or updated.
+        """
+        result = []
+        for start in range(0, len(dtos), self.UPSERT_CHUNK_SIZE):
+            chunk = dtos[start:start + self.UPSERT_CHUNK_SIZE]
+            parameters = [value for dto in chunk for value in self._upsert_parameters(dto)]
+            rows = await self._write_all(self._upsert_query(len(chunk)), parameters)
+            result.extend(TelegramUserDTO(**dict(row)) for row in rows)
+        return result
+
     async def list(
             self,
-            offset: int = 0,
+            after_id: int = 0,
             limit: int = 100,
-    ) -> list[TelegramUserDTO | None]:
-        query = f"SELECT * FROM {self._table_name} ORDER BY id LIMIT ? OFFSET ?"
+    ) -> list[TelegramUserDTO]:
+        """Keyset pagination: returns up to 'limit' rows with id greater than 'after_id'."""
+        query = f"SELECT * FROM {self._table_name} WHERE id > ? ORDER BY id LIMIT ?"
         async with self._db_session_factory() as session:
-            result = await session.execute(query, (limit, offset))
+            result = await session.execute(query, (after_id, limit))
             rows = await result.fetchall()
         return [TelegramUserDTO(**dict(row)) for row in rows] if rows else []
 
     async def delete(self, row_id: int) -> TelegramUserDTO | None:
         query = f"DELETE FROM {self._table_name} WHERE id = ? RETURNING *"
-        async with self._db_session_factory() as session:
-            result = await session.execute(query, (row_id,))
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(query, (row_id,))
         return TelegramUserDTO(**dict(row)) if row else None
 
     async def update(self, dto: TelegramUserDTO) -> TelegramUserDTO | None:
@@ -84,20 +163,91 @@ class UserRepository(AbstractRepository):
                 WHERE id = ?
                 RETURNING *
                 """
-        async with self._db_session_factory() as session:
-            result = await session.execute(
-                query,
-                (
-                    dto.user_id,
-                    dto.is_bot,
-                    dto.first_name,
-                    dto.last_name,
-                    dto.username,
-                    dto.language_code,
-                    dto.added_date,
-                    dto.id,
-                ),
-            )
-            row = await result.fetchone()
-            await session.commit()
+        row = await self._write(
+            query,
+            (
+                dto.user_id,
+                dto.is_bot,
+                dto.first_name,
+                dto.last_name,
+                dto.username,
+                dto.language_code,
+                dto.added_date,
+                dto.id,
+            ),
+        )
         return TelegramUserDTO(**dict(row)) if row else None
+
+
+class CachedUserRepository(UserRepository):
+    """
+    UserRepository with a read-through/write-through cache keyed by Telegram 'user_id'.
+
+    Writes whose profile equals the cached row are skipped entirely,
+    'TelegramUserDTO' equality already ignores 'added_date'.
+    """
+
+    def __init__(
+            self,
+            db_session_factory: Callable[[], Awaitable[AsyncGenerator[Connection]]],
+            writer: SQLiteWriter | None = None,
+            cache: TTLCache[int, TelegramUserDTO] | None = None,
+    ) -> None:
+        super().__init__(db_session_factory, writer)
+        self._cache = cache if cache is not None else user_cache
+
+    def _remember(self, dto: TelegramUserDTO | None) -> TelegramUserDTO | None:
+        if dto is not None:
+            self._cache.set(dto.user_id, dto)
+        return dto
+
+    def _is_unchanged(self, dto: TelegramUserInputDTO) -> bool:
+        cached = self._cache.get(dto.user_id)
+        return cached is not None and cached == TelegramUserDTO.from_input(cached.id, dto)
+
+    async def get(self, **kwargs: dict[str, int | str]) -> TelegramUserDTO | None:
+        if len(kwargs) == 1 and "user_id" in kwargs:
+            cached = self._cache.get(kwargs["user_id"])
+            if cached is not None:
+                return cached
+        return self._remember(await super().get(**kwargs))
+
+    async def add(self, dto: TelegramUserInputDTO) -> TelegramUserDTO:
+        return self._remember(await super().add(dto))
+
+    async def update(self, dto: TelegramUserDTO) -> TelegramUserDTO | None:
+        cached = self._cache.get(dto.user_id)
+        if cached is not None and cached.id == dto.id and cached == dto:
+            return cached
+        updated = await super().update(dto)
+        if updated is None:
+            self._cache.pop(dto.user_id)
+        return self._remember(updated)
+
+    async def upsert(self, dto: TelegramUserInputDTO) -> TelegramUserDTO | None:
+        if self._is_unchanged(dto):
+            return None
+        row = await super().upsert(dto)
+        if row is None:
+            # Stored profile is up to date but not cached yet
+            self._remember(await super().get(user_id=dto.user_id))
+        return self._remember(row)
+
+    async def upsert_many(self, dtos: Sequence[TelegramUserInputDTO]) -> list[TelegramUserDTO]:
+        changed = [dto for dto in dtos if not self._is_unchanged(dto)]
+        rows = await super().upsert_many(changed) if changed else []
+        for row in rows:
+            self._remember(row)
+        return rows
+
+    async def delete(self, row_id: int) -> TelegramUserDTO | None:
+        row = await super().delete(row_id)
+        if row is not None:
+            self._cache.pop(row.user_id)
+        return row
+
+
+user_cache: TTLCache[int, TelegramUserDTO] = TTLCache(
+    max_size=config.cache.user_max_size,
+    ttl=config.cache.user_ttl,
+)
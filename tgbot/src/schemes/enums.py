@@ -24,6 +24,12 @@ class AuthMethod(Enum):
     COOKIES = "cookies"
     HEADERS = "headers"
 
+class Dialect(Enum):
+    """Request/response formats of LLM APIs"""
+    RAW = "raw"
+    OPENAI = "openai"
+    OLLAMA = "ollama"
+
 class Confirmation(Enum):
     """Confirmation options."""
     YES = "yes"
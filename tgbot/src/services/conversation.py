@@ -0,0 +1,75 @@
+from datetime import UTC, datetime
+
+from src.core.config import config
+from src.core.ModelGateway.adapters import ChatMessage
+from src.repository.conversation import ConversationMessageRepository, ConversationRepository
+from src.tables.conversation import ConversationDTO, ConversationInputDTO, ConversationMessageInputDTO
+from src.utils.cache import TTLCache
+from src.utils.context_window import ContextBudget, ContextWindow
+
+context_budget = ContextBudget(
+    max_chars=config.conversation.context_max_chars,
+    recent_messages=config.conversation.recent_messages,
+    older_message_chars=config.conversation.older_message_chars,
+)
+
+# Assembled windows of active chats, keyed by conversation id
+context_cache: TTLCache[int, ContextWindow] = TTLCache(
+    max_size=config.conversation.cache_max_size,
+    ttl=config.conversation.cache_ttl,
+)
+
+
+class ConversationService:
+    """Stores the turns of chats with an AI and assembles the context of the next prompt."""
+
+    def __init__(
+            self,
+            conversation_repo: ConversationRepository,
+            message_repo: ConversationMessageRepository,
+            budget: ContextBudget = context_budget,
+            cache: TTLCache[int, ContextWindow] = context_cache,
+            history_rows: int = config.conversation.history_rows,
+    ) -> None:
+        self.conversation_repo = conversation_repo
+        self.message_repo = message_repo
+        self.budget = budget
+        self.cache = cache
+        self.history_rows = history_rows
+
+    async def start(self, user_id: int, chat_id: int, integration_id: int) -> ConversationDTO:
+        conversation = await self.conversation_repo.add(
+            dto=ConversationInputDTO(
+                user_id=user_id,
+                chat_id=chat_id,
+                integration_id=integration_id,
+                created_at=datetime.now(UTC).isoformat(),
+            ),
+        )
+        self.cache.set(conversation.id, ContextWindow(self.budget))
+        return conversation
+
+    async def context(self, conversation_id: int) -> ContextWindow:
+        """Returns the cached window, rebuilding it from the newest stored messages on a miss."""
+        window = self.cache.get(conversation_id)
+        if window is None:
+            rows = await self.message_repo.recent(conversation_id, self.history_rows)
+            window = ContextWindow(self.budget, (ChatMessage(row.role, row.content) for row in rows))
+            self.cache.set(conversation_id, window)
+        return window
+
+    async def append_turn(self, conversation_id: int, prompt: str, answer: str) -> None:
+        """Stores a prompt with its answer, then extends the cached window if there is one."""
+        created_at = datetime.now(UTC).isoformat()
+        await self.message_repo.add_many([
+            ConversationMessageInputDTO(
+                conversation_id=conversation_id, role="user", content=prompt, created_at=created_at,
+            ),
+            ConversationMessageInputDTO(
+                conversation_id=conversation_id, role="assistant", content=answer, created_at=created_at,
+            ),
+        ])
+        window = self.cache.get(conversation_id)
+        if window is not None:
+            window.append(ChatMessage("user", prompt))
+            window.append(ChatMessage("assistant", answer))
@@ -1,23 +1,44 @@
+from collections.abc import AsyncIterator
+
 from aiogram.types import CallbackQuery, Message, User
 
 from src.core.db.pool import sqlite_pool
+from src.core.db.writer import sqlite_writer
+from src.core.ModelGateway.adapters import DIALECT_OLLAMA, DIALECT_OPENAI, DIALECT_RAW, ChatMessage
 from src.core.ModelGateway.ai_http_client import HTTPMethods
+from src.core.ModelGateway.gateway import ModelGateway, model_gateway
+from src.core.ModelGateway.limiter import QueuedCallback
+from src.repository.conversation import ConversationMessageRepository, ConversationRepository
 from src.repository.llm import LLMRepository
-from src.repository.user import UserRepository
-from src.schemes.enums import AuthMethod
+from src.repository.user import CachedUserRepository, UserRepository
+from src.schemes.enums import AuthMethod, Dialect
+from src.services.conversation import ConversationService
 from src.tables.integration_ai import IntegrationAIDTO, IntegrationAIInputDTO
+from src.utils.deadline import Deadline
+
+DIALECT_VALUES = {
+    Dialect.RAW: DIALECT_RAW,
+    Dialect.OPENAI: DIALECT_OPENAI,
+    Dialect.OLLAMA: DIALECT_OLLAMA,
+}
 
 
 class LLMService:
+    LIST_PAGE_SIZE = 10
+
     def __init__(
             self,
             llm_repo: LLMRepository,
             user_repo: UserRepository,
             user: User,
+            gateway: ModelGateway = model_gateway,
+            conversations: ConversationService | None = None,
     ) -> None:
         self.llm_repo = llm_repo
         self.user_repo = user_repo
         self.user = user
+        self.gateway = gateway
+        self.conversations = conversations
 
 
     async def add_new_ai(
@@ -26,6 +47,8 @@ class LLMService:
             http_method: HTTPMethods,
             auth_method: AuthMethod,
             auth_creds: str | None = None,
+            dialect: Dialect = Dialect.RAW,
+            model: str | None = None,
     ) -> IntegrationAIDTO:
 
         if http_method == HTTPMethods.GET:
@@ -50,6 +73,10 @@ class LLMService:
         else:
             raise TypeError("Unexpected AuthMethod")
 
+        dialect_value = DIALECT_VALUES.get(dialect)
+        if dialect_value is None:
+            raise TypeError("Unexpected Dialect")
+
 
         return await self.llm_repo.add(
             dto=IntegrationAIInputDTO(
@@ -58,10 +85,76 @@ class LLMService:
                 http_method=http_method_value,
                 auth_type=auth_method_value,
                 auth_creds=auth_creds,
+                dialect=dialect_value,
+                model=model if dialect != Dialect.RAW else None,
             ),
         )
 
 
+    async def list_ais(
+            self,
+            after_id: int = 0,
+            limit: int = LIST_PAGE_SIZE,
+    ) -> tuple[list[IntegrationAIDTO], int | None]:
+        """
+        Returns one page of integrations created by the user
+        and the cursor of the next page (None on the last page).
+        """
+        integrations = await self.llm_repo.list_by_creator(
+            creator_id=self.user.id,
+            after_id=after_id,
+            limit=limit + 1,
+        )
+        if len(integrations) > limit:
+            return integrations[:limit], integrations[limit - 1].id
+        return integrations, None
+
+    async def get_ai(self, integration_id: int) -> IntegrationAIDTO | None:
+        """Returns the integration if it exists and belongs to the user."""
+        integration = await self.llm_repo.get(id=integration_id)
+        if integration is None or integration.creator_id != self.user.id:
+            return None
+        return integration
+
+    async def start_chat(self, integration: IntegrationAIDTO, chat_id: int) -> int | None:
+        """
+        Opens a conversation with the integration, returns its id (None without history).
+        The integration must come from `get_ai`, which checks that it belongs to the user.
+        """
+        if self.conversations is None:
+            return None
+        conversation = await self.conversations.start(self.user.id, chat_id, integration.id)
+        return conversation.id
+
+    async def ask(
+            self,
+            integration: IntegrationAIDTO,
+            prompt: str,
+            on_queued: QueuedCallback | None = None,
+            deadline: Deadline | None = None,
+            conversation_id: int | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams the answer of the integration to the prompt.
+        With a conversation, the prompt is sent after its context window
+        and the turn is stored once the whole answer has been received.
+        """
+        if self.conversations is None or conversation_id is None:
+            async for chunk in self.gateway.stream_text(
+                    integration, [ChatMessage("user", prompt)], on_queued, deadline,
+            ):
+                yield chunk
+            return
+
+        window = await self.conversations.context(conversation_id)
+        messages = [*window.messages(reserve=len(prompt)), ChatMessage("user", prompt)]
+        answer: list[str] = []
+        async for chunk in self.gateway.stream_text(integration, messages, on_queued, deadline):
+            answer.append(chunk)
+            yield chunk
+        if answer:
+            await self.conversations.append_turn(conversation_id, prompt, "".join(answer))
+
 
 class LLMServiceFactory:
     @staticmethod
@@ -73,6 +166,10 @@ class LLMServiceFactory:
 
         session_generator = sqlite_pool.get_async_session
 
-        user_repo = UserRepository(session_generator)
-        llm_repo = LLMRepository(session_generator)
-        return LLMService(llm_repo, user_repo, user)
+        user_repo = CachedUserRepository(session_generator, sqlite_writer)
+        llm_repo = LLMRepository(session_generator, sqlite_writer)
+        conversations = ConversationService(
+            ConversationRepository(session_generator, sqlite_writer),
+            ConversationMessageRepository(session_generator, sqlite_writer),
+        )
+        return LLMService(llm_repo, user_repo, user, conversations=conversations)
@@ -3,8 +3,9 @@ from datetime import UTC, datetime
 from aiogram.types import CallbackQuery, Message, User
 
 from src.core.db.pool import sqlite_pool
-from src.repository.user import UserRepository
-from src.tables.telegram_users import TelegramUserDTO, TelegramUserInputDTO
+from src.core.db.writer import sqlite_writer
+from src.repository.user import CachedUserRepository, UserRepository
+from src.tables.telegram_users import TelegramUserInputDTO
 
 
 class UserService:
@@ -27,18 +28,7 @@ class UserService:
             username=self._user.username,
             added_date=datetime.now(UTC).isoformat(),
         )
-
-        db_user: TelegramUserDTO | None = await self._repo.get(user_id=self._user.id)
-
-        if not db_user:
-            await self._repo.add(user_input_dto)
-        else:
-            user_dto: TelegramUserDTO = TelegramUserDTO.from_input(
-                row_id=db_user.id,
-                input_dto=user_input_dto,
-            )
-            if db_user != user_dto:
-                await self._repo.update(user_dto)
+        await self._repo.upsert(user_input_dto)
 
 class UserServiceFactory:
     """UserService factory"""
@@ -49,5 +39,5 @@ class UserServiceFactory:
         else:
             raise TypeError(f"Unsupported event: {type(event)}")
 
-        repo = UserRepository(sqlite_pool.get_async_session)
+        repo = CachedUserRepository(sqlite_pool.get_async_session, sqlite_writer)
         return UserService(user, repo)
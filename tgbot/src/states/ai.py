@@ -7,6 +7,8 @@ class AddAIStates(StatesGroup):
     """
     waiting_for_url = State()
     waiting_for_http_method = State()
+    waiting_for_dialect = State()
+    waiting_for_model = State()
     waiting_for_auth_method = State()
     waiting_for_auth_data = State()
     confirming_config = State()
@@ -0,0 +1,8 @@
+from aiogram.fsm.state import State, StatesGroup
+
+
+class ChatStates(StatesGroup):
+    """
+    States for chatting with a registered AI.
+    """
+    chatting = State()
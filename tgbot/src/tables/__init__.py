@@ -1,8 +1,15 @@
 from .base import Base  #  noqa: F401
+from .conversation import Conversation, ConversationMessage
+from .fsm_state import FsmState
 from .integration_ai import IntegrationAI
+from .response_cache import ResponseCache
 from .telegram_users import TelegramUser
 
 tables = [
     IntegrationAI,
     TelegramUser,
+    Conversation,
+    ConversationMessage,
+    ResponseCache,
+    FsmState,
 ]
@@ -0,0 +1,73 @@
+from pydantic.dataclasses import dataclass
+
+from .base import Base
+
+
+class Conversation(Base):
+    async def create(self) -> None:
+        """
+        Creates the 'conversation' table in the database if it does not already exist.
+        A conversation is one chat session of a Telegram user with an AI integration.
+        """
+        await self._session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.get_name()} (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id         BIGINT NOT NULL,
+                chat_id         BIGINT NOT NULL,
+                integration_id  INTEGER NOT NULL,
+                created_at      TEXT NOT NULL
+        );
+    """)
+
+
+class ConversationMessage(Base):
+    async def create(self) -> None:
+        """
+        Creates the 'conversation_message' table in the database if it does not already exist.
+        Stores the turns of a conversation, in 'id' order.
+        """
+        await self._session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.get_name()} (
+                id               INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id  INTEGER NOT NULL,
+                role             TEXT NOT NULL CHECK(role IN ('system', 'user', 'assistant')),
+                content          TEXT NOT NULL,
+                created_at       TEXT NOT NULL
+        );
+    """)
+
+
+@dataclass(frozen=True)
+class ConversationInputDTO:
+    user_id: int # Telegram user id
+    chat_id: int # Telegram chat id
+    integration_id: int
+    created_at: str
+
+
+@dataclass(frozen=True)
+class ConversationDTO:
+    id: int
+    user_id: int
+    chat_id: int
+    integration_id: int
+    created_at: str
+
+
+@dataclass(frozen=True)
+class ConversationMessageInputDTO:
+    conversation_id: int
+    role: str # "system", "user" or "assistant"
+    content: str
+    created_at: str
+
+
+@dataclass(frozen=True)
+class ConversationMessageDTO:
+    id: int
+    conversation_id: int
+    role: str
+    content: str
+    created_at: str
@@ -0,0 +1,39 @@
+from pydantic.dataclasses import dataclass
+
+from .base import Base
+
+
+class FsmState(Base):
+    async def create(self) -> None:
+        """
+        Creates the 'fsm_state' table in the database if it does not already exist.
+        Stores the aiogram FSM state and data of every chat/user key, so unfinished
+        dialogs such as the "Add AI" wizard survive restarts.
+        """
+        await self._session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.get_name()} (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                key         TEXT NOT NULL UNIQUE,
+                state       TEXT,
+                data        TEXT NOT NULL,
+                updated_at  REAL NOT NULL
+        );
+    """)
+
+
+@dataclass(frozen=True)
+class FsmStateInputDTO:
+    key: str # built by aiogram's DefaultKeyBuilder, e.g. "fsm:<bot>:<chat>:<user>:default"
+    state: str | None
+    data: str # JSON document, see 'src/core/db/fsm_storage.py'
+    updated_at: float # unix time
+
+
+@dataclass(frozen=True)
+class FsmStateDTO:
+    id: int
+    key: str
+    state: str | None
+    data: str
+    updated_at: float
@@ -33,6 +33,8 @@ class IntegrationAIInputDTO:
     auth_type: int # 0: No Auth, 1: Cookies, 2: Header
     auth_creds: str | None # Authentication credentials, can be None if no auth
     http_method: int # 0: GET, 1: POST, 2: PUT, 3: DELETE, 4: PATCH
+    dialect: int = 0 # 0: Raw text, 1: OpenAI-compatible, 2: Ollama
+    model: str | None = None # Model name sent by the OpenAI/Ollama dialects
 
 @dataclass(frozen=True)
 class IntegrationAIDTO:
@@ -46,6 +48,8 @@ class IntegrationAIDTO:
     auth_type: int
     auth_creds: str | None
     http_method: int
+    dialect: int = 0
+    model: str | None = None
 
     @classmethod
     def from_input(cls, row_id: int, input_dto: IntegrationAIInputDTO) -> "IntegrationAIDTO":
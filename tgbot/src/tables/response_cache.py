@@ -0,0 +1,45 @@
+from pydantic.dataclasses import dataclass
+
+from .base import Base
+
+
+class ResponseCache(Base):
+    async def create(self) -> None:
+        """
+        Creates the 'response_cache' table in the database if it does not already exist.
+        Stores complete answers of LLM endpoints, keyed by the integration and a hash
+        of the normalized request, until 'expires_at' (unix time).
+        """
+        await self._session.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.get_name()} (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                key             TEXT NOT NULL UNIQUE,
+                integration_id  INTEGER NOT NULL,
+                body            TEXT NOT NULL,
+                size            INTEGER NOT NULL,
+                created_at      REAL NOT NULL,
+                expires_at      REAL NOT NULL
+        );
+    """)
+
+
+@dataclass(frozen=True)
+class ResponseCacheInputDTO:
+    key: str # "<integration id>:<sha256 of the normalized request>"
+    integration_id: int
+    body: str # answer text
+    size: int # bytes of the UTF-8 encoded answer
+    created_at: float # unix time
+    expires_at: float # unix time
+
+
+@dataclass(frozen=True)
+class ResponseCacheDTO:
+    id: int
+    key: str
+    integration_id: int
+    body: str
+    size: int
+    created_at: float
+    expires_at: float
@@ -1,125 +1,58 @@
-from aiogram.utils.markdown import link
-
 from src.core.ModelGateway.ai_http_client import HTTPMethods
-from src.schemes.enums import AuthMethod, Languages, Menu
+from src.schemes.enums import AuthMethod, Dialect, Languages, Menu
+from src.tables.integration_ai import IntegrationAIDTO
+from src.text.localization import locales
 
 
 class TextBuilder:
     """
     Class for building text messages for bot
     with different languages, using MarkdownV2.
+    Messages come from the locale files in src/text/locales.
      """
 
     def __init__(self, language: Languages) -> None:
         if not isinstance(language, Languages):
             raise TypeError("Language must be an instance of Languages Enum.")
         self._language = language
+        self._locale = locales[language]
 
     @staticmethod
     def start_handler() -> str:
         return "🌐:"
 
     def main_menu_greeting(self) -> str:
-        if self._language == Languages.en:
-            return "You are in the *main menu*\\. Here's what you can do\\:"
-        if self._language == Languages.ru:
-            return "Вы в *главном меню*\\. Вот что вы можете сделать\\:"
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text("main_menu_greeting")
 
-    def main( # noqa: PLR0911
-            self,
-            item: Menu,
-    ) -> str:
+    def main(self, item: Menu) -> str:
         if not isinstance(item, Menu):
             raise TypeError("Item must be an instance of Menu Enum.")
-
-        if self._language == Languages.en:
-            if item == Menu.info:
-                return (
-                    "Information about bot\\:\n\n"
-                    f"Source code: {link('github.com/mrzkv/LLMtgbot', 'https://github.com/mrzkv/LLMtgbot')}\n"
-                    f"Creator: {link('tg.mrzkv.ru', 'https://tg.mrzkv.ru')}\n\n"
-                )
-            if item == Menu.models:
-                return "You are in the *Models menu* 🧠"
-            if item == Menu.settings:
-                return "You are in the *Bot settings* ⚙️"
-            return "Unknown menu item. Please select an option from the menu below."
-
-        if self._language == Languages.ru:
-            if item == Menu.info:
-                return (
-                    "Информация о боте\\:\n\n"
-                    f"Исходный код: {link('github.com/mrzkv/LLMtgbot', 'https://github.com/mrzkv/LLMtgbot')}\n"
-                    f"Создатель: {link('tg.mrzkv.ru', 'https://tg.mrzkv.ru')}\n\n"
-                )
-            if item == Menu.models:
-                return "Вы в *меню моделей* 🧠"
-            if item == Menu.settings:
-                return "Вы в *настройках бота* ⚙️"
-            return "Неизвестный пункт меню\\. Пожалуйста, выберите опцию из меню ниже\\."
-
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text(f"menu.{item.value}")
 
     def add_ai_url(self) -> str:
-        if self._language == Languages.en:
-            return "Please enter the AI URL \\(up to its endpoint\\)\\.\nExample: `https://example.com/ai/v5/chat/`"
-        if self._language == Languages.ru:
-            return "Пожалуйста, введите ссылку на AI \\(до её эндпоинта\\)\\.\nПример: `https://example.com/ai/v5/chat/`"
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text("add_ai_url")
 
     def choose_http_method_prompt(self) -> str:
         """Returns the prompt to choose an HTTP method (GET, POST, PUT, PATCH, DELETE)."""
-        if self._language == Languages.en:
-            return "Now, please choose the *HTTP method* to use for this AI\\."
-        if self._language == Languages.ru:
-            return "Теперь, пожалуйста, выберите *HTTP\\-метод* для этого AI\\."
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text("choose_http_method_prompt")
+
+    def choose_dialect_prompt(self) -> str:
+        """Returns the prompt to choose the API dialect (Raw text, OpenAI, Ollama)."""
+        return self._locale.text("choose_dialect_prompt")
+
+    def enter_model_prompt(self) -> str:
+        return self._locale.text("enter_model_prompt")
 
     def choose_auth_method_prompt(self) -> str:
         """Returns the prompt to choose an authentication method (None, Cookies, Headers)."""
-        if self._language == Languages.en:
-            return "Next, choose the *authentication method*\\."
-        if self._language == Languages.ru:
-            return "Далее, выберите *метод аутентификации*\\."
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text("choose_auth_method_prompt")
 
     def enter_auth_data_prompt(self, auth_method: AuthMethod) -> str:
         """
         Returns the prompt for entering authentication data,
         specifying the expected format for headers or cookies.
         """
-        example_header = "X\\-Auth\\-Token ASsdfjsdkfjskdfj"
-        example_cookie = "sessionid=somevalue"
-
-        if self._language == Languages.en:
-            if auth_method == AuthMethod.HEADERS:
-                return (
-                    "Please enter the *header key and value* separated by a space\\.\n"
-                    f"Example: `{example_header}`"
-                )
-            if auth_method == AuthMethod.COOKIES:
-                return (
-                    "Please enter the *cookie key and value* separated by an equals sign\\.\n"
-                    f"Example: `{example_cookie}`" # Cookies typically use key=value
-                )
-            # Should not happen if AuthMethod.NONE is handled by UI not calling this.
-            return "Please enter authentication data\\."
-
-        if self._language == Languages.ru:
-            if auth_method == AuthMethod.HEADERS:
-                return (
-                    "Пожалуйста, введите *ключ и значение заголовка*, разделенные пробелом\\.\n"
-                    f"Пример: `{example_header}`"
-                )
-            if auth_method == AuthMethod.COOKIES:
-                return (
-                    "Пожалуйста, введите *ключ и значение куки*, разделенные знаком равенства\\.\n"
-                    f"Пример: `{example_cookie}`"
-                )
-            return "Пожалуйста, введите данные аутентификации\\."
-
-        raise ValueError(f"Invalid language: {self._language.value}")
+        return self._locale.text(f"enter_auth_data_prompt.{auth_method.value}")
 
     def confirm_ai_config_prompt(
             self,
@@ -127,77 +60,70 @@ class TextBuilder:
             http_method: HTTPMethods,
             auth_method: AuthMethod,
             auth_data: str | None = None,  # Key-value pair Cookie/Header
+            dialect: Dialect = Dialect.RAW,
+            model: str | None = None,
     ) -> str:
         """
         Returns the confirmation message displaying all entered AI configuration details.
         """
-        confirm_text_en = "Please confirm the following AI configuration\\:"
-        confirm_text_ru = "Пожалуйста, подтвердите следующую конфигурацию AI\\:"
-
-        url_line_en = f"URL: `{url}`"
-        url_line_ru = f"URL: `{url}`"
-
-        method_line_en = f"HTTP Method: *{http_method.value}*"
-        method_line_ru = f"HTTP Метод: *{http_method.value}*"
-
-        auth_method_line_en = f"Authentication: *{auth_method.value.capitalize()}*"
-        auth_method_line_ru = f"Аутентификация: *{auth_method.value.capitalize()}*"
-
-        auth_data_line_en = ""
-        auth_data_line_ru = ""
+        locale = self._locale
+        header = locale.format(
+            "confirm_ai_config.header",
+            url=url,
+            http_method=http_method.value,
+            dialect=dialect.value,
+        )
+        if model:
+            header += locale.format("confirm_ai_config.model", model=model)
+        auth_data_line = ""
         if auth_method != AuthMethod.NONE and auth_data:
-            auth_data_line_en = f"Auth Data: `{auth_data}`"
-            auth_data_line_ru = f"Данные аутентификации: `{auth_data}`"
-
-        if self._language == Languages.en:
-            return (
-                f"{confirm_text_en}\n"
-                f"{url_line_en}\n"
-                f"{method_line_en}\n"
-                f"{auth_method_line_en}\n"
-                f"{auth_data_line_en}\n"
-                "\nIs this correct\\?"
-            )
-        if self._language == Languages.ru:
-            return (
-                f"{confirm_text_ru}\n"
-                f"{url_line_ru}\n"
-                f"{method_line_ru}\n"
-                f"{auth_method_line_ru}\n"
-                f"{auth_data_line_ru}\n"
-                "\nВерно\\?"
-            )
-
-        raise ValueError(f"Invalid language: {self._language.value}")
-
-
-
-    def list_ai_models(self) -> str:
-        if self._language == Languages.en:
-            return "Here is your *list of AI models*\\."
-        if self._language == Languages.ru:
-            return "Вот ваш *список моделей ИИ*\\."
-        return "..."
+            auth_data_line = locale.format("confirm_ai_config.auth_data", auth_data=auth_data)
+        return "\n".join((
+            header,
+            locale.format("confirm_ai_config.auth_method", auth_method=auth_method.value.capitalize()),
+            auth_data_line,
+            "",
+            locale.text("confirm_ai_config.question"),
+        ))
+
+    def list_ai_models(self, integrations: list[IntegrationAIDTO] | None = None) -> str:
+        header = self._locale.text("list_ai_models.header")
+        if integrations is None:
+            return header
+        if not integrations:
+            return self._locale.text("list_ai_models.empty")
+        lines = [
+            self._locale.format("list_ai_models.item", id=integration.id, url=integration.url)
+            for integration in integrations
+        ]
+        return f"{header}\n\n" + "\n".join(lines)
 
     def delete_ai_prompt(self) -> str:
-        if self._language == Languages.en:
-            return "Please select the *AI to delete*\\."
-        if self._language == Languages.ru:
-            return "Пожалуйста, выберите *ИИ для удаления*\\."
-        return "..."
+        return self._locale.text("delete_ai_prompt")
 
     def invalid_url(self) -> str:
-        if self._language == Languages.en:
-            return "Invalid URL ❌"
-        if self._language == Languages.ru:
-            return "Неправильная ссылка ❌"
-        return "..."
+        return self._locale.text("invalid_url")
+
+    def invalid_model_name(self) -> str:
+        return self._locale.text("invalid_model_name")
 
     def invalid_auth_creds(self, auth_method: AuthMethod) -> str:
-        if self._language == Languages.en:
-            return f"Invalid credentials for {auth_method.value}\\."
-        if self._language == Languages.ru:
-            if auth_method == AuthMethod.HEADERS:
-                return "Некорректные данные для Заголовка\\."
-            return "Некорректные данные для Куки\\."
-        return "..."
+        return self._locale.text(f"invalid_auth_creds.{auth_method.value}")
+
+    def chat_started(self, integration_id: int) -> str:
+        return self._locale.format("chat_started", integration_id=integration_id)
+
+    def ai_not_found(self) -> str:
+        return self._locale.text("ai_not_found")
+
+    def ai_request_failed(self) -> str:
+        return self._locale.text("ai_request_failed")
+
+    def ai_queued(self, position: int) -> str:
+        return self._locale.format("ai_queued", position=position)
+
+    def ai_busy(self) -> str:
+        return self._locale.text("ai_busy")
+
+    def empty_ai_answer(self) -> str:
+        return self._locale.text("empty_ai_answer")
@@ -0,0 +1,69 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from src.schemes.enums import AuthMethod, Languages, Menu
+from src.text.builder import TextBuilder
+
+
+@dataclass(frozen=True, slots=True)
+class LanguageTexts:
+    """Static MarkdownV2 messages of one language."""
+    main_menu_greeting: str
+    menu: Mapping[Menu, str] # text of each main menu item
+    add_ai_url: str
+    choose_http_method_prompt: str
+    choose_dialect_prompt: str
+    enter_model_prompt: str
+    choose_auth_method_prompt: str
+    enter_auth_data_prompt: Mapping[AuthMethod, str]
+    invalid_url: str
+    invalid_model_name: str
+    invalid_auth_creds: Mapping[AuthMethod, str]
+    ai_not_found: str
+    ai_request_failed: str
+    ai_busy: str
+    empty_ai_answer: str
+
+
+def build_texts(language: Languages) -> LanguageTexts:
+    builder = TextBuilder(language)
+    return LanguageTexts(
+        main_menu_greeting=builder.main_menu_greeting(),
+        menu=MappingProxyType({item: builder.main(item) for item in Menu}),
+        add_ai_url=builder.add_ai_url(),
+        choose_http_method_prompt=builder.choose_http_method_prompt(),
+        choose_dialect_prompt=builder.choose_dialect_prompt(),
+        enter_model_prompt=builder.enter_model_prompt(),
+        choose_auth_method_prompt=builder.choose_auth_method_prompt(),
+        enter_auth_data_prompt=MappingProxyType(
+            {method: builder.enter_auth_data_prompt(method) for method in AuthMethod},
+        ),
+        invalid_url=builder.invalid_url(),
+        invalid_model_name=builder.invalid_model_name(),
+        invalid_auth_creds=MappingProxyType(
+            {method: builder.invalid_auth_creds(method) for method in AuthMethod},
+        ),
+        ai_not_found=builder.ai_not_found(),
+        ai_request_failed=builder.ai_request_failed(),
+        ai_busy=builder.ai_busy(),
+        empty_ai_answer=builder.empty_ai_answer(),
+    )
+
+
+class TextCatalog:
+    """
+    Messages that do not depend on user data, rendered once per language at startup.
+    Messages with user data (chat started, queue position, AI configuration, ...)
+    are still rendered by TextBuilder.
+    """
+
+    def __init__(self) -> None:
+        self.start_handler = TextBuilder.start_handler()
+        self._languages = MappingProxyType({language: build_texts(language) for language in Languages})
+
+    def __getitem__(self, language: Languages) -> LanguageTexts:
+        return self._languages[language]
+
+
+texts = TextCatalog()
@@ -0,0 +1,69 @@
+"""
+Consistency check of the locale files.
+
+Run `python -m src.text.check_locales [locales_dir]` to list, and fail with a non-zero
+exit code on: locales without a language (or languages without a locale), keys
+missing from some locales, placeholders differing between locales and MarkdownV2
+characters left unescaped.
+"""
+import sys
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+from src.schemes.enums import Languages
+from src.text.localization import LOCALES_DIR, PLAIN_TEXT_PREFIX, Context, Template, read_locale, scan
+
+
+def find_locale_problems(locales: Mapping[str, Mapping[str, str]]) -> Iterator[str]:
+    """`locales` maps a language code to its flattened messages."""
+    codes = {language.value for language in Languages}
+    for code in sorted(codes - locales.keys()):
+        yield f"{code}: no locale file, every message falls back"
+    for code in sorted(locales.keys() - codes):
+        yield f"{code}: locale file of a language not in Languages"
+
+    keys = set().union(*(messages.keys() for messages in locales.values()))
+    placeholders: dict[str, dict[str, frozenset[str]]] = {}
+    for code, messages in sorted(locales.items()):
+        for key in sorted(keys - messages.keys()):
+            yield f"{code}: missing {key}"
+        for key, source in sorted(messages.items()):
+            try:
+                template = Template.compile(source, plain=key.startswith(PLAIN_TEXT_PREFIX))
+            except ValueError as e:
+                yield f"{code}: {key}: {e}"
+                continue
+            placeholders.setdefault(key, {})[code] = template.names
+            yield from (f"{code}: {key}: {problem}" for problem in find_markdown_problems(template))
+
+    for key, by_code in sorted(placeholders.items()):
+        if len(set(by_code.values())) > 1:
+            details = ", ".join(f"{code} {sorted(names)}" for code, names in sorted(by_code.items()))
+            yield f"{key}: placeholders differ: {details}"
+
+
+def find_markdown_problems(template: Template) -> Iterator[str]:
+    if template.plain:
+        return
+    context = Context.TEXT
+    for literal in template.literals:
+        context, unescaped = scan(literal, context)
+        for index in unescaped:
+            yield f"unescaped {literal[index]!r} in {literal!r}"
+    if context is not Context.TEXT:
+        yield f"unclosed {context.value}"
+
+
+def main(directory: str | Path = LOCALES_DIR) -> int:
+    locales = {path.stem: read_locale(path) for path in sorted(Path(directory).glob("*.json"))}
+    problems = list(find_locale_problems(locales))
+    for problem in problems:
+        print(problem) # noqa: T201
+    if not problems:
+        keys = sum(len(messages) for messages in locales.values())
+        print(f"OK: {len(locales)} locales, {keys} messages") # noqa: T201
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:2]))
@@ -0,0 +1,207 @@
+"""
+Message catalog: every user-facing string, one JSON file per locale in src/text/locales.
+
+Messages are MarkdownV2 templates with `{name}` placeholders, buttons (keys under "button")
+are plain text. Each template is split once at load into literal parts and placeholders,
+and each placeholder knows whether it sits in text, a code span or a link URL, so values
+are escaped for their place when rendered. Keys missing from a locale are taken from the
+fallback locale at load, the lookup is a single dict access whatever the number of locales.
+
+Run `python -m src.text.check_locales` to find missing keys and escaping mistakes.
+"""
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from enum import Enum
+from logging import getLogger
+from pathlib import Path
+from string import Formatter
+from types import MappingProxyType
+from typing import Any
+
+import orjson
+
+from src.schemes.enums import Languages
+
+logger = getLogger(__name__)
+
+LOCALES_DIR = Path(__file__).parent / "locales"
+FALLBACK_LANGUAGE = Languages.en
+PLAIN_TEXT_PREFIX = "button." # button labels are not parsed as MarkdownV2
+
+# Characters that are never markup in MarkdownV2 and must always be escaped in text
+LITERAL_ONLY_CHARACTERS = frozenset(".!-=+#>{}")
+
+
+class Context(Enum):
+    """Where a position of a MarkdownV2 template is, which decides how values are escaped."""
+    PLAIN = "plain" # not MarkdownV2 at all
+    TEXT = "text"
+    CODE = "code"
+    URL = "url" # inside the (...) of a link
+
+
+_ESCAPES = {
+    Context.PLAIN: None,
+    Context.TEXT: re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])"),
+    Context.CODE: re.compile(r"([`\\])"),
+    Context.URL: re.compile(r"([)\\])"),
+}
+_CLOSERS = {Context.CODE: "`", Context.URL: ")"} # end of the span a context is in
+
+
+def escape(value: str, context: Context = Context.TEXT) -> str:
+    pattern = _ESCAPES[context]
+    return value if pattern is None else pattern.sub(r"\\\1", value)
+
+
+def scan(text: str, context: Context) -> tuple[Context, list[int]]:
+    """
+    Walks MarkdownV2 `text` starting in `context`.
+    Returns the context at its end and the positions of characters that should have been escaped.
+    """
+    if context is Context.PLAIN:
+        return context, []
+    unescaped = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        closer = _CLOSERS.get(context)
+        if closer is not None:
+            if char == closer:
+                context = Context.TEXT
+        elif char == "`":
+            context = Context.CODE
+        elif char == "]" and text.startswith("(", index + 1):
+            context = Context.URL
+            index += 1
+        elif char in LITERAL_ONLY_CHARACTERS:
+            unescaped.append(index)
+        index += 1
+    return context, unescaped
+
+
+@dataclass(frozen=True, slots=True)
+class Template:
+    """A message split into literal parts and the placeholders between them."""
+    literals: tuple[str, ...] # one more than fields
+    fields: tuple[tuple[str, Context], ...] # placeholder name and where it is
+    plain: bool = False # plain text, not MarkdownV2
+
+    @classmethod
+    def compile(cls, source: str, plain: bool = False) -> "Template":
+        literals = []
+        fields = []
+        context = Context.PLAIN if plain else Context.TEXT
+        for literal, name, format_spec, conversion in Formatter().parse(source):
+            literals.append(literal)
+            context, _ = scan(literal, context)
+            if name is None:
+                continue
+            if not name.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Placeholders must be plain names, got {{{name}}} in {source!r}")
+            fields.append((name, context))
+        if len(literals) == len(fields):
+            literals.append("")
+        return cls(tuple(literals), tuple(fields), plain)
+
+    @property
+    def names(self) -> frozenset[str]:
+        return frozenset(name for name, _ in self.fields)
+
+    def render(self, values: Mapping[str, object]) -> str:
+        parts = [self.literals[0]]
+        for (name, context), literal in zip(self.fields, self.literals[1:], strict=True):
+            parts.append(escape(str(values[name]), context))
+            parts.append(literal)
+        return "".join(parts)
+
+
+def flatten(tree: Mapping[str, Any], prefix: str = "") -> Iterator[tuple[str, str]]:
+    """Yields ("a.b.c", message) for nested objects of a locale file."""
+    for key, value in tree.items():
+        if isinstance(value, Mapping):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, str):
+            yield f"{prefix}{key}", value
+        else:
+            raise TypeError(f"Message {prefix}{key} must be a string, not {type(value).__name__}")
+
+
+def read_locale(path: Path) -> dict[str, str]:
+    return dict(flatten(orjson.loads(path.read_bytes())))
+
+
+def compile_messages(messages: Mapping[str, str]) -> tuple[dict[str, str], dict[str, Template]]:
+    """Splits messages into ready strings (no placeholder) and templates."""
+    texts = {}
+    templates = {}
+    for key, source in messages.items():
+        template = Template.compile(source, plain=key.startswith(PLAIN_TEXT_PREFIX))
+        if template.fields:
+            templates[key] = template
+        else:
+            texts[key] = template.literals[0]
+    return texts, templates
+
+
+class Locale:
+    """Messages of one language."""
+
+    __slots__ = ("_templates", "_texts", "language")
+
+    def __init__(self, language: Languages, messages: Mapping[str, str]) -> None:
+        self.language = language
+        self._texts, self._templates = compile_messages(messages)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._texts or key in self._templates
+
+    def text(self, key: str) -> str:
+        """Message without placeholders."""
+        try:
+            return self._texts[key]
+        except KeyError:
+            if key in self._templates:
+                raise KeyError(f"Message {key!r} has placeholders, use format()") from None
+            raise KeyError(f"No message {key!r} in locale {self.language.value}") from None
+
+    def format(self, key: str, **values: object) -> str:
+        """Message with its placeholders replaced by the escaped `values`."""
+        template = self._templates.get(key)
+        if template is None:
+            return self.text(key)
+        return template.render(values)
+
+
+class LocaleCatalog:
+    """Locales of every language, loaded once."""
+
+    def __init__(self, locales: Mapping[Languages, Locale]) -> None:
+        self._locales = MappingProxyType(dict(locales))
+
+    @classmethod
+    def load(cls, directory: Path = LOCALES_DIR, fallback: Languages = FALLBACK_LANGUAGE) -> "LocaleCatalog":
+        """
+        Reads "<language>.json" of every language, messages missing from a locale
+        (or a missing file) are taken from the fallback locale.
+        """
+        fallback_messages = read_locale(directory / f"{fallback.value}.json")
+        locales = {}
+        for language in Languages:
+            path = directory / f"{language.value}.json"
+            messages = read_locale(path) if path.exists() else {}
+            missing = fallback_messages.keys() - messages.keys()
+            if missing:
+                logger.warning(f"Locale {language.value}: {len(missing)} messages taken from {fallback.value}")
+            locales[language] = Locale(language, fallback_messages | messages)
+        return cls(locales)
+
+    def __getitem__(self, language: Languages) -> Locale:
+        return self._locales[language]
+
+
+locales = LocaleCatalog.load()
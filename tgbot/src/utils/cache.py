@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from time import monotonic
+
+
+@dataclass
+class CacheStats:
+    """Counters of a TTLCache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0 # dropped to respect 'max_size'
+    expirations: int = 0 # dropped because 'ttl' has passed
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache[K: Hashable, V]:
+    """
+    Bounded in-process cache with LRU eviction and per-entry time to live.
+
+    Not thread-safe, meant to be used from a single event loop.
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl: float,
+            clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("'max_size' must be at least 1")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Returns a live entry and marks it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (self._clock() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,79 @@
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.core.ModelGateway.adapters import ChatMessage
+
+TRUNCATION_MARK = " […]"
+
+
+@dataclass(frozen=True, slots=True)
+class ContextBudget:
+    max_chars: int # total chars of history sent with a prompt, ~4 chars per token
+    recent_messages: int # newest messages kept verbatim
+    older_message_chars: int # older messages are truncated to this many chars
+
+
+class ContextWindow:
+    """
+    History of one conversation, already trimmed to a `ContextBudget`.
+
+    The newest `recent_messages` are kept verbatim, older ones are truncated
+    and the oldest are dropped once the window is over `max_chars`.
+    Appending a turn only touches the ends of the window, so an active chat
+    never re-reads or re-trims its whole history.
+    """
+
+    def __init__(self, budget: ContextBudget, history: Iterable[ChatMessage] = ()) -> None:
+        self._budget = budget
+        self._messages: deque[ChatMessage] = deque()
+        self._chars = 0
+        for message in history:
+            self.append(message)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def chars(self) -> int:
+        return self._chars
+
+    def _truncate(self, message: ChatMessage) -> ChatMessage:
+        limit = self._budget.older_message_chars
+        if len(message.content) <= limit:
+            return message
+        return ChatMessage(message.role, message.content[:limit].rstrip() + TRUNCATION_MARK)
+
+    def append(self, message: ChatMessage) -> None:
+        self._messages.append(message)
+        self._chars += len(message.content)
+
+        recent = self._budget.recent_messages
+        if len(self._messages) > recent:
+            # The message that just left the verbatim tail
+            older = self._messages[-recent - 1]
+            truncated = self._truncate(older)
+            if truncated is not older:
+                self._messages[-recent - 1] = truncated
+                self._chars -= len(older.content) - len(truncated.content)
+
+        while self._chars > self._budget.max_chars and len(self._messages) > 1:
+            self._chars -= len(self._messages.popleft().content)
+
+    def messages(self, reserve: int = 0) -> list[ChatMessage]:
+        """
+        Returns the newest messages fitting in `max_chars - reserve`, oldest first.
+        `reserve` leaves room for the prompt that is sent after the history.
+        """
+        available = self._budget.max_chars - reserve
+        if self._chars <= available:
+            return list(self._messages)
+
+        selected: list[ChatMessage] = []
+        for message in reversed(self._messages):
+            available -= len(message.content)
+            if available < 0:
+                break
+            selected.append(message)
+        selected.reverse()
+        return selected
@@ -0,0 +1,40 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a call runs past the deadline of the request it serves."""
+
+
+@dataclass(frozen=True, slots=True)
+class Deadline:
+    """
+    Point in time (time.monotonic) by which a whole request must be done.
+    Created once per incoming update and passed down to every layer that waits.
+    """
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout: float | None) -> float:
+        """`timeout` shortened to the time left, the time left if `timeout` is None."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def loop_time(self) -> float:
+        """The deadline on the clock of the running event loop, for `asyncio.timeout_at`."""
+        return asyncio.get_running_loop().time() + self.remaining()
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceededError("Request deadline exceeded")
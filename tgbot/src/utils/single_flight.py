@@ -0,0 +1,68 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+from src.core.metrics import metrics
+
+calls_total = metrics.counter("single_flight_calls_total", "Calls made through a single-flight group")
+collapsed_total = metrics.counter(
+    "single_flight_collapsed_total", "Calls that joined an identical call already in flight",
+)
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters of a SingleFlight group."""
+    calls: int = 0
+    collapsed: int = 0 # calls answered by a call already in flight
+
+
+class SingleFlight[K: Hashable, V]:
+    """
+    Coalesces concurrent calls with the same key into one.
+
+    The first caller of a key starts the call in its own task, callers arriving
+    while it runs await the same task. Every caller gets the same result or the
+    same exception. Nothing is kept once the call is done, the next caller starts
+    a new one. A caller being cancelled does not cancel the shared call.
+
+    Not thread-safe, meant to be used from a single event loop.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._in_flight: dict[K, asyncio.Task[V]] = {}
+        self.stats = SingleFlightStats()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _done(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception() # retrieved here, so a call nobody awaits anymore is not logged
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        self.stats.calls += 1
+        calls_total.inc(group=self.name)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        else:
+            self.stats.collapsed += 1
+            collapsed_total.inc(group=self.name)
+        return await asyncio.shield(task)
+
+    def forget(self, key: K | None = None) -> None:
+        """
+        Makes the next caller of `key` (of every key when None) start a new call,
+        e.g. after a write that the running call may not see.
+        """
+        if key is None:
+            self._in_flight.clear()
+        else:
+            self._in_flight.pop(key, None)
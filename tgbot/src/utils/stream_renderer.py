@@ -0,0 +1,154 @@
+import asyncio
+from collections.abc import AsyncIterable
+from logging import getLogger
+
+from aiogram.enums import ChatType
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+logger = getLogger(__name__)
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+_MARKDOWN_V2_ESCAPE = str.maketrans({char: f"\\{char}" for char in "\\_*[]()~`>#+-=|{}.!"})
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escapes every MarkdownV2 special character, safe to apply chunk by chunk."""
+    return text.translate(_MARKDOWN_V2_ESCAPE)
+
+
+def _safe_split_index(text: str, index: int) -> int:
+    """Moves a split point left so an escape sequence ('\\' + char) is never cut in half."""
+    backslashes = 0
+    while index - backslashes > 0 and text[index - backslashes - 1] == "\\":
+        backslashes += 1
+    return index - 1 if backslashes % 2 else index
+
+
+class StreamingMessageRenderer:
+    """
+    Renders a stream of model text chunks into Telegram messages as they arrive.
+
+    A placeholder is sent right away and then edited with everything received so far.
+    Chunks arriving between two edits are merged into one edit. The edit interval
+    starts at `min_interval` (longer in groups, where Telegram limits are tighter),
+    grows when Telegram answers with RetryAfter and slowly shrinks back on success.
+    Text longer than `max_length` rolls over into new messages. Chunks are plain
+    text and are escaped for MarkdownV2 as they arrive.
+    """
+
+    def __init__(
+            self,
+            message: Message,
+            placeholder: str = "⏳",
+            empty_text: str = "…",
+            min_interval: float = 1.0,
+            group_min_interval: float = 3.0,
+            max_interval: float = 10.0,
+            max_length: int = TELEGRAM_MESSAGE_LIMIT,
+    ) -> None:
+        self._message = message
+        self._placeholder = placeholder
+        self._empty_text = empty_text
+        self._min_interval = min_interval if message.chat.type == ChatType.PRIVATE else group_min_interval
+        self._max_interval = max(max_interval, self._min_interval)
+        self._interval = self._min_interval
+        self._max_length = max_length
+
+        self._segments: list[str] = [""] # escaped text, one segment per Telegram message
+        self._sent: list[Message] = []
+        self._shown: list[str] = []
+        self._changed = asyncio.Event()
+        self._finished = False
+
+    @property
+    def messages(self) -> list[Message]:
+        return self._sent
+
+    def _append(self, chunk: str) -> None:
+        piece = escape_markdown_v2(chunk)
+        while piece:
+            room = self._max_length - len(self._segments[-1])
+            if len(piece) <= room:
+                self._segments[-1] += piece
+                break
+            split = _safe_split_index(piece, room)
+            self._segments[-1] += piece[:split]
+            self._segments.append("")
+            piece = piece[split:]
+        self._changed.set()
+
+    async def _consume(self, chunks: AsyncIterable[str]) -> None:
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    self._append(chunk)
+        finally:
+            self._finished = True
+            self._changed.set()
+
+    async def _call(self, index: int, text: str) -> None:
+        """Sends or edits the message of segment `index`, respecting Telegram flood control."""
+        while True:
+            try:
+                if index < len(self._sent):
+                    await self._sent[index].edit_text(text=text, disable_web_page_preview=True)
+                else:
+                    self._sent.append(await self._message.answer(text=text, disable_web_page_preview=True))
+            except TelegramRetryAfter as e:
+                self._interval = min(self._max_interval, max(self._interval * 2, e.retry_after))
+                logger.warning(f"Flood control, retry after {e.retry_after}s, edit interval {self._interval}s")
+                await asyncio.sleep(e.retry_after)
+                continue
+            except TelegramBadRequest as e:
+                if "message is not modified" not in e.message:
+                    raise
+            break
+
+        if index < len(self._shown):
+            self._shown[index] = text
+        else:
+            self._shown.append(text)
+        self._interval = max(self._min_interval, self._interval * 0.9)
+
+    async def _flush(self, final: bool = False) -> None:
+        for index, segment in enumerate(self._segments):
+            text = segment or (self._empty_text if final else self._placeholder)
+            if index >= len(self._shown) or self._shown[index] != text:
+                await self._call(index, text)
+
+    async def show_status(self, text: str) -> None:
+        """Replaces the placeholder (e.g. with a queue position) until the first chunk arrives."""
+        self._placeholder = text
+        if self._sent and not self._segments[0]:
+            await self._call(0, text)
+
+    async def render(self, chunks: AsyncIterable[str]) -> list[Message]:
+        """
+        Streams `chunks` into the chat, returns the messages used.
+        An error raised by `chunks` is re-raised after the text received so far is shown.
+        """
+        loop = asyncio.get_running_loop()
+        await self._call(0, self._placeholder)
+        last_flush = loop.time()
+
+        consumer = asyncio.create_task(self._consume(chunks))
+        try:
+            while not self._finished:
+                await self._changed.wait()
+                delay = last_flush + self._interval - loop.time()
+                if delay > 0 and not self._finished:
+                    # Let more chunks pile up, they all go out in one edit
+                    await asyncio.wait((consumer,), timeout=delay)
+                self._changed.clear()
+                await self._flush()
+                last_flush = loop.time()
+        finally:
+            if not consumer.done():
+                consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+        await self._flush(final=True)
+        consumer.result() # re-raise a failure of the upstream
+        return self._sent
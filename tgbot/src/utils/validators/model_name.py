@@ -0,0 +1,15 @@
+import re
+
+
+class ModelNameValidator:
+    """
+    Validates model names sent to OpenAI-compatible and Ollama endpoints,
+    e.g. 'gpt-4o-mini', 'llama3.1:8b', 'meta-llama/Llama-3-8B-Instruct'.
+    """
+    MAX_LENGTH = 128
+    _pattern = re.compile(r"[\w.:/@+-]+")
+
+    def is_valid(self, model_name: str | None) -> bool:
+        if not model_name or len(model_name) > self.MAX_LENGTH:
+            return False
+        return self._pattern.fullmatch(model_name) is not None
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.core.ModelGateway.limiter import EndpointLimiter, EndpointQueueFullError, EndpointQueueTimeoutError
+
+
+def test_timed_out_waiters_leave_the_queue() -> None:
+    async def scenario() -> None:
+        limiter = EndpointLimiter(max_in_flight=1, max_queue=2)
+        await limiter.acquire() # every slot is busy from now on
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            with pytest.raises(EndpointQueueTimeoutError):
+                await limiter.acquire(deadline=loop.time() + 0.01)
+        assert limiter.state().queued == 0
+
+        positions: list[int] = []
+
+        async def on_queued(position: int) -> None:
+            positions.append(position)
+
+        waiting = asyncio.create_task(limiter.acquire(on_queued=on_queued))
+        await asyncio.sleep(0)
+        assert positions == [1]
+        limiter.release()
+        await waiting
+        limiter.release()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiters_leave_the_queue() -> None:
+    async def scenario() -> None:
+        limiter = EndpointLimiter(max_in_flight=1, max_queue=1)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(EndpointQueueFullError):
+            await limiter.acquire()
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.state().queued == 1
+        limiter.release()
+        await second
+        assert limiter.state().in_flight == 1
+
+    asyncio.run(scenario())